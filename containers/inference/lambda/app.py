@@ -1,8 +1,12 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import json
 import math
 import os
 import re
+import time
+import traceback
+from typing import Dict
 import requests
 
 from darts.timeseries import TimeSeries
@@ -10,16 +14,27 @@ import pandas as pd
 import s3fs
 
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
-from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+from rlf.forecasting.data_fetching_utilities.level_provider.base_level_provider import BaseLevelProvider
+from rlf.forecasting.data_fetching_utilities.level_provider.multi_gauge_level_provider import MultiGaugeLevelProvider
 from rlf.forecasting.data_fetching_utilities.weather_provider.api_weather_provider import APIWeatherProvider
 from rlf.forecasting.catchment_data import CatchmentData
 from rlf.forecasting.inference_dataset import InferenceDataset
 from rlf.forecasting.inference_forecaster import InferenceForecaster
+from rlf.forecasting.model_registry import DEFAULT_MAX_SIZE_BYTES, ModelRegistry
 
 
 s3 = s3fs.S3FileSystem(anon=False)
 s3_bucket = "s3://model-forecasts"
 
+# number of coordinates to request from Open-Meteo in a single API call
+WEATHER_BATCH_SIZE = 50
+
+# number of catchments to run predictions for concurrently, can be overridden per invocation with a "max_workers" event key
+INFERENCE_MAX_WORKERS = int(os.environ.get("INFERENCE_MAX_WORKERS", "4"))
+
+# loaded models are kept in memory across invocations of a warm container
+model_registry = ModelRegistry(max_size_bytes=int(os.environ.get("MODEL_REGISTRY_MAX_BYTES", DEFAULT_MAX_SIZE_BYTES)))
+
 flow_pattern = re.compile(r"(\d+\.?\d*)(k?cfs)")
 
 
@@ -123,35 +138,76 @@ def build_json_result(dataset: InferenceDataset, predictions: TimeSeries, target
     return json.dumps(complete_dict)
 
 
-def run_predictions_for_target(target: dict):
+def run_predictions_for_target(target: dict, inference_level_provider: BaseLevelProvider) -> Dict[str, float]:
+    start = time.monotonic()
     coordinates = [Coordinate(lon, lat) for lon, lat in target["geometry"]["coordinates"]]
 
-    inference_weather_provider = APIWeatherProvider(coordinates)
-    inference_level_provider = LevelProviderNWIS(target["properties"]["gauge_id"])
+    inference_weather_provider = APIWeatherProvider(coordinates, batch_size=WEATHER_BATCH_SIZE)
     inference_catchment_data = CatchmentData(target["properties"]["gauge_id"], inference_weather_provider, inference_level_provider)
 
-    forecaster = InferenceForecaster(inference_catchment_data, "trained_models", load_cpu=True)
+    # loads the model from disk and fetches the weather and level data
+    forecaster = InferenceForecaster(inference_catchment_data, "trained_models", load_cpu=True, model_registry=model_registry)
+    loaded = time.monotonic()
+
     predictions = forecaster.predict(96)
+    predicted = time.monotonic()
 
     json_result = build_json_result(forecaster.dataset, predictions, target)
 
     s3.write_text(f"{s3_bucket}/{target['properties']['gauge_id']}.json", json_result)
+    uploaded = time.monotonic()
+
+    return {
+        "load": loaded - start,
+        "predict": predicted - loaded,
+        "upload": uploaded - predicted,
+        "total": uploaded - start
+    }
 
 
 def handler(event, context):
+    start = time.monotonic()
+    max_workers = int((event or {}).get("max_workers", INFERENCE_MAX_WORKERS))
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
     # load catchments dict
     with open("data/catchments_short.json") as f:
         catchments = json.load(f)
 
-    for feature in catchments["features"]:
-        if os.path.exists(f"trained_models/{feature['properties']['gauge_id']}"):
+    features = [feature for feature in catchments["features"] if os.path.exists(f"trained_models/{feature['properties']['gauge_id']}")]
+
+    # Recent levels of all gauges are fetched together with a few NWIS requests
+    level_provider = MultiGaugeLevelProvider([feature["properties"]["gauge_id"] for feature in features])
+
+    # Threads rather than processes: Lambda has no shared memory for multiprocessing, and fetching/uploading releases the GIL as does torch while predicting
+    timings = {}
+    failures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_predictions_for_target, feature, level_provider.provider(feature["properties"]["gauge_id"])): feature["properties"]["gauge_id"]
+            for feature in features
+        }
+        for future in as_completed(futures):
+            gauge_id = futures[future]
             try:
-                run_predictions_for_target(feature)
-            except Exception:
-                print(f"Unable to run predictions for {feature['properties']['gauge_id']}")
-                raise
-
-    return
+                timings[gauge_id] = future.result()
+            except Exception as e:
+                failures[gauge_id] = e
+                print(f"Unable to run predictions for {gauge_id}")
+                traceback.print_exc()
+                continue
+            print(f"Ran predictions for {gauge_id} in {timings[gauge_id]['total']:.1f}s (" + ", ".join(f"{phase}: {duration:.1f}s" for phase, duration in timings[gauge_id].items() if phase != "total") + ")")
+
+    print(f"Ran predictions for {len(timings)}/{len(features)} catchments in {time.monotonic() - start:.1f}s with {max_workers} workers")
+    slowest = sorted(timings, key=lambda gauge_id: timings[gauge_id]["total"], reverse=True)[:5]
+    if slowest:
+        print("Slowest catchments: " + ", ".join(f"{gauge_id} ({timings[gauge_id]['total']:.1f}s)" for gauge_id in slowest))
+
+    if failures:
+        raise RuntimeError(f"Unable to run predictions for {sorted(failures)}") from next(iter(failures.values()))
+
+    return {"timings": timings}
 
 
 if __name__ == "__main__":
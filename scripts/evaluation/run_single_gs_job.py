@@ -1,4 +1,5 @@
 import argparse
+from datetime import datetime, timezone
 import json
 import os
 import statistics
@@ -17,12 +18,15 @@ except ImportError as e:
     exit(1)
 
 try:
-    from rlf.aws_dispatcher import AWSDispatcher
+    from rlf.aws_dispatcher import AWSDispatcher, DEFAULT_LOCAL_PATH
     from rlf.forecasting.catchment_data import CatchmentData
     from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
     from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+    from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
     from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
+    from rlf.forecasting.feature_cache import FeatureCache
     from rlf.forecasting.training_dataset import TrainingDataset
+    from rlf.local_file_cache import LocalFileCache
     from rlf.forecasting.training_forecaster import TrainingForecaster
     from rlf.models.contributing_model import ContributingModel
     from rlf.models.ensemble import Ensemble
@@ -149,7 +153,9 @@ def get_training_data(
     columns: List[str],
     rolling_sum_columns: Optional[List[str]] = None,
     rolling_mean_columns: Optional[List[str]] = None,
-    rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24)
+    rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24),
+    feature_cache: Optional[FeatureCache] = None,
+    data_version: Optional[str] = None
 ) -> TrainingDataset:
     """Generate the TrainingDataset for the given gauge ID, coordinates, and columns.
 
@@ -160,15 +166,17 @@ def get_training_data(
         rolling_sum_columns (Optional[List[str]], optional): Columns to generate rolling sums for. Defaults to None.
         rolling_mean_columns (Optional[List[str]], optional): Columns to generate rolling means for. Defaults to None.
         rolling_window_sizes (Sequence[int], optional): Window sizes to use for rolling sums and means. Defaults to (10 * 24, 30 * 24).
+        feature_cache (Optional[FeatureCache], optional): Cache of processed features to reuse across jobs with the same data configuration. Defaults to None.
+        data_version (Optional[str], optional): Version of the source weather and level data. Required with a feature_cache. Defaults to None.
 
     Returns:
         TrainingDataset: A TrainingDataset instance for the specified gauge ID, coordinates and columns.
     """
     weather_provider = AWSWeatherProvider(
         coordinates,
-        AWSDispatcher("all-weather-data", "open-meteo")
+        AWSDispatcher("all-weather-data", "open-meteo", local_cache=LocalFileCache(DEFAULT_LOCAL_PATH))
     )
-    level_provider = LevelProviderNWIS(gauge_id)
+    level_provider = LevelProviderNWIS(gauge_id, level_store=LevelStore())
     catchment_data = CatchmentData(
         gauge_id,
         weather_provider,
@@ -178,7 +186,9 @@ def get_training_data(
     dataset = TrainingDataset(catchment_data,
                               rolling_sum_columns=rolling_sum_columns,
                               rolling_mean_columns=rolling_mean_columns,
-                              rolling_window_sizes=rolling_window_sizes)
+                              rolling_window_sizes=rolling_window_sizes,
+                              feature_cache=feature_cache,
+                              data_version=data_version)
     return dataset
 
 
@@ -195,7 +205,7 @@ def get_columns(column_file: str) -> List[str]:
         return [c.strip() for c in f.readlines()]
 
 
-def run_grid_search_job(parameters: Dict[str, Any], working_dir: str, job_id: int, center_only: bool) -> Dict[str, Any]:
+def run_grid_search_job(parameters: Dict[str, Any], working_dir: str, job_id: int, center_only: bool, feature_cache: Optional[FeatureCache] = None, data_version: Optional[str] = None) -> Dict[str, Any]:
     """Run a grid search job with the given parameters.
 
     Args:
@@ -203,6 +213,8 @@ def run_grid_search_job(parameters: Dict[str, Any], working_dir: str, job_id: in
         working_dir (str): Working directory to save the trained models to.
         job_id (int): ID of the job. Used to save the model.
         center_only (bool): whether to use only the centermost point or all points for the grid search
+        feature_cache (Optional[FeatureCache], optional): Cache of processed features shared by the jobs of the grid search. Defaults to None.
+        data_version (Optional[str], optional): Version of the source weather and level data. Required with a feature_cache. Defaults to None.
 
     Returns:
         Dict[str, Any]: Dict summarizing the results of the grid search job.
@@ -219,7 +231,7 @@ def run_grid_search_job(parameters: Dict[str, Any], working_dir: str, job_id: in
     rolling_sum_columns = parameters["rolling_sum_columns"]
     rolling_mean_columns = parameters["rolling_mean_columns"]
     rolling_window_sizes = parameters["rolling_window_sizes"]
-    dataset = get_training_data(parameters["gauge_id"], coordinates, columns, rolling_sum_columns=rolling_sum_columns, rolling_mean_columns=rolling_mean_columns, rolling_window_sizes=rolling_window_sizes)
+    dataset = get_training_data(parameters["gauge_id"], coordinates, columns, rolling_sum_columns=rolling_sum_columns, rolling_mean_columns=rolling_mean_columns, rolling_window_sizes=rolling_window_sizes, feature_cache=feature_cache, data_version=data_version)
     model = build_model_for_dataset(dataset, parameters["regression_train_n_points"], contributing_model_type, contributing_model_kwargs)
 
     forecaster = TrainingForecaster(model, dataset, root_dir=f'{working_dir}/trained_models/{str(job_id)}', use_future_covariates=MODEL_USES_FUTURE_COVARIATES[contributing_model_type])
@@ -269,6 +281,8 @@ if __name__ == '__main__':
     parser.add_argument("job_id", type=str, help='Job ID to run.')
     parser.add_argument('-i', '--input_dir', type=str, default='grid_search', help='Input directory for job JSON files')
     parser.add_argument('--use_all_coords', action='store_false', help="Use all coords in grid search rather than only the center point")
+    parser.add_argument('-f', '--feature_cache_dir', type=str, default=None, help="Directory of a cache of processed features shared by jobs with the same data configuration. Features are not cached if not set")
+    parser.add_argument('--data_version', type=str, default=datetime.now(timezone.utc).strftime("%Y-%m-%d"), help="Version of the source data for the feature cache. Defaults to the current UTC date, so that cached features are rebuilt daily")
 
     args = parser.parse_args()
 
@@ -286,5 +300,6 @@ if __name__ == '__main__':
     if "errors" in job_data.keys():
         print("Errors have already been calculated for this job. Skipping.")
     else:
-        scores = run_grid_search_job(job_data, working_dir, job_id, center_only=center_only)
+        feature_cache = FeatureCache(args.feature_cache_dir) if args.feature_cache_dir is not None else None
+        scores = run_grid_search_job(job_data, working_dir, job_id, center_only=center_only, feature_cache=feature_cache, data_version=args.data_version)
         append_scores_to_json(job_filepath, scores)
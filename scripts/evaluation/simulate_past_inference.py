@@ -2,11 +2,13 @@ import argparse
 import pandas as pd
 
 try:
-    from rlf.aws_dispatcher import AWSDispatcher
+    from rlf.aws_dispatcher import AWSDispatcher, DEFAULT_LOCAL_PATH
     from rlf.forecasting.catchment_data import CatchmentData
     from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+    from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
     from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
     from rlf.forecasting.inference_forecaster import InferenceForecaster
+    from rlf.local_file_cache import LocalFileCache
     from rlf.forecasting.training_helpers import get_columns, get_coordinates_for_catchment, get_recent_available_timestamps, get_level_true
 except ImportError as e:
     print("Import error on rlf packages. Ensure rlf and its dependencies have been installed into the local environment.")
@@ -25,12 +27,12 @@ def main(args: argparse.Namespace) -> int:
         return 1
 
     # Create AWSDispatcher and load available timestamps
-    aws_dispatcher = AWSDispatcher("all-weather-data", "open-meteo")
+    aws_dispatcher = AWSDispatcher("all-weather-data", "open-meteo", local_cache=LocalFileCache(DEFAULT_LOCAL_PATH))
     timestamps = get_recent_available_timestamps(aws_dispatcher, args.num_inferences)
 
     # Ceate weather and level providers for inference
     inference_weather_provider = AWSWeatherProvider(coordinates, aws_dispatcher=aws_dispatcher)
-    inference_level_provider = LevelProviderNWIS(args.gauge_id)
+    inference_level_provider = LevelProviderNWIS(args.gauge_id, level_store=LevelStore())
 
     level_true = get_level_true(timestamps, inference_level_provider, args.forecast_window)
     all_level_data = []
@@ -1,9 +1,11 @@
 import argparse
+from datetime import datetime, timezone
 import json
 import os
 from typing import Dict, List, Union
 
 try:
+    from rlf.forecasting.feature_cache import FeatureCache
     from rlf.forecasting.training_forecaster import TrainingForecaster
     from rlf.forecasting.training_helpers import (
         get_columns,
@@ -71,6 +73,26 @@ if __name__ == "__main__":
     parser.add_argument(
         "-b", "--test_stride", type=int, default=5, help="Stride for backtesting"
     )
+    parser.add_argument(
+        "-w",
+        "--max_workers",
+        type=int,
+        default=1,
+        help="Number of processes to train Contributing Models in parallel",
+    )
+    parser.add_argument(
+        "-f",
+        "--feature_cache_dir",
+        type=str,
+        default=None,
+        help="Directory of a cache of processed features shared by runs with the same data configuration. Features are not cached if not set",
+    )
+    parser.add_argument(
+        "--data_version",
+        type=str,
+        default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        help="Version of the source data for the feature cache. Defaults to the current UTC date, so that cached features are rebuilt daily",
+    )
 
     args = parser.parse_args()
     gauge_id = args.gauge_id
@@ -81,6 +103,8 @@ if __name__ == "__main__":
     combiner_holdout_size = args.combiner_holdout_size
     test_start = args.test_start
     test_stride = args.test_stride
+    max_workers = args.max_workers
+    feature_cache = FeatureCache(args.feature_cache_dir) if args.feature_cache_dir is not None else None
 
     coordinates = get_coordinates_for_catchment(data_file, gauge_id)
     if coordinates is None:
@@ -88,7 +112,7 @@ if __name__ == "__main__":
         exit(1)
 
     columns = get_columns(columns_file)
-    dataset = get_training_data(gauge_id, coordinates, columns)
+    dataset = get_training_data(gauge_id, coordinates, columns, feature_cache=feature_cache, data_version=args.data_version)
     model = build_model_for_dataset(
         dataset, epochs, combiner_holdout_size, train_stride
     )
@@ -97,7 +121,7 @@ if __name__ == "__main__":
     os.makedirs(root_dir, exist_ok=True)
 
     forecaster = TrainingForecaster(model, dataset, root_dir=root_dir)
-    forecaster.fit()
+    forecaster.fit(max_workers=max_workers)
 
     contrib_test_errors = forecaster.backtest_contributing_models(
         start=test_start, stride=test_stride
@@ -0,0 +1,36 @@
+# Helper script for converting the historical weather stored in AWS by an AWSDispatcher (one set of files per coordinate) into a gridded Zarr store readable by ZarrWeatherProvider. The store can be written locally or to any fsspec URL, e.g. "s3://all-weather-data/gridded".
+import json
+import sys
+
+from rlf.aws_dispatcher import AWSDispatcher
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.zarr_weather_uploader import ZarrWeatherUploader
+
+# Parse command line args
+args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+
+if len(args) == 2:
+    CATCHMENT_FILEPATH = args[0]
+    STORE_PATH = args[1]
+else:
+    raise ValueError(f'Usage: {sys.argv[0]} CATCHMENT_FILEPATH STORE_PATH')
+
+BUCKET_NAME = "all-weather-data"
+AWS_DIR_NAME = "open-meteo"
+
+# Load a list of Coordinate objects from the json file at the given path
+with open(CATCHMENT_FILEPATH) as f:
+    data = json.load(f)
+coordinates_raw = []
+for feature in data["features"]:
+    coordinates_raw.extend(feature["geometry"]["coordinates"])
+coordinates = list(set(Coordinate(lon=coord[0], lat=coord[1]) for coord in coordinates_raw))
+
+print(f'Converting historical weather data for {len(coordinates)} points to {STORE_PATH}')
+
+aws_dispatcher = AWSDispatcher(bucket_name=BUCKET_NAME, directory_name=AWS_DIR_NAME)
+aws_weather_provider = AWSWeatherProvider(coordinates=coordinates, aws_dispatcher=aws_dispatcher)
+zarr_weather_uploader = ZarrWeatherUploader(weather_provider=aws_weather_provider, store_path=STORE_PATH)
+
+zarr_weather_uploader.upload_historical()
@@ -0,0 +1,45 @@
+# Helper script for uploading historical weather from OpenMeteo to AWS in the consolidated per-catchment format, where all coordinates of a catchment are stored in a single table. Read it back with AWSWeatherProvider(..., catchment_name=gauge_id). Pass -incremental to only fetch and append data newer than what is already stored.
+import json
+import sys
+
+from rlf.aws_dispatcher import AWSDispatcher
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.data_fetching_utilities.weather_provider.api_weather_provider import APIWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_uploader import AWSWeatherUploader
+
+# Parse command line args
+opts = [opt for opt in sys.argv[1:] if opt.startswith("-")]
+args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+
+if len(args) == 3:
+    CATCHMENT_FILEPATH = args[0]
+    START_DATE = args[1]
+    END_DATE = args[2]
+else:
+    raise ValueError(f'Usage: {sys.argv[0]} (-incremental) CATCHMENT_FILEPATH START_DATE END_DATE, where dates are given in the form "yyyy-mm-dd"')
+
+INCREMENTAL = "-incremental" in opts
+
+# Tunable parameters
+SLEEP_DURATION = 5
+BUCKET_NAME = "all-weather-data"
+AWS_DIR_NAME = "open-meteo"
+
+with open(CATCHMENT_FILEPATH) as f:
+    data = json.load(f)
+
+aws_dispatcher = AWSDispatcher(bucket_name=BUCKET_NAME, directory_name=AWS_DIR_NAME)
+
+for feature in data["features"]:
+    gauge_id = feature["properties"]["gauge_id"]
+    coordinates = [Coordinate(lon=coord[0], lat=coord[1]) for coord in feature["geometry"]["coordinates"]]
+
+    print(f'Uploading historical weather data for catchment {gauge_id} with {len(coordinates)} points')
+
+    api_weather_provider = APIWeatherProvider(coordinates=coordinates)
+    aws_weather_uploader = AWSWeatherUploader(weather_provider=api_weather_provider, aws_dispatcher=aws_dispatcher)
+    aws_weather_uploader.upload_historical(start_date=START_DATE,
+                                           end_date=END_DATE,
+                                           sleep_duration=SLEEP_DURATION,
+                                           incremental=INCREMENTAL,
+                                           catchment_name=gauge_id)
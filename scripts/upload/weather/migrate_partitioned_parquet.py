@@ -0,0 +1,23 @@
+# Helper script for migrating historical weather stored in AWS with the single file parquet layout (data.parquet per datum) to the year partitioned layout (data/year=YYYY/*.parquet). Datums which are already partitioned are skipped, so the script can safely be rerun.
+import logging
+import sys
+
+from rlf.aws_dispatcher import AWSDispatcher
+
+logging.basicConfig(level=logging.INFO)
+
+# Parse command line args
+args = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+
+# Use provided bucket if one is given, else default to the open-meteo bucket
+if len(args) == 1:
+    BUCKET_NAME = args[0]
+else:
+    BUCKET_NAME = "all-weather-data"
+
+AWS_DIR_NAME = "open-meteo"
+
+aws_dispatcher = AWSDispatcher(bucket_name=BUCKET_NAME, directory_name=AWS_DIR_NAME)
+num_migrated = aws_dispatcher.migrate_datums_to_partitioned_parquet("historical")
+
+print(f'Migrated {num_migrated} historical datums in {BUCKET_NAME}/{AWS_DIR_NAME}')
@@ -1,30 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import json
+import logging
 from typing import List
 import os
+import re
 
-from pandas import DataFrame
-import pyarrow.parquet as pq
-import s3fs
+from pandas import DataFrame, Timestamp, concat
 
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.local_file_cache import LocalFileCache
 from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pyarrow as pa
 
 
 DEFAULT_LOCAL_PATH = os.path.join("data", "aws_dispatch")
-os.makedirs(DEFAULT_LOCAL_PATH, exist_ok=True)
+
+# Parquet datasets are split into one partition per year, with roughly one month of hourly data per row group
+PARTITION_YEAR_PATTERN = re.compile(r'/year=(\d{4})/')
+PARTITION_ROW_GROUP_SIZE = 24 * 31
+
+# Number of concurrent S3 connections, so that datums can be downloaded in parallel
+MAX_POOL_CONNECTIONS = 64
 
 
 class AWSDispatcher():
-    def __init__(self, bucket_name: str, directory_name: str) -> None:
+    def __init__(self, bucket_name: str, directory_name: str, local_cache: Optional[LocalFileCache] = None) -> None:
         """Create a new AWS Dispatcher instance.
 
         Args:
             bucket_name (str): The target bucket for dispatching. MUST already exist in AWS.
             directory_name (str): Directory name within the target bucket. Does not need to already exist.
+            local_cache (LocalFileCache, optional): Local disk cache that downloaded files are read through. Files are only downloaded again if they changed in AWS. Every download goes to AWS if None. Defaults to None.
         """
-        self.s3 = s3fs.S3FileSystem(anon=False)
+        # s3fs and pyarrow.parquet are imported on first use to keep importing this module cheap
+        import s3fs
+
+        self.s3 = s3fs.S3FileSystem(anon=False, config_kwargs={"max_pool_connections": MAX_POOL_CONNECTIONS})
         self.working_dir = f's3://{bucket_name}/{directory_name}'
+        self.local_cache = local_cache
+
+    def _invalidate_local_cache(self, path: str) -> None:
+        """Drop a file from the local cache after it was overwritten or removed in AWS.
+
+        Args:
+            path (str): Path of the file in AWS.
+        """
+        if self.local_cache is not None:
+            self.local_cache.invalidate(path)
 
     def upload_as_json(self, dictionary: dict, folder_name: str, filename: str) -> None:
         """
@@ -41,6 +67,7 @@ class AWSDispatcher():
             value=json.dumps(dictionary),
             path=path
         )
+        self._invalidate_local_cache(path)
 
     def download_dict_from_json(self, folder_name: str, filename: str) -> dict:
         """Download a json file from AWS and parse it into a dictionary.
@@ -57,14 +84,18 @@ class AWSDispatcher():
         """
         path = f'{self.working_dir}/{folder_name}/{filename}.json'
         try:
-            with self.s3.open(path, 'rb') as f:
-                data = json.load(f)
+            if self.local_cache is not None:
+                with open(self.local_cache.get(self.s3, path), 'rb') as f:
+                    data = json.load(f)
+            else:
+                with self.s3.open(path, 'rb') as f:
+                    data = json.load(f)
         except FileNotFoundError:
             raise FileNotFoundError("Could not find a json file at path: " + path)
 
         return data
 
-    def upload_as_parquet(self, dataframe: DataFrame, folder_name: str, filename: str) -> None:
+    def upload_as_parquet(self, dataframe: DataFrame, folder_name: str, filename: str, row_group_size: Optional[int] = None) -> None:
         """
         Pickle the given dictionary locally, and upload the file to AWS
 
@@ -72,21 +103,133 @@ class AWSDispatcher():
             dataframe (DataFrame): DataFrame to upload to S3.
             folder_name (str): desired folder for the file. Determines s3 folder name.
             filename (str): desired name for the file. Determines s3 file name.
+            row_group_size (int, optional): Maximum number of rows per parquet row group. Uses the pyarrow default if None. Defaults to None.
         """
         path = f'{self.working_dir}/{folder_name}/{filename}.parquet'
 
         self.s3.write_bytes(
-            value=dataframe.to_parquet(),
+            value=dataframe.to_parquet(row_group_size=row_group_size),
             path=path
         )
+        self._invalidate_local_cache(path)
 
-    def download_df_from_parquet(self, folder_name: str, filename: str, columns: Optional[List[str]] = None) -> DataFrame:
-        """Download a parquet file from AWS and parse it into a DataFRame
+    def upload_as_partitioned_parquet(self, dataframe: DataFrame, folder_name: str, filename: str) -> None:
+        """Upload the given DataFrame as a year partitioned parquet dataset, replacing any data previously stored under the same name.
+
+        The dataset is stored in hive style partitions: {folder_name}/{filename}/year=YYYY/part-{first}-{last}.parquet. Files stored under the previous single file layout ({folder_name}/{filename}.parquet) are removed once the new files are written.
+
+        Args:
+            dataframe (DataFrame): DataFrame with a datetime index to upload to S3.
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+        """
+        old_paths = self._parquet_paths(folder_name, filename)
+        new_partitions = self.append_as_parquet(dataframe, folder_name, filename)
+
+        for path in old_paths:
+            if self._partition_name(path, folder_name, filename) not in new_partitions:
+                self.s3.rm(path)
+                self._invalidate_local_cache(path)
+
+    def append_as_parquet(self, dataframe: DataFrame, folder_name: str, filename: str) -> List[str]:
+        """Upload the given DataFrame as new partitions of a parquet dataset in AWS, without rewriting any data already stored.
+
+        Rows are split by year into hive style partitions: {folder_name}/{filename}/year=YYYY/. Files are named after their first and last index values so that they sort chronologically, and are written with row groups of PARTITION_ROW_GROUP_SIZE rows so that date range reads can skip the row groups they don't need.
+
+        Args:
+            dataframe (DataFrame): DataFrame with a datetime index to upload to S3.
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+
+        Returns:
+            list[str]: The written partitions, relative to the dataset folder. E.g. "year=2022/part-20220101T0000-20221231T2300.parquet".
+        """
+        partitions = []
+        for year, year_df in dataframe.groupby(dataframe.index.year):
+            first = year_df.index.min().strftime("%Y%m%dT%H%M")
+            last = year_df.index.max().strftime("%Y%m%dT%H%M")
+            partition_folder = f'year={year}'
+            partition_filename = f'part-{first}-{last}'
+            self.upload_as_parquet(year_df, f'{folder_name}/{filename}/{partition_folder}', partition_filename, row_group_size=PARTITION_ROW_GROUP_SIZE)
+            partitions.append(f'{partition_folder}/{partition_filename}.parquet')
+        return partitions
+
+    @staticmethod
+    def _partition_name(path: str, folder_name: str, filename: str) -> str:
+        """Get the path of a parquet file relative to the dataset folder. The legacy single file keeps its own name.
+
+        Args:
+            path (str): Path of a file returned by _parquet_paths.
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+
+        Returns:
+            str: The relative path, e.g. "year=2022/part-20220101T0000-20221231T2300.parquet".
+        """
+        return path.split(f'{folder_name}/{filename}/')[-1]
+
+    @staticmethod
+    def _partition_year(path: str) -> Optional[int]:
+        """Get the year of a hive style partition file from its path.
+
+        Args:
+            path (str): Path of a parquet file.
+
+        Returns:
+            int | None: The partition year, or None if the file is not in a year partition.
+        """
+        match = PARTITION_YEAR_PATTERN.search(path)
+        if match is None:
+            return None
+        return int(match.group(1))
+
+    def _parquet_paths(self, folder_name: str, filename: str, start_year: Optional[int] = None, end_year: Optional[int] = None) -> List[str]:
+        """List the files making up a parquet dataset: the legacy single file, if still present, and all partitions.
+
+        Args:
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+            start_year (int, optional): Skip year partitions before this year. Defaults to None.
+            end_year (int, optional): Skip year partitions after this year. Defaults to None.
+
+        Returns:
+            list[str]: Paths of the files in the dataset, legacy file first and partitions in chronological order. Empty if nothing is stored.
+        """
+        folder_path = f'{self.working_dir}/{folder_name}'
+
+        # A single recursive listing finds both the legacy file and the partitions
+        base_paths = []
+        paths = []
+        for path in sorted(self.s3.find(folder_path)):
+            if path.endswith(f'/{folder_name}/{filename}.parquet'):
+                base_paths.append(path)
+                continue
+            if f'/{folder_name}/{filename}/' not in path or not path.endswith(".parquet"):
+                continue
+            year = self._partition_year(path)
+            if year is not None and start_year is not None and year < start_year:
+                continue
+            if year is not None and end_year is not None and year > end_year:
+                continue
+            paths.append(path)
+        return base_paths + paths
+
+    def download_df_from_parquet(self,
+                                 folder_name: str,
+                                 filename: str,
+                                 columns: Optional[List[str]] = None,
+                                 start_datetime: Optional[datetime] = None,
+                                 end_datetime: Optional[datetime] = None,
+                                 as_float32: bool = True) -> DataFrame:
+        """Download a parquet dataset from AWS and parse it into a DataFrame. Only the columns, year partitions and row groups needed for the requested columns and time range are read.
 
         Args:
             folder_name (str): Folder of the file.
             filename (str): Name for the file.
             columns (list[str], optional): Columns to fetch. All available will be fetched if set to None. Defaults to None.
+            start_datetime (datetime, optional): Only fetch rows at or after this time. Expected to be timezone aware. Defaults to None.
+            end_datetime (datetime, optional): Only fetch rows at or before this time. Expected to be timezone aware. Defaults to None.
+            as_float32 (bool, optional): Whether to convert float columns to float32 as they are read, before they are converted to a DataFrame. Defaults to True.
 
         Raises:
             FileNotFoundError: Raised if the file cannot be found at the expected path in AWS.
@@ -94,40 +237,191 @@ class AWSDispatcher():
         Returns:
             DataFrame: Downloaded DataFrame.
         """
-        path = f'{self.working_dir}/{folder_name}/{filename}.parquet'
+        path = f'{self.working_dir}/{folder_name}/{filename}'
+        paths = self._parquet_paths(folder_name,
+                                    filename,
+                                    start_year=start_datetime.year if start_datetime is not None else None,
+                                    end_year=end_datetime.year if end_datetime is not None else None)
+        if not paths:
+            raise FileNotFoundError("Could not find a parquet file at path: " + path)
+
+        filters = []
+        if start_datetime is not None:
+            filters.append(('time', '>=', Timestamp(start_datetime)))
+        if end_datetime is not None:
+            filters.append(('time', '<=', Timestamp(end_datetime)))
+
+        if columns is not None and 'time' not in columns:
+            columns = columns + ['time']
+
+        import pyarrow.parquet as pq
+
         try:
-            dataset = pq.ParquetDataset(path, filesystem=self.s3)
-            if columns is not None and 'time' not in columns:
-                columns.append('time')
+            filesystem = self.s3
+            if self.local_cache is not None:
+                paths = [self.local_cache.get(self.s3, path) for path in paths]
+                filesystem = None
+            # Partitions are selected from their paths above, so don't add the hive partition key as a column
+            dataset = pq.ParquetDataset(paths, filesystem=filesystem, filters=filters or None, partitioning=None)
             table = dataset.read(columns=columns)
+            if as_float32:
+                table = self._cast_floats_to_float32(table)
             df = table.to_pandas()
         except FileNotFoundError:
             raise FileNotFoundError("Could not find a parquet file at path: " + path)
+
+        if len(paths) > 1:
+            df = df[~df.index.duplicated(keep="last")].sort_index()
         return df
 
+    @staticmethod
+    def _cast_floats_to_float32(table: "pa.Table") -> "pa.Table":
+        """Cast the float columns of an arrow table to float32.
+
+        Args:
+            table (pa.Table): Table to cast.
+
+        Returns:
+            pa.Table: Table with float32 float columns. Other columns, and the pandas metadata of the table, are kept.
+        """
+        import pyarrow as pa
+
+        schema = table.schema
+        cast = False
+        for i, field in enumerate(schema):
+            if pa.types.is_floating(field.type) and field.type != pa.float32():
+                schema = schema.set(i, field.with_type(pa.float32()))
+                cast = True
+        return table.cast(schema) if cast else table
+
+    def get_last_timestamp(self, folder_name: str, filename: str, index_column: str = "time") -> Optional[Timestamp]:
+        """Get the last index value stored in a parquet dataset. Only the parquet footers of the latest year partition are read, no data is downloaded.
+
+        Args:
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+            index_column (str, optional): Name of the datetime index column. Defaults to "time".
+
+        Returns:
+            Timestamp | None: The last timestamp stored, or None if there is no data.
+        """
+        paths = self._parquet_paths(folder_name, filename)
+        years = [self._partition_year(path) for path in paths]
+        latest_year = max((year for year in years if year is not None), default=None)
+        if latest_year is not None:
+            paths = [path for path, year in zip(paths, years) if year == latest_year]
+
+        import pyarrow.parquet as pq
+
+        last_timestamp = None
+        for path in paths:
+            with self.s3.open(path, 'rb') as f:
+                metadata = pq.ParquetFile(f).metadata
+            column_index = metadata.schema.names.index(index_column)
+            for i in range(metadata.num_row_groups):
+                statistics = metadata.row_group(i).column(column_index).statistics
+                if statistics is None or not statistics.has_min_max:
+                    # Fall back to reading the index column itself
+                    index = pq.read_table(path, columns=[index_column], filesystem=self.s3).column(index_column).to_pandas()
+                    file_last_timestamp = Timestamp(index.max())
+                else:
+                    file_last_timestamp = Timestamp(statistics.max)
+                if last_timestamp is None or file_last_timestamp > last_timestamp:
+                    last_timestamp = file_last_timestamp
+        return last_timestamp
+
+    def migrate_to_partitioned_parquet(self, folder_name: str, filename: str) -> bool:
+        """Rewrite a parquet dataset stored with the legacy single file layout into year partitions.
+
+        Args:
+            folder_name (str): Folder of the parquet dataset.
+            filename (str): Name of the parquet dataset.
+
+        Returns:
+            bool: True if the dataset was migrated, False if there was nothing to migrate.
+        """
+        paths = self._parquet_paths(folder_name, filename)
+        if not any(self._partition_year(path) is None for path in paths):
+            return False
+
+        df = self.download_df_from_parquet(folder_name, filename, as_float32=False)
+        self.upload_as_partitioned_parquet(df, folder_name, filename)
+        return True
+
+    def migrate_datums_to_partitioned_parquet(self, dir_path: str) -> int:
+        """Migrate the hourly parameters of every datum stored in a directory to the year partitioned layout. Datums that are already partitioned are left untouched, so this can safely be rerun.
+
+        Args:
+            dir_path (str): Directory path containing the datum folders, e.g. "historical".
+
+        Returns:
+            int: Number of datums migrated.
+        """
+        num_migrated = 0
+        for path in self.list_files(dir_path):
+            folder_name = f'{dir_path}/{path.rstrip("/").split("/")[-1]}'
+            if self.migrate_to_partitioned_parquet(folder_name, "data"):
+                logging.info(f"Migrated {folder_name} to partitioned parquet")
+                num_migrated += 1
+        return num_migrated
+
+    @staticmethod
+    def datum_folder_name(longitude: float, latitude: float, dir_path: Optional[str] = None) -> str:
+        """Get the folder name under which the datum for a given location is stored.
+
+        Args:
+            longitude (float): Longitude of the datum.
+            latitude (float): Latitude of the datum.
+            dir_path (str, optional): Directory path containing the datum folder. Defaults to None.
+
+        Returns:
+            str: Folder name relative to the working directory.
+        """
+        folder_name = f'lon_{longitude:.2f}_lat_{latitude:.2f}'
+        if dir_path is None:
+            return folder_name
+        return f'{dir_path}/{folder_name}'
+
     def upload_datum(self, datum: WeatherDatum, dir_path: Optional[str] = None) -> None:
-        """Upload an entire WeatherDatum to S3.
+        """Upload an entire WeatherDatum to S3, replacing any data previously stored for the datum.
 
         Args:
             datum (WeatherDatum): The Datum to upload.
             dir_path (str): Directory path to which datum should be uploaded.
         """
-        if dir_path is None:
-            folder_name = f'lon_{datum.longitude:.2f}_lat_{datum.latitude:.2f}'
-        else:
-            folder_name = f'{dir_path}/lon_{datum.longitude:.2f}_lat_{datum.latitude:.2f}'
+        folder_name = self.datum_folder_name(datum.longitude, datum.latitude, dir_path)
 
         self.upload_as_json(datum.meta_data, folder_name, "meta")
         self.upload_as_json(datum.hourly_units, folder_name, "units")
-        self.upload_as_parquet(datum.hourly_parameters, folder_name, "data")
+        self.upload_as_partitioned_parquet(datum.hourly_parameters, folder_name, "data")
+
+    def append_datum(self, datum: WeatherDatum, dir_path: Optional[str] = None) -> None:
+        """Append the hourly parameters of a WeatherDatum to the datum already stored in S3 as a new partition. Metadata and units are overwritten.
 
-    def download_datum(self, coordinate: Coordinate, columns: Optional[List[str]] = None,  dir_path: Optional[str] = None) -> WeatherDatum:
+        Args:
+            datum (WeatherDatum): The Datum containing only the new rows to store.
+            dir_path (str): Directory path in which the datum is stored.
+        """
+        folder_name = self.datum_folder_name(datum.longitude, datum.latitude, dir_path)
+
+        self.upload_as_json(datum.meta_data, folder_name, "meta")
+        self.upload_as_json(datum.hourly_units, folder_name, "units")
+        self.append_as_parquet(datum.hourly_parameters, folder_name, "data")
+
+    def download_datum(self,
+                       coordinate: Coordinate,
+                       columns: Optional[List[str]] = None,
+                       dir_path: Optional[str] = None,
+                       start_datetime: Optional[datetime] = None,
+                       end_datetime: Optional[datetime] = None) -> WeatherDatum:
         """Download an entire WeatherDatum from S3.
 
         Args:
             coordinate (Coordinate): Coordinate to fetch Datum for.
             columns (list[str], optional): Columns to fetch. All available will be fetched if set to None. Defaults to None.
             dir_path (str): Directory path to which datum should be uploaded.
+            start_datetime (datetime, optional): Only fetch hourly parameters at or after this time. Expected to be timezone aware. Defaults to None.
+            end_datetime (datetime, optional): Only fetch hourly parameters at or before this time. Expected to be timezone aware. Defaults to None.
 
         Raises:
             FileNotFoundError: Raised if any needed files cannot be found at the expected paths in AWS.
@@ -135,18 +429,171 @@ class AWSDispatcher():
         Returns:
             WeatherDatum: Downloaded WeatherDatum
         """
-        folder_name = f'{dir_path}/lon_{coordinate.lon:.2f}_lat_{coordinate.lat:.2f}'
+        folder_name = self.datum_folder_name(coordinate.lon, coordinate.lat, dir_path)
         try:
             meta_data = self.download_dict_from_json(folder_name, "meta")
             hourly_units = self.download_dict_from_json(folder_name, "units")
             if columns is not None:
                 hourly_units = dict((key, hourly_units[key]) for key in columns)
-            hourly_parameters = self.download_df_from_parquet(folder_name, "data", columns=columns)
+            hourly_parameters = self.download_df_from_parquet(folder_name, "data", columns=columns, start_datetime=start_datetime, end_datetime=end_datetime)
         except FileNotFoundError:
             raise FileNotFoundError("Error occured while fetching saved datum from AWS for coordinate: " + str(coordinate) + ". Expected datum folder was " + folder_name)
         datum = WeatherDatum(hourly_units=hourly_units, hourly_parameters=hourly_parameters, **meta_data)
         return datum
 
+    def download_datums(self,
+                        coordinates: List[Coordinate],
+                        columns: Optional[List[str]] = None,
+                        dir_path: Optional[str] = None,
+                        start_datetime: Optional[datetime] = None,
+                        end_datetime: Optional[datetime] = None,
+                        max_workers: int = 16) -> List[WeatherDatum]:
+        """Download the WeatherDatums for several coordinates from S3 concurrently. Requests for different coordinates overlap and their parquet data is parsed in parallel.
+
+        Args:
+            coordinates (list[Coordinate]): Coordinates to fetch Datums for.
+            columns (list[str], optional): Columns to fetch. All available will be fetched if set to None. Defaults to None.
+            dir_path (str): Directory path to which the datums were uploaded.
+            start_datetime (datetime, optional): Only fetch hourly parameters at or after this time. Expected to be timezone aware. Defaults to None.
+            end_datetime (datetime, optional): Only fetch hourly parameters at or before this time. Expected to be timezone aware. Defaults to None.
+            max_workers (int, optional): Maximum number of datums to download at once. Datums are downloaded serially if set to 1. Defaults to 16.
+
+        Raises:
+            ValueError: If max_workers is less than 1.
+            FileNotFoundError: Raised if any needed files cannot be found at the expected paths in AWS.
+
+        Returns:
+            list[WeatherDatum]: Downloaded WeatherDatums, in the same order as coordinates.
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
+        def download(coordinate: Coordinate) -> WeatherDatum:
+            return self.download_datum(coordinate, columns=columns, dir_path=dir_path, start_datetime=start_datetime, end_datetime=end_datetime)
+
+        if max_workers == 1 or len(coordinates) <= 1:
+            return [download(coordinate) for coordinate in coordinates]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(coordinates))) as executor:
+            return list(executor.map(download, coordinates))
+
+    @staticmethod
+    def catchment_folder_name(catchment_name: str, dir_path: Optional[str] = None) -> str:
+        """Get the folder name under which the consolidated weather of a catchment is stored.
+
+        Args:
+            catchment_name (str): Name of the catchment, e.g. its gauge ID.
+            dir_path (str, optional): Directory path containing the catchments folder. Defaults to None.
+
+        Returns:
+            str: Folder name relative to the working directory.
+        """
+        folder_name = f'catchments/{catchment_name}'
+        if dir_path is None:
+            return folder_name
+        return f'{dir_path}/{folder_name}'
+
+    @classmethod
+    def _catchment_column_prefix(cls, longitude: float, latitude: float) -> str:
+        """Get the prefix of the columns holding a location's hourly parameters in a consolidated catchment table.
+
+        Args:
+            longitude (float): Longitude of the datum.
+            latitude (float): Latitude of the datum.
+
+        Returns:
+            str: Column prefix, e.g. "lon_-120.80_lat_44.20_".
+        """
+        return f'{cls.datum_folder_name(longitude, latitude)}_'
+
+    def upload_catchment(self, datums: List[WeatherDatum], catchment_name: str, dir_path: Optional[str] = None, append: bool = False) -> None:
+        """Upload the WeatherDatums of a catchment as a single consolidated dataset, so that the whole catchment can be read back with one request per year partition instead of three per datum.
+
+        The hourly parameters of all datums are stored side by side in one wide year partitioned table, with each datum's columns prefixed by its location. The metadata and units of all datums are stored together in a single json file.
+
+        Args:
+            datums (list[WeatherDatum]): The Datums of all locations in the catchment.
+            catchment_name (str): Name of the catchment, e.g. its gauge ID.
+            dir_path (str, optional): Directory path to which the catchment should be uploaded. Defaults to None.
+            append (bool, optional): Append the hourly parameters as new partitions instead of replacing all data previously stored for the catchment. Defaults to False.
+
+        Raises:
+            ValueError: If two datums would be stored under the same column prefix.
+        """
+        folder_name = self.catchment_folder_name(catchment_name, dir_path)
+
+        prefixed_dfs = []
+        prefixes = set()
+        for datum in datums:
+            prefix = self._catchment_column_prefix(datum.longitude, datum.latitude)
+            if prefix in prefixes:
+                raise ValueError(f"Prefix will be represented twice in the catchment table: {prefix}")
+            prefixes.add(prefix)
+            prefixed_dfs.append(datum.hourly_parameters.add_prefix(prefix))
+        hourly_parameters = concat(prefixed_dfs, axis=1).sort_index()
+
+        meta_data = {"datums": [{**datum.meta_data, "hourly_units": datum.hourly_units} for datum in datums]}
+        self.upload_as_json(meta_data, folder_name, "meta")
+        if append:
+            self.append_as_parquet(hourly_parameters, folder_name, "data")
+        else:
+            self.upload_as_partitioned_parquet(hourly_parameters, folder_name, "data")
+
+    def download_catchment(self,
+                           catchment_name: str,
+                           coordinates: Optional[List[Coordinate]] = None,
+                           columns: Optional[List[str]] = None,
+                           dir_path: Optional[str] = None,
+                           start_datetime: Optional[datetime] = None,
+                           end_datetime: Optional[datetime] = None) -> List[WeatherDatum]:
+        """Download the WeatherDatums of a catchment stored with upload_catchment.
+
+        Args:
+            catchment_name (str): Name of the catchment, e.g. its gauge ID.
+            coordinates (list[Coordinate], optional): Coordinates to fetch Datums for. All stored Datums are fetched if set to None. Defaults to None.
+            columns (list[str], optional): Columns to fetch. All available will be fetched if set to None. Defaults to None.
+            dir_path (str, optional): Directory path to which the catchment was uploaded. Defaults to None.
+            start_datetime (datetime, optional): Only fetch hourly parameters at or after this time. Expected to be timezone aware. Defaults to None.
+            end_datetime (datetime, optional): Only fetch hourly parameters at or before this time. Expected to be timezone aware. Defaults to None.
+
+        Raises:
+            FileNotFoundError: Raised if the catchment, or any of the requested coordinates, cannot be found in AWS.
+
+        Returns:
+            list[WeatherDatum]: Downloaded WeatherDatums, in the same order as coordinates.
+        """
+        folder_name = self.catchment_folder_name(catchment_name, dir_path)
+        try:
+            meta_data = self.download_dict_from_json(folder_name, "meta")
+        except FileNotFoundError:
+            raise FileNotFoundError("Error occured while fetching saved catchment from AWS for catchment: " + catchment_name + ". Expected catchment folder was " + folder_name)
+
+        stored_meta_data = {self._catchment_column_prefix(datum_meta_data["longitude"], datum_meta_data["latitude"]): datum_meta_data
+                            for datum_meta_data in meta_data["datums"]}
+        if coordinates is None:
+            prefixes = list(stored_meta_data.keys())
+        else:
+            prefixes = [self._catchment_column_prefix(coordinate.lon, coordinate.lat) for coordinate in coordinates]
+            for coordinate, prefix in zip(coordinates, prefixes):
+                if prefix not in stored_meta_data:
+                    raise FileNotFoundError("No saved datum in catchment " + catchment_name + " for coordinate: " + str(coordinate))
+
+        parquet_columns = None
+        if columns is not None:
+            parquet_columns = [prefix + column for prefix in prefixes for column in columns]
+        hourly_parameters = self.download_df_from_parquet(folder_name, "data", columns=parquet_columns, start_datetime=start_datetime, end_datetime=end_datetime)
+
+        datums = []
+        for prefix in prefixes:
+            datum_meta_data = dict(stored_meta_data[prefix])
+            hourly_units = datum_meta_data.pop("hourly_units")
+            if columns is not None:
+                hourly_units = dict((key, hourly_units[key]) for key in columns)
+            datum_columns = [column for column in hourly_parameters.columns if column.startswith(prefix)]
+            datum_hourly_parameters = hourly_parameters[datum_columns].rename(columns=lambda column: column[len(prefix):])
+            datums.append(WeatherDatum(hourly_units=hourly_units, hourly_parameters=datum_hourly_parameters, **datum_meta_data))
+        return datums
+
     def list_files(self, folder_name: str) -> List[str]:
         """List all files in a given folder.
 
@@ -157,4 +604,4 @@ class AWSDispatcher():
             List[str]: List of file names.
         """
         path = f'{self.working_dir}/{folder_name}'
-        return self.s3.ls(path)
+        return self.s3.ls(path, detail=False)
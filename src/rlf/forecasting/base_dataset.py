@@ -1,14 +1,20 @@
+from __future__ import annotations
+
 from abc import ABC
 import logging
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
 
-from darts import TimeSeries
-from darts.timeseries import concatenate
-from pandas import DataFrame, Timestamp
+import numpy as np
+from pandas import concat, DataFrame, Timestamp
 
 from rlf.forecasting.catchment_data import CatchmentData
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
+from rlf.forecasting.rolling_features import RollingFeatureState
+
+# darts is imported on first use rather than with this module, as it is slow to import
+if TYPE_CHECKING:
+    from darts import TimeSeries
 
 
 class BaseDataset(ABC):
@@ -53,6 +59,8 @@ class BaseDataset(ABC):
         Returns:
             tuple[TimeSeries, TimeSeries]: Tuple containing (X_concatenated, y)
         """
+        from darts import TimeSeries
+
         # this assumes all Xs have the same columns
         self.base_columns = list(Xs[0].hourly_parameters.columns)
 
@@ -60,23 +68,58 @@ class BaseDataset(ABC):
         first_date, last_date = self._find_timestamp_boundaries(Xs, y)
 
         X_last_date = None if allow_future_X else last_date
-        processed_Xs = [self._process_datum(datum, first_date, X_last_date) for datum in Xs]
-        X_concatenated = concatenate(processed_Xs, axis="component")
+        # each datum is written into the concatenated X as soon as it is processed, so that only one processed datum is held at a time
+        X_concatenated = self._assemble((self._process_datum(datum, first_date, X_last_date) for datum in Xs), len(Xs))
 
         if X_concatenated.time_index[0] > first_date:
             first_date = X_concatenated.time_index[0]
-        X_concatenated = X_concatenated.astype("float32")
 
         y = TimeSeries.from_dataframe(y).slice(first_date, last_date)
         y = y.astype("float32")
 
         return X_concatenated, y
 
-    def _process_datum(self, datum: WeatherDatum, first_date: Timestamp, last_date: Optional[Timestamp]) -> TimeSeries:
+    @staticmethod
+    def _assemble(processed_Xs: Iterable[DataFrame], num_Xs: int) -> TimeSeries:
+        """Concatenate processed datums along their columns into a single float32 TimeSeries.
+
+        The datums are written one by one into a single preallocated float32 array, which is wrapped as the TimeSeries, rather than converting each datum to a TimeSeries and concatenating them.
+
+        Args:
+            processed_Xs (Iterable[DataFrame]): Processed datums, which must all have the same time index and the same number of columns.
+            num_Xs (int): Number of processed datums.
+
+        Raises:
+            ValueError: If the processed datums do not all have the same time index and number of columns, or there are none.
+
+        Returns:
+            TimeSeries: Concatenated datums.
+        """
+        from darts import TimeSeries
+
+        time_index = None
+        columns: List[str] = []
+        for i, X in enumerate(processed_Xs):
+            if time_index is None:
+                time_index = X.index
+                num_columns = X.shape[1]
+                values = np.empty((len(time_index), num_Xs * num_columns), dtype=np.float32)
+            elif not X.index.equals(time_index) or X.shape[1] != num_columns:
+                raise ValueError("All processed datums must have the same time index and number of columns to be concatenated")
+
+            values[:, i * num_columns:(i + 1) * num_columns] = X.to_numpy(dtype=np.float32)
+            columns += list(X.columns)
+
+        if time_index is None or len(columns) != values.shape[1]:
+            raise ValueError(f"Expected {num_Xs} processed datums to concatenate")
+
+        return TimeSeries.from_times_and_values(time_index, values, columns=columns)
+
+    def _process_datum(self, datum: WeatherDatum, first_date: Timestamp, last_date: Optional[Timestamp]) -> DataFrame:
         """Process a single X datum.
 
-        Processing an X datum involves cleaning the data, adding engineered features, renaming the columns, bounding the time index, and converting to a TimeSeries.
-        NaNs that are not trailing will be linearly interpolated.
+        Processing an X datum involves cleaning the data, adding engineered features, renaming the columns and bounding the time index.
+        The data is processed in float32. NaNs that are not trailing will be linearly interpolated.
         The subsets attribute will be updated with the generated prefix for this datum.
 
         Args:
@@ -88,36 +131,69 @@ class BaseDataset(ABC):
             ValueError: If the generated prefix for this datum already exists.
 
         Returns:
-            TimeSeries: Processed datum.
+            DataFrame: Processed datum, with a timezone naive UTC time index.
         """
         X = datum.hourly_parameters
 
-        X = self._strip_trailing_nans(X)
+        X = self._strip_trailing_nans(X).astype(np.float32, copy=False)
 
         X.interpolate(limit_direction="both", inplace=True)
 
         X = self._add_engineered_features(X)
 
-        prefix = f"{datum.longitude:.2f}_{datum.latitude:.2f}_"
-        if prefix not in self.subsets:
-            X.columns = [prefix + c for c in X.columns]
-            self.subsets[prefix] = Coordinate(lon=datum.longitude, lat=datum.latitude)
-        else:
-            raise ValueError(f"Prefix will be represented twice in the global X set: {prefix}")
+        prefix = self._register_prefix(datum)
+        X.columns = [prefix + c for c in X.columns]
 
         logging.log(logging.INFO, f"Datum processed with length: {len(X)}")
 
-        X = TimeSeries.from_dataframe(X)
+        return self._bound_time_index(X, first_date, last_date)
+
+    def _register_prefix(self, datum: WeatherDatum) -> str:
+        """Generate the column prefix of a datum and add it to the subsets attribute.
+
+        Args:
+            datum (WeatherDatum): Datum to generate the prefix of.
+
+        Raises:
+            ValueError: If the generated prefix for this datum already exists.
+
+        Returns:
+            str: Column prefix of the datum.
+        """
+        prefix = self._prefix(datum)
+        if prefix in self.subsets:
+            raise ValueError(f"Prefix will be represented twice in the global X set: {prefix}")
+        self.subsets[prefix] = Coordinate(lon=datum.longitude, lat=datum.latitude)
+        return prefix
+
+    @staticmethod
+    def _prefix(datum: WeatherDatum) -> str:
+        """Generate the column prefix of a datum from its coordinates.
 
-        if last_date is not None:
-            X = X.slice(first_date, last_date)
-        else:
-            # darts has a bug where if you split on the start_time
-            # then it throws a "TimeSeries can't be empty" ValueError
-            if first_date != X.start_time():
-                _, X = X.split_before(first_date)
+        Args:
+            datum (WeatherDatum): Datum to generate the prefix of.
 
-        return X
+        Returns:
+            str: Column prefix of the datum.
+        """
+        return f"{datum.longitude:.2f}_{datum.latitude:.2f}_"
+
+    @staticmethod
+    def _bound_time_index(X: DataFrame, first_date: Timestamp, last_date: Optional[Timestamp]) -> DataFrame:
+        """Bound a processed datum to the given dates, converting its time index to timezone naive UTC as for TimeSeries time indexes.
+
+        Args:
+            X (DataFrame): Processed datum.
+            first_date (Timestamp): First allowed date for the time index.
+            last_date (Timestamp): Last allowed date for the time index. If None then no bounding in this direction is done.
+
+        Returns:
+            DataFrame: Bounded datum.
+        """
+        if X.index.tz is not None:
+            X = X.set_axis(X.index.tz_convert("UTC").tz_localize(None))
+
+        return X.loc[first_date:last_date]
 
     @staticmethod
     def _strip_trailing_nans(df: DataFrame) -> DataFrame:
@@ -135,31 +211,37 @@ class BaseDataset(ABC):
         df = df[df.index.to_series() <= last_date].copy()
         return df
 
-    def _add_engineered_features(self, df: DataFrame) -> DataFrame:
+    def _add_engineered_features(self, df: DataFrame, rolling_state: Optional[RollingFeatureState] = None) -> DataFrame:
         """
         Generate and add engineered features.
 
         Args:
             df (DataFrame): Data from which features should be engineered.
+            rolling_state (RollingFeatureState, optional): Accumulated rows preceding df, which df is added to, for computing the rolling features of df's rows only. Defaults to None, computing them from df alone.
 
         Returns:
             DataFrame: Data including new features.
         """
         df['day_of_year'] = df.index.day_of_year
 
-        for window_size in self.rolling_window_sizes:
-            for rolling_sum_col in self.rolling_sum_columns:
-                new_col_name = f"{rolling_sum_col}_sum_{window_size}"
-                df[new_col_name] = df[rolling_sum_col].rolling(window=window_size).sum()
-
-            for rolling_mean_col in self.rolling_mean_columns:
-                new_col_name = f"{rolling_mean_col}_mean_{window_size}"
-                df[new_col_name] = df[rolling_mean_col].rolling(window=window_size).mean()
+        # every window of every rolling column is computed at once, and added as a single block of columns
+        if rolling_state is None:
+            rolling_state = self._new_rolling_state()
+        features = rolling_state.update(df)
+        df = concat([df, features], axis=1)
 
         df.dropna(inplace=True)
 
         return df
 
+    def _new_rolling_state(self) -> RollingFeatureState:
+        """Create an empty accumulator of the rolling features of this dataset.
+
+        Returns:
+            RollingFeatureState: Accumulator without any rows.
+        """
+        return RollingFeatureState(self.rolling_sum_columns, self.rolling_mean_columns, self.rolling_window_sizes)
+
     @staticmethod
     def _find_timestamp_boundaries(Xs: List[DataFrame], y: DataFrame) -> Tuple[Timestamp, Timestamp]:
         """Find the first and last timestamp that guarantees data in all datasets.
@@ -49,7 +49,7 @@ class BaseLevelProvider(ABC):
         df_formatted = df_raw.copy()
 
         # Convert index to utc timestamps
-        df_formatted.index = df_formatted.index.map(self._validate_index)
+        df_formatted.index = self._validate_datetime_index(df_formatted.index)
 
         df_formatted = self._coerce_index_to_hourly(df_formatted)
 
@@ -81,13 +81,26 @@ class BaseLevelProvider(ABC):
         Returns:
             pd.DataFrame: Pandas DataFrame with hourly observations (original timestamp is overwritten).
         """
-        df = (
-            df.sort_index()
-            .groupby(by=lambda i: i.replace(minute=0, second=0, microsecond=0))
-            .first()
-        )
+        df = df.sort_index()
+        df = df.groupby(by=df.index.floor("H")).first()
         return df
 
+    @classmethod
+    def _validate_datetime_index(cls, index: pd.Index) -> pd.DatetimeIndex:
+        """Validate that all index values are datetimes in the utc timezone, and if not then convert them.
+
+        Tz aware datetime indexes are converted in bulk. Any other index is converted one value at a time by _validate_index.
+
+        Args:
+            index (pd.Index): Index to validate.
+
+        Returns:
+            pd.DatetimeIndex: Valid index.
+        """
+        if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+            return index.tz_convert(pytz.utc)
+        return pd.DatetimeIndex(index.map(cls._validate_index))
+
     @staticmethod
     def _validate_index(x: Union[str, datetime]) -> datetime:
         """Validate that an index value is of type datetime and in the utc timezone, and if not then convert it.
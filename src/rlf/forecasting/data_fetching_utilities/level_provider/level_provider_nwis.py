@@ -7,23 +7,26 @@ import dataretrieval.nwis as nwis
 import pandas as pd
 
 from rlf.forecasting.data_fetching_utilities.level_provider.base_level_provider import BaseLevelProvider
+from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
 from typing import Optional
 
 
 class LevelProviderNWIS(BaseLevelProvider):
     """Provider class for river level data from the USGS NWIS (National Water Information System)."""
 
-    def __init__(self, gauge_id: str) -> None:
+    def __init__(self, gauge_id: str, level_store: Optional[LevelStore] = None) -> None:
         """Create a new level provider for a specific NWIS gauge.
 
         Args:
             gauge_id (str): A string of the USGS gauge id number.
+            level_store (LevelStore, optional): Local store that fetched levels are read through. Only levels missing from the store are fetched from NWIS. Every fetch goes to NWIS if None. Defaults to None.
         """
         if not isinstance(gauge_id, str):
             logging.warning(f"gauge_id passed to LevelProviderNWIS should be a string but it was not, casting to string: {gauge_id}")
             gauge_id = str(gauge_id)
         self.gauge_id = gauge_id
         self.reference_timestamp: Optional[datetime] = None
+        self.level_store = level_store
 
     def fetch_recent_level(self, num_hours: int) -> pd.DataFrame:
         """Fetch river level data for the most recent num_hours. Dataframe is returned with a tz aware UTC Datetime index.
@@ -44,7 +47,7 @@ class LevelProviderNWIS(BaseLevelProvider):
         start_str = datetime.strftime(start_dt, '%Y-%m-%d')
         end_str = datetime.strftime(end_dt, '%Y-%m-%d') if end_dt else None
 
-        data = self.fetch_level(start=start_str, end=end_str)
+        data = self._fetch_recent_level_range(start_str, end_str)
 
         # Ensure no timesteps exist beyond reference timestamp if one has been provided
         if self.reference_timestamp:
@@ -54,6 +57,18 @@ class LevelProviderNWIS(BaseLevelProvider):
 
         return data
 
+    def _fetch_recent_level_range(self, start: str, end: Optional[str]) -> pd.DataFrame:
+        """Fetch the formatted level data of the date range covering the recent levels requested from fetch_recent_level.
+
+        Args:
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date in the form "yyyy-mm-dd". None gives data til end of collection.
+
+        Returns:
+            pd.DataFrame: Formatted dataframe of fetched data.
+        """
+        return self.fetch_level(start=start, end=end)
+
     def fetch_historical_level(self) -> pd.DataFrame:
         """Fetch all historical level data from the beginning of collection to the most recent available data. Dataframe is returned with a tz aware UTC Datetime index.
 
@@ -76,9 +91,24 @@ class LevelProviderNWIS(BaseLevelProvider):
             df (Pandas dataframe): Formatted dataframe of fetched data
         """
         # Fetch level data
-        df = nwis.get_record(sites=self.gauge_id, service='iv',
-                             start=start, end=end, parameterCd=parameterCd)
+        if self.level_store is None:
+            df = self._fetch_raw_level(start, end, parameterCd)
+        else:
+            df = self.level_store.get(self.gauge_id, parameterCd, lambda s, e: self._fetch_raw_level(s, e, parameterCd), start, end)
+
+        return self._format_raw_level(df, drop_cols, rename_dict)
+
+    def _format_raw_level(self, df: pd.DataFrame, drop_cols: List[str] = ["00060_cd", "site_no"], rename_dict: dict = {"00060": "level"}) -> pd.DataFrame:
+        """Drop and rename columns of raw NWIS level data according to given args, then format it.
 
+        Args:
+            df (pd.DataFrame): Raw dataframe returned by NWIS.
+            drop_cols (list, optional): Column names to drop if they are present. Defaults to ["00060_cd", "site_no"] (useless metadata).
+            rename_dict (dict, optional): Dictionary of default:new defining column renamings. Defaults to {"00060":"level"}.
+
+        Returns:
+            pd.DataFrame: Formatted dataframe.
+        """
         # Filter out any columns that are present in the drop_cols list
         drop_cols = list(filter(lambda x: x in df.columns, drop_cols))
         df.drop(columns=drop_cols, inplace=True)
@@ -91,6 +121,20 @@ class LevelProviderNWIS(BaseLevelProvider):
 
         return df
 
+    def _fetch_raw_level(self, start: str, end: Optional[str], parameterCd: str) -> pd.DataFrame:
+        """Fetch unformatted instant values for the given gauge ID from NWIS.
+
+        Args:
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date in the form "yyyy-mm-dd". None gives data til end of collection.
+            parameterCd (str): Which parameter to fetch data for.
+
+        Returns:
+            pd.DataFrame: Raw dataframe returned by NWIS.
+        """
+        return nwis.get_record(sites=self.gauge_id, service='iv',
+                               start=start, end=end, parameterCd=parameterCd)
+
     def set_timestamp(self, new_timestamp: str) -> None:
         """Set the reference timestamp for the level provider. Fetched "current" levels will be relative to this point in time with no data beyond this point. This is useful for testing
 
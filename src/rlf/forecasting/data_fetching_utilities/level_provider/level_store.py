@@ -0,0 +1,182 @@
+from datetime import timedelta
+import json
+import logging
+import os
+import uuid
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytz
+
+
+DEFAULT_LEVEL_STORE_PATH = os.path.join("data", "levels")
+
+# Minimum number of seconds between two requests for new observations of the same gauge
+DEFAULT_REFRESH_AFTER = 15 * 60
+
+# Key of the store metadata within the parquet schema metadata
+METADATA_KEY = b"rlf_level_store"
+
+
+class LevelStore():
+    """Persistent local store of raw level observations, one parquet file per gauge and parameter.
+
+    The first request for a gauge fetches the requested range from the source. Later requests are served from the store, only fetching observations newer than the last stored one (at most once every refresh_after seconds) and observations older than the earliest range fetched so far. Observations are stored exactly as fetched so that formatting can be applied to any requested range afterwards.
+
+    Files are replaced atomically, so several processes on the same machine can safely share a store directory.
+    """
+
+    def __init__(self, store_dir: str = DEFAULT_LEVEL_STORE_PATH, refresh_after: float = DEFAULT_REFRESH_AFTER) -> None:
+        """Create a LevelStore storing its files in store_dir.
+
+        Args:
+            store_dir (str, optional): Local directory for stored levels. Created if it does not exist. Defaults to DEFAULT_LEVEL_STORE_PATH.
+            refresh_after (float, optional): Seconds during which requests are served from the store without fetching new observations. 0 fetches new observations on every request. Defaults to DEFAULT_REFRESH_AFTER (15 minutes).
+
+        Raises:
+            ValueError: If refresh_after is negative.
+        """
+        if refresh_after < 0:
+            raise ValueError(f"refresh_after must not be negative, got {refresh_after}")
+
+        self.store_dir = store_dir
+        self.refresh_after = refresh_after
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, gauge_id: str, parameterCd: str) -> str:
+        """Get the path of the file storing a gauge parameter.
+
+        Args:
+            gauge_id (str): Gauge id.
+            parameterCd (str): Parameter code.
+
+        Returns:
+            str: Local path of the parquet file.
+        """
+        return os.path.join(self.store_dir, f"{gauge_id}_{parameterCd}.parquet")
+
+    def read(self, gauge_id: str, parameterCd: str) -> Tuple[Optional[pd.DataFrame], Optional[dict]]:
+        """Read the stored observations of a gauge parameter.
+
+        Args:
+            gauge_id (str): Gauge id.
+            parameterCd (str): Parameter code.
+
+        Returns:
+            tuple(pd.DataFrame | None, dict | None): Stored observations with a tz aware UTC Datetime index and the store metadata ("covered_start": earliest start date fetched, "fetched_at": UTC iso timestamp of the last fetch of new observations), or (None, None) if nothing is stored.
+        """
+        try:
+            table = pq.read_table(self._path(gauge_id, parameterCd))
+        except FileNotFoundError:
+            return None, None
+        meta = json.loads(table.schema.metadata[METADATA_KEY])
+        return table.to_pandas(), meta
+
+    def write(self, gauge_id: str, parameterCd: str, df: pd.DataFrame, meta: dict) -> None:
+        """Replace the stored observations of a gauge parameter.
+
+        Args:
+            gauge_id (str): Gauge id.
+            parameterCd (str): Parameter code.
+            df (pd.DataFrame): Observations to store.
+            meta (dict): Store metadata, see read.
+        """
+        table = pa.Table.from_pandas(df)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), METADATA_KEY: json.dumps(meta).encode()})
+
+        path = self._path(gauge_id, parameterCd)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            pq.write_table(table, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert the index of fetched observations to tz aware UTC timestamps.
+
+        Args:
+            df (pd.DataFrame): Fetched observations.
+
+        Returns:
+            pd.DataFrame: Observations with a tz aware UTC Datetime index.
+        """
+        df = df.copy()
+        df.index = pd.to_datetime(df.index, utc=True).rename("datetime")
+        return df
+
+    @staticmethod
+    def _merge(df: pd.DataFrame, other: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Merge two sets of observations, keeping the observations of other where both have the same timestamp.
+
+        Args:
+            df (pd.DataFrame): Stored observations.
+            other (pd.DataFrame, optional): Newly fetched observations.
+
+        Returns:
+            pd.DataFrame: Merged observations sorted by timestamp.
+        """
+        if other is None or other.empty:
+            return df
+        if df.empty:
+            return other
+        merged = pd.concat([df, other])
+        return merged[~merged.index.duplicated(keep="last")].sort_index()
+
+    def get(self,
+            gauge_id: str,
+            parameterCd: str,
+            fetch: Callable[[str, Optional[str]], pd.DataFrame],
+            start: str,
+            end: Optional[str] = None) -> pd.DataFrame:
+        """Get the observations of a gauge parameter for a date range, fetching only the observations missing from the store.
+
+        Args:
+            gauge_id (str): Gauge id.
+            parameterCd (str): Parameter code.
+            fetch (Callable[[str, str | None], pd.DataFrame]): Fetches the raw observations from start to end dates ("yyyy-mm-dd", end None meaning up to the most recent observation).
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date (inclusive) in the form "yyyy-mm-dd". Defaults to None, giving data up to the most recent observation.
+
+        Returns:
+            pd.DataFrame: Raw observations from start to end with a tz aware UTC Datetime index.
+        """
+        df, meta = self.read(gauge_id, parameterCd)
+        now = pd.Timestamp.now(tz=pytz.UTC)
+        start_ts = pd.Timestamp(start, tz=pytz.UTC)
+        end_ts = pd.Timestamp(end, tz=pytz.UTC) + timedelta(days=1) if end is not None else None
+
+        if df is None or meta is None:
+            logging.info(f"Fetching levels for gauge {gauge_id} from {start}")
+            df = self._normalize(fetch(start, None))
+            meta = {"covered_start": start, "fetched_at": now.isoformat()}
+            self.write(gauge_id, parameterCd, df, meta)
+        else:
+            changed = False
+            if start_ts < pd.Timestamp(meta["covered_start"], tz=pytz.UTC):
+                logging.info(f"Fetching levels for gauge {gauge_id} from {start} to {meta['covered_start']}")
+                df = self._merge(self._normalize(fetch(start, meta["covered_start"])), df)
+                meta["covered_start"] = start
+                changed = True
+
+            fetched_at = pd.Timestamp(meta["fetched_at"])
+            if (end_ts is None or end_ts > fetched_at) and (now - fetched_at).total_seconds() >= self.refresh_after:
+                # Fetch from the day before the last observation, as the source may interpret dates in the gauge's local time
+                last = df.index.max() if not df.empty else pd.Timestamp(meta["covered_start"], tz=pytz.UTC)
+                since = (last - timedelta(days=1)).strftime("%Y-%m-%d")
+                logging.info(f"Fetching levels for gauge {gauge_id} from {since}")
+                df = self._merge(df, self._normalize(fetch(since, None)))
+                meta["fetched_at"] = now.isoformat()
+                changed = True
+
+            if changed:
+                self.write(gauge_id, parameterCd, df, meta)
+
+        in_range = df.index >= start_ts
+        if end_ts is not None:
+            in_range &= df.index < end_ts
+        return df[in_range].copy()
@@ -0,0 +1,130 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import dataretrieval.nwis as nwis
+import pandas as pd
+
+from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
+
+
+# Number of sites requested from NWIS in a single call
+DEFAULT_GAUGE_BATCH_SIZE = 100
+
+
+class MultiGaugeLevelProvider():
+    """Fetches recent river level data for many NWIS gauges at once, with one NWIS request per batch of gauges rather than one per gauge.
+
+    Each gauge is served through a GaugeLevelProvider view (see provider) which can be used anywhere a LevelProviderNWIS can, e.g. in CatchmentData. The first recent level request of any view fetches the same date range for every gauge, and later requests of other views for that range are served from the shared result.
+    """
+
+    def __init__(self,
+                 gauge_ids: List[str],
+                 batch_size: int = DEFAULT_GAUGE_BATCH_SIZE,
+                 level_store: Optional[LevelStore] = None) -> None:
+        """Create a new level provider for a set of NWIS gauges.
+
+        Args:
+            gauge_ids (list[str]): USGS gauge id numbers.
+            batch_size (int, optional): Number of gauges requested from NWIS in a single call. Defaults to DEFAULT_GAUGE_BATCH_SIZE (100).
+            level_store (LevelStore, optional): Local store that historical levels of the gauges are read through. Defaults to None.
+
+        Raises:
+            ValueError: If batch_size is less than 1.
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
+        self.gauge_ids = [str(gauge_id) for gauge_id in gauge_ids]
+        self.batch_size = batch_size
+        self.level_store = level_store
+        self._results: Dict[Tuple[str, Optional[str], str], Dict[str, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def provider(self, gauge_id: str) -> "GaugeLevelProvider":
+        """Get the level provider of one of the gauges.
+
+        Args:
+            gauge_id (str): A string of the USGS gauge id number.
+
+        Raises:
+            ValueError: If gauge_id is not one of the gauges of this provider.
+
+        Returns:
+            GaugeLevelProvider: Level provider of the gauge, serving recent levels from the shared multi gauge requests.
+        """
+        if str(gauge_id) not in self.gauge_ids:
+            raise ValueError(f"Gauge {gauge_id} is not one of the gauges of this provider")
+        return GaugeLevelProvider(str(gauge_id), self)
+
+    def fetch_raw_level(self, gauge_id: str, start: str, end: Optional[str], parameterCd: str = '00060') -> pd.DataFrame:
+        """Get the unformatted instant values of a gauge from start to end, fetching the values of all gauges if the range was not fetched yet.
+
+        Args:
+            gauge_id (str): A string of the USGS gauge id number.
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date in the form "yyyy-mm-dd". None gives data til end of collection.
+            parameterCd (str, optional): Which parameter to fetch data for. Defaults to '00060' indicated mean level.
+
+        Returns:
+            pd.DataFrame: Raw dataframe returned by NWIS for the gauge, with a tz aware UTC Datetime index. Empty if NWIS returned no data for the gauge.
+        """
+        key = (start, end, parameterCd)
+        # Hold the lock while fetching so that concurrent views wait for a single set of requests
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = self._fetch_all(start, end, parameterCd)
+            results = self._results[key]
+
+        if gauge_id not in results:
+            return pd.DataFrame(columns=[parameterCd], index=pd.DatetimeIndex([], tz="UTC", name="datetime"), dtype=float)
+        return results[gauge_id].copy()
+
+    def _fetch_all(self, start: str, end: Optional[str], parameterCd: str) -> Dict[str, pd.DataFrame]:
+        """Fetch the instant values of all gauges from NWIS, batch_size gauges per request.
+
+        Args:
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date in the form "yyyy-mm-dd". None gives data til end of collection.
+            parameterCd (str): Which parameter to fetch data for.
+
+        Returns:
+            dict[str, pd.DataFrame]: Raw dataframe of each gauge NWIS returned data for.
+        """
+        results = {}
+        for i in range(0, len(self.gauge_ids), self.batch_size):
+            batch = self.gauge_ids[i:i + self.batch_size]
+            logging.info(f"Fetching levels from {start} to {end} for {len(batch)} gauges")
+            df = nwis.get_record(sites=batch, service='iv', start=start, end=end, parameterCd=parameterCd, multi_index=False)
+            if df.empty:
+                continue
+            for gauge_id, gauge_df in df.groupby("site_no", sort=False):
+                results[str(gauge_id)] = gauge_df
+        return results
+
+
+class GaugeLevelProvider(LevelProviderNWIS):
+    """View of a single gauge of a MultiGaugeLevelProvider. Recent levels are served from the shared multi gauge requests, everything else is fetched for this gauge alone as by LevelProviderNWIS."""
+
+    def __init__(self, gauge_id: str, multi_gauge_provider: MultiGaugeLevelProvider) -> None:
+        """Create a view of a single gauge. Generally created through MultiGaugeLevelProvider.provider.
+
+        Args:
+            gauge_id (str): A string of the USGS gauge id number.
+            multi_gauge_provider (MultiGaugeLevelProvider): Provider fetching the recent levels of all gauges.
+        """
+        super().__init__(gauge_id, level_store=multi_gauge_provider.level_store)
+        self.multi_gauge_provider = multi_gauge_provider
+
+    def _fetch_recent_level_range(self, start: str, end: Optional[str]) -> pd.DataFrame:
+        """Get the formatted level data of the date range covering the recent levels requested from fetch_recent_level, from the shared multi gauge requests.
+
+        Args:
+            start (str): Start date in the form "yyyy-mm-dd".
+            end (str, optional): End date in the form "yyyy-mm-dd". None gives data til end of collection.
+
+        Returns:
+            pd.DataFrame: Formatted dataframe of fetched data.
+        """
+        return self._format_raw_level(self.multi_gauge_provider.fetch_raw_level(self.gauge_id, start, end))
@@ -46,6 +46,42 @@ class BaseAPIAdapter(ABC):
         """
         raise NotImplementedError
 
+    def get_historical_batch(self,
+                             coordinates: List[Coordinate],
+                             start_date: str,
+                             end_date: str,
+                             columns: Optional[List[str]] = None) -> List[Response]:
+        """Fetch historical/archived data for several locations. Adapters for APIs that accept multiple locations per request should override this to make a single request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            start_date (str): The starting date for the requested data. In the format "YYYY-MM-DD".
+            end_date (str): The ending date for the requested data. In the format "YYYY-MM-DD".
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[Response]: One response payload per coordinate, in the same order as coordinates.
+        """
+        return [self.get_historical(coordinate=coordinate, start_date=start_date, end_date=end_date, columns=columns) for coordinate in coordinates]
+
+    def get_current_batch(self,
+                          coordinates: List[Coordinate],
+                          past_days: int = 92,
+                          forecast_days: int = 16,
+                          columns: Optional[List[str]] = None) -> List[Response]:
+        """Fetch current/forecasted data for several locations. Adapters for APIs that accept multiple locations per request should override this to make a single request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            past_days (int, optional): How many days into the past to fetch data for. Defaults to 92 (OpenMeteo max value).
+            forecast_days (int, optional): How many days into the future to fetch data for. Defaults to 16 (OpenMeteo max value).
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[Response]: One response payload per coordinate, in the same order as coordinates.
+        """
+        return [self.get_current(coordinate=coordinate, past_days=past_days, forecast_days=forecast_days, columns=columns) for coordinate in coordinates]
+
     @abstractmethod
     def get_index_parameter(self) -> str:
         """Get the index parameter which is a field in the hourly section of the response that can be used as an index in a DataFrame (must be in ISO date format).
@@ -0,0 +1,41 @@
+import threading
+import time
+
+
+class RateLimiter():
+    """Thread safe token bucket rate limiter used to throttle requests to an API."""
+
+    def __init__(self, rate: float, capacity: int = 1) -> None:
+        """Create a token bucket which refills at rate tokens per second and holds at most capacity tokens.
+
+        Args:
+            rate (float): How many tokens are added to the bucket per second. Must be positive.
+            capacity (int, optional): Maximum number of tokens the bucket can hold (i.e. the allowed burst size). Defaults to 1.
+
+        Raises:
+            ValueError: If rate or capacity are not positive.
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {capacity}")
+
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a single token from the bucket, blocking until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+            self._last_refill = now
+
+            # Reserve the token now (possibly going into debt) so that concurrent callers queue up in order
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            time.sleep(wait)
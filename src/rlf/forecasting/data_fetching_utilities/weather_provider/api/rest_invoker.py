@@ -1,15 +1,141 @@
-import requests
+from dataclasses import dataclass, field
+import threading
+import time
 from typing import Optional
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.exceptions import RestInvokerException
 
 
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class RequestTimings:
+    """Cumulative timing counters for the requests made through a PooledSession.
+
+    Args:
+        num_requests (int): Number of API calls made (retries of a single call are counted once).
+        num_connections (int): Number of new connections opened. Much lower than num_requests when connections are reused.
+        connect_seconds (float): Time spent resolving hostnames and opening TCP connections.
+        tls_seconds (float): Time spent in TLS handshakes.
+        total_seconds (float): Total wall time of all API calls, including retries and reading the response body.
+    """
+    num_requests: int = 0
+    num_connections: int = 0
+    connect_seconds: float = 0.0
+    tls_seconds: float = 0.0
+    total_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_connection(self, connect_seconds: float, tls_seconds: float) -> None:
+        """Record the opening of a new connection.
+
+        Args:
+            connect_seconds (float): Time spent on name resolution and the TCP connection.
+            tls_seconds (float): Time spent on the TLS handshake (0 for plain HTTP).
+        """
+        with self._lock:
+            self.num_connections += 1
+            self.connect_seconds += connect_seconds
+            self.tls_seconds += tls_seconds
+
+    def record_request(self, total_seconds: float) -> None:
+        """Record a completed API call.
+
+        Args:
+            total_seconds (float): Wall time of the call.
+        """
+        with self._lock:
+            self.num_requests += 1
+            self.total_seconds += total_seconds
+
+
+def _timed_connection_class(connection_class: type, timings: RequestTimings) -> type:
+    """Build a urllib3 connection class that reports connection setup times to timings.
+
+    Args:
+        connection_class (type): HTTPConnection or HTTPSConnection.
+        timings (RequestTimings): Counters to report to.
+
+    Returns:
+        type: Subclass of connection_class.
+    """
+    class TimedConnection(connection_class):  # type: ignore[valid-type,misc]
+        def _new_conn(self):
+            start = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                self._connect_seconds = time.perf_counter() - start
+
+        def connect(self):
+            self._connect_seconds = 0.0
+            start = time.perf_counter()
+            super().connect()
+            elapsed = time.perf_counter() - start
+            timings.record_connection(self._connect_seconds, elapsed - self._connect_seconds)
+
+    return TimedConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report connection setup times to a RequestTimings instance."""
+
+    def __init__(self, timings: RequestTimings, **kwargs) -> None:
+        self._timings = timings
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("TimedHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": _timed_connection_class(HTTPConnection, self._timings)}),
+            "https": type("TimedHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": _timed_connection_class(HTTPSConnection, self._timings)}),
+        }
+
+
+class PooledSession(requests.Session):
+    """A requests Session with keep-alive connection pooling, retries with exponential backoff and timing counters."""
+
+    def __init__(self, pool_size: int = 10, max_retries: int = 3, backoff_factor: float = 0.5) -> None:
+        """Create a PooledSession.
+
+        Args:
+            pool_size (int, optional): Maximum number of connections kept alive per host. Should be at least the number of threads sharing the session. Defaults to 10.
+            max_retries (int, optional): How many times to retry a request that failed to connect or returned one of RETRY_STATUS_CODES. Defaults to 3.
+            backoff_factor (float, optional): Retries sleep for backoff_factor * 2 ** (retry number - 1) seconds (or as long as a Retry-After header asks). Defaults to 0.5.
+        """
+        super().__init__()
+        self.timings = RequestTimings()
+
+        retry = Retry(total=max_retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=RETRY_STATUS_CODES,
+                      allowed_methods=frozenset(["GET"]),
+                      raise_on_status=False)
+        adapter = _TimedHTTPAdapter(self.timings, pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+
 class RestInvoker():
     """Invoke a REST API
     """
 
-    def __init__(self, protocol: Optional[str] = None, hostname: Optional[str] = None, version: Optional[str] = None, ssl_verify: bool = True) -> None:
+    def __init__(self,
+                 protocol: Optional[str] = None,
+                 hostname: Optional[str] = None,
+                 version: Optional[str] = None,
+                 ssl_verify: bool = True,
+                 session: Optional[PooledSession] = None,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 5.0) -> None:
         """Invoke a REST API using the requests library
 
         Args:
@@ -17,11 +143,25 @@ class RestInvoker():
             hostname (str, optional): The hostname to use. Defaults to None.
             version (str, optional): The version to use. Defaults to None.
             ssl_verify (bool, optional):  Option to verify the SSL certificate. Defaults to True.
+            session (PooledSession, optional): Session to make requests through. Share a session between invokers to reuse its connections. A new one is created if None. Defaults to None.
+            connect_timeout (float, optional): Seconds to wait for a connection to be established. Defaults to 5.0.
+            read_timeout (float, optional): Seconds to wait between bytes received from the server. Defaults to 5.0.
         """
         self._protocol = protocol
         self._hostname = hostname
         self._version = version
         self._ssl_verify = ssl_verify
+        self._session = session if session is not None else PooledSession()
+        self._timeout = (connect_timeout, read_timeout)
+
+    @property
+    def timings(self) -> RequestTimings:
+        """Timing counters for all requests made through this invoker's session.
+
+        Returns:
+            RequestTimings: The session's timing counters.
+        """
+        return self._session.timings
 
     def _apiCall(self, method: str, path: str, parameters: Optional[dict] = None, data: Optional[dict] = None) -> Response:
         """Perform an HTTP request
@@ -46,14 +186,15 @@ class RestInvoker():
         if path is not None:
             url += f"{path}"
 
+        start = time.perf_counter()
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
                 verify=self._ssl_verify,
                 params=parameters,
                 json=data,
-                timeout=5,
+                timeout=self._timeout,
                 headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/107.0.0.0 Safari/537.36 Edg/107.0.1418.52"})
             if response.status_code == 200:
                 return Response(status_code=response.status_code,
@@ -63,10 +204,12 @@ class RestInvoker():
                                 data=response.json())
             else:
                 raise RestInvokerException(
-                    f"Error calling the API: {response.reason} ({response.status_code}) \n {response.json()}")
+                    f"Error calling the API: {response.reason} ({response.status_code}) \n {response.text}")
 
         except requests.exceptions.RequestException as e:
             raise RestInvokerException("Error: {}".format(e)) from e
+        finally:
+            self._session.timings.record_request(time.perf_counter() - start)
 
     def get(self, path: str, parameters: Optional[dict] = None) -> Response:
         """Perform a GET request
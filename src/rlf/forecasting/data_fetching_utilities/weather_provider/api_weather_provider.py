@@ -1,9 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
-import time
-from typing import List, Optional
+from typing import Callable, List, Optional
 
-from pandas import DataFrame
+import numpy as np
+from pandas import DataFrame, Series
 import pytz
 
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
@@ -11,6 +12,7 @@ from rlf.forecasting.data_fetching_utilities.weather_provider.api.base_api_adapt
     BaseAPIAdapter
 )
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.rate_limiter import RateLimiter
 from rlf.forecasting.data_fetching_utilities.weather_provider.base_weather_provider import (
     BaseWeatherProvider
 )
@@ -33,21 +35,66 @@ class APIWeatherProvider(BaseWeatherProvider):
 
     def __init__(self,
                  coordinates: List[Coordinate],
-                 api_adapter: BaseAPIAdapter = OpenMeteoAdapter()) -> None:
+                 api_adapter: BaseAPIAdapter = OpenMeteoAdapter(),
+                 max_workers: int = 1,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 batch_size: int = 1) -> None:
         """Create an APIWeatherProvider for the given list of coordinates.
 
         Args:
             coordinates (list[Coordinate(longitude: float, latitude: float)]): Named tuple WSG84 coordinates: (longitude, latitude).
             api_adapter (BaseAPIAdapter, optional): An adapter for a weather API. Defaults to OpenMeteoAdapter().
+            max_workers (int, optional): Maximum number of requests to have in flight at once. Coordinates are fetched serially if set to 1. Defaults to 1.
+            rate_limiter (RateLimiter, optional): Rate limiter shared by all requests made by this provider. Takes precedence over sleep_duration. Defaults to None.
+            batch_size (int, optional): Maximum number of coordinates to request from the API in a single call. Defaults to 1.
         """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
         self.coordinates = coordinates
         self.api_adapter = api_adapter
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.batch_size = batch_size
+
+    def _fetch_for_all_coordinates(self, fetch_datums: Callable[[List[Coordinate]], List[WeatherDatum]], sleep_duration: float) -> List[WeatherDatum]:
+        """Call fetch_datums for every batch of up to batch_size coordinates, running up to max_workers requests concurrently.
+
+        Args:
+            fetch_datums (Callable[[list[Coordinate]], list[WeatherDatum]]): Function fetching the datums for a batch of coordinates with a single request.
+            sleep_duration (float): Minimum number of seconds between the start of consecutive requests. Ignored if the provider has a rate_limiter.
+
+        Returns:
+            list[WeatherDatum]: One datum per coordinate, in the same order as self.coordinates.
+        """
+        rate_limiter = self.rate_limiter
+        if rate_limiter is None and sleep_duration > 0:
+            rate_limiter = RateLimiter(rate=1 / sleep_duration)
+
+        def throttled_fetch_datums(coordinates: List[Coordinate]) -> List[WeatherDatum]:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            return fetch_datums(coordinates)
+
+        batches = [self.coordinates[i:i + self.batch_size] for i in range(0, len(self.coordinates), self.batch_size)]
+
+        if self.max_workers == 1:
+            batched_datums = [throttled_fetch_datums(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                batched_datums = list(executor.map(throttled_fetch_datums, batches))
+
+        return [datum for datums in batched_datums for datum in datums]
 
     def _build_hourly_parameters_from_response(self, hourly_parameters_response: dict, tz: str) -> DataFrame:
         index_parameter = self.api_adapter.get_index_parameter()
-        df = DataFrame(hourly_parameters_response)
-        df.index = df[index_parameter].map(lambda x: datetime.fromisoformat(x).replace(tzinfo=pytz.timezone(tz)).astimezone(pytz.timezone("UTC")))
-        df.drop(columns=[index_parameter], inplace=True)
+        # parameters are parsed straight into float32 rather than through float64 columns, with missing values (None) as NaN
+        df = DataFrame({parameter: np.asarray(values, dtype=np.float32)
+                        for parameter, values in hourly_parameters_response.items() if parameter != index_parameter})
+        times = Series(hourly_parameters_response[index_parameter], name=index_parameter)
+        df.index = times.map(lambda x: datetime.fromisoformat(x).replace(tzinfo=pytz.timezone(tz)).astimezone(pytz.timezone("UTC")))
         return df
 
     def build_datum_from_response(self, response: Response, coordinate: Coordinate, precision: int = 5) -> WeatherDatum:
@@ -136,6 +183,33 @@ class APIWeatherProvider(BaseWeatherProvider):
 
         return datum
 
+    def fetch_historical_datums(self,
+                                coordinates: List[Coordinate],
+                                start_date: str = DEFAULT_START_DATE,
+                                end_date: str = DEFAULT_END_DATE,
+                                columns: Optional[List[str]] = None) -> List[WeatherDatum]:
+        """
+        Fetch historical weather for several coordinates with a single batched request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            start_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_START_DATE.
+            end_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_END_DATE.
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+
+        Returns:
+            list[WeatherDatum]: One Datum per coordinate, in the same order as coordinates.
+        """
+        responses = self.api_adapter.get_historical_batch(coordinates=coordinates, start_date=start_date, end_date=end_date, columns=columns)
+
+        datums = []
+        for response, coordinate in zip(responses, coordinates):
+            datum = self.build_datum_from_response(response, coordinate)
+            datum.hourly_parameters.columns = self._remap_historical_parameters_from_adapter(datum.hourly_parameters.columns)
+            datums.append(datum)
+
+        return datums
+
     def fetch_historical(self,
                          columns: Optional[List[str]] = None,
                          start_date: str = DEFAULT_START_DATE,
@@ -147,7 +221,7 @@ class APIWeatherProvider(BaseWeatherProvider):
             columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
             start_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_START_DATE.
             end_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_END_DATE.
-            sleep_duration (float, optional): How many seconds to sleep after each query. Helps prevent throttling. Defaults to 0.0.
+            sleep_duration (float, optional): Minimum number of seconds between the start of consecutive queries. Helps prevent throttling. Ignored if the provider has a rate_limiter. Defaults to 0.0.
 
         Returns:
             list[WeatherDatum]: A list of WeatherDatum objects containing the weather data and metadata about the locations.
@@ -157,12 +231,15 @@ class APIWeatherProvider(BaseWeatherProvider):
         if columns:
             columns = self._remap_historical_parameters_to_adapter(columns)
 
-        for coordinate in self.coordinates:
-            datum = self.fetch_historical_datum(coordinate=coordinate, start_date=start_date, end_date=end_date, columns=columns)
+        def fetch_datums(coordinates: List[Coordinate]) -> List[WeatherDatum]:
+            if len(coordinates) == 1:
+                return [self.fetch_historical_datum(coordinate=coordinates[0], start_date=start_date, end_date=end_date, columns=columns)]
+            return self.fetch_historical_datums(coordinates=coordinates, start_date=start_date, end_date=end_date, columns=columns)
+
+        for datum in self._fetch_for_all_coordinates(fetch_datums, sleep_duration):
             coord = Coordinate(datum.longitude, datum.latitude)
             if coord not in datums:
                 datums[coord] = datum
-            time.sleep(sleep_duration)
         return list(datums.values())
 
     def fetch_current_datum(self, coordinate: Coordinate, columns: Optional[List[str]] = None) -> WeatherDatum:
@@ -183,23 +260,42 @@ class APIWeatherProvider(BaseWeatherProvider):
 
         return datum
 
+    def fetch_current_datums(self, coordinates: List[Coordinate], columns: Optional[List[str]] = None) -> List[WeatherDatum]:
+        """Fetch current weather for several coordinates with a single batched request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+
+        Returns:
+            list[WeatherDatum]: One Datum per coordinate, in the same order as coordinates.
+        """
+        responses = self.api_adapter.get_current_batch(coordinates=coordinates, columns=columns)
+
+        datums = []
+        for response, coordinate in zip(responses, coordinates):
+            datum = self.build_datum_from_response(response, coordinate)
+            datum.hourly_parameters.columns = self._remap_current_parameters_from_adapter(datum.hourly_parameters.columns)
+            datums.append(datum)
+
+        return datums
+
     def fetch_current(self, columns: Optional[List[str]] = None, sleep_duration: float = 0.0) -> List[WeatherDatum]:
         """Fetch current weather for all coordinates.
 
         Args:
             columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
-            sleep_duration (float, optional): How many seconds to sleep after each query. Helps prevent throttling. Defaults to 0.0.
+            sleep_duration (float, optional): Minimum number of seconds between the start of consecutive queries. Helps prevent throttling. Ignored if the provider has a rate_limiter. Defaults to 0.0.
 
         Returns:
             list[WeatherDatum]: A list of WeatherDatums containing the weather data about the location.
         """
-        datums = []
-
         if columns:
             columns = self._remap_current_parameters_to_adapter(columns)
 
-        for coordinate in self.coordinates:
-            datum = self.fetch_current_datum(coordinate=coordinate, columns=columns)
-            datums.append(datum)
-            time.sleep(sleep_duration)
-        return datums
+        def fetch_datums(coordinates: List[Coordinate]) -> List[WeatherDatum]:
+            if len(coordinates) == 1:
+                return [self.fetch_current_datum(coordinate=coordinates[0], columns=columns)]
+            return self.fetch_current_datums(coordinates=coordinates, columns=columns)
+
+        return self._fetch_for_all_coordinates(fetch_datums, sleep_duration)
@@ -1,5 +1,6 @@
 from datetime import datetime
 import logging
+import numpy as np
 from openmeteo_sdk import (
     WeatherApiResponse, VariablesWithTime, Unit
 )
@@ -36,15 +37,29 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
 
     def __init__(self,
                  coordinates: List[Coordinate],
-                 api_adapter: BaseAPIAdapter = OpenMeteoECMWFAdapter()) -> None:
+                 api_adapter: BaseAPIAdapter = OpenMeteoECMWFAdapter(),
+                 batch_size: int = 1) -> None:
         """Create an APIWeatherProvider for the given list of coordinates.
 
         Args:
             coordinates (list[Coordinate(longitude: float, latitude: float)]): Named tuple WSG84 coordinates: (longitude, latitude).
             api_adapter (BaseAPIAdapter, optional): An adapter for a weather API. Defaults to OpenMeteoECMWFAdapter().
+            batch_size (int, optional): Maximum number of coordinates to request from the API in a single call. Defaults to 1.
         """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
         self.coordinates = coordinates
         self.api_adapter = api_adapter
+        self.batch_size = batch_size
+
+    def _batched_coordinates(self) -> List[List[Coordinate]]:
+        """Split the coordinates into consecutive batches of up to batch_size coordinates.
+
+        Returns:
+            list[list[Coordinate]]: Batches of coordinates, in the same order as self.coordinates.
+        """
+        return [self.coordinates[i:i + self.batch_size] for i in range(0, len(self.coordinates), self.batch_size)]
 
     def _build_units_dict_from_response(self, hourly_parameters_response: VariablesWithTime, columns: Optional[List[str]] = get_hourly_parameters("ecmwf_shared")) -> dict:
         if columns is None:
@@ -82,7 +97,8 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
         hourly_data = {}
 
         for i in range(hourly_parameters_response.VariablesLength()):
-            hourly_data[columns[i]] = hourly_parameters_response.Variables(i).ValuesAsNumpy()
+            # the SDK already decodes values as float32, which is kept without a copy
+            hourly_data[columns[i]] = np.asarray(hourly_parameters_response.Variables(i).ValuesAsNumpy(), dtype=np.float32)
 
         hourly_data[index_parameter] = date_range(
             start=to_datetime(hourly_parameters_response.Time(), unit="s"),
@@ -183,6 +199,30 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
 
         return datum
 
+    def fetch_historical_datums(self,
+                                coordinates: List[Coordinate],
+                                start_date: str = DEFAULT_START_DATE,
+                                end_date: str = DEFAULT_END_DATE,
+                                columns: Optional[List[str]] = get_hourly_parameters("ecmwf_shared")) -> List[WeatherDatum]:
+        """
+        Fetch historical weather for several coordinates with a single batched request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            start_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_START_DATE.
+            end_date (str, optional): iso8601 format YYYY-MM-DD. Defaults to DEFAULT_END_DATE.
+            columns (List): List of columns, defaults to all shared parameters
+
+        Returns:
+            list[WeatherDatum]: One Datum per coordinate, in the same order as coordinates.
+        """
+        if columns is None:
+            columns = get_hourly_parameters("ecmwf_shared")
+
+        responses = self.api_adapter.get_historical_batch(coordinates=coordinates, start_date=start_date, end_date=end_date, columns=columns)
+
+        return [self.build_datum_from_response(response, coordinate, columns) for response, coordinate in zip(responses, coordinates)]
+
     def fetch_historical(self,
                          columns: Optional[List[str]] = get_hourly_parameters("ecmwf_shared"),
                          start_date: str = DEFAULT_START_DATE,
@@ -201,11 +241,15 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
         """
         datums = {}
 
-        for coordinate in self.coordinates:
-            datum = self.fetch_historical_datum(coordinate=coordinate, start_date=start_date, end_date=end_date, columns=columns)
-            coord = Coordinate(datum.longitude, datum.latitude)
-            if coord not in datums:
-                datums[coord] = datum
+        for coordinates in self._batched_coordinates():
+            if len(coordinates) == 1:
+                batch_datums = [self.fetch_historical_datum(coordinate=coordinates[0], start_date=start_date, end_date=end_date, columns=columns)]
+            else:
+                batch_datums = self.fetch_historical_datums(coordinates=coordinates, start_date=start_date, end_date=end_date, columns=columns)
+            for datum in batch_datums:
+                coord = Coordinate(datum.longitude, datum.latitude)
+                if coord not in datums:
+                    datums[coord] = datum
             time.sleep(sleep_duration)
         return list(datums.values())
 
@@ -228,6 +272,23 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
 
         return datum
 
+    def fetch_current_datums(self, coordinates: List[Coordinate], columns: Optional[List[str]] = get_hourly_parameters("ecmwf_shared")) -> List[WeatherDatum]:
+        """Fetch current weather for several coordinates with a single batched request.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            columns (List): List of columns, defaults to all shared parameters
+
+        Returns:
+            list[WeatherDatum]: One Datum per coordinate, in the same order as coordinates.
+        """
+        if columns is None:
+            columns = get_hourly_parameters("ecmwf_shared")
+
+        responses = self.api_adapter.get_current_batch(coordinates=coordinates, columns=columns)
+
+        return [self.build_datum_from_response(response, coordinate, columns) for response, coordinate in zip(responses, coordinates)]
+
     def fetch_current(self, columns: Optional[List[str]] = get_hourly_parameters("ecmwf_shared"), sleep_duration: float = 0.0) -> List[WeatherDatum]:
         """Fetch current weather for all coordinates.
 
@@ -240,8 +301,10 @@ class APIWeatherProviderECMWF(BaseWeatherProvider):
         """
         datums = []
 
-        for coordinate in self.coordinates:
-            datum = self.fetch_current_datum(coordinate=coordinate, columns=columns)
-            datums.append(datum)
+        for coordinates in self._batched_coordinates():
+            if len(coordinates) == 1:
+                datums.append(self.fetch_current_datum(coordinate=coordinates[0], columns=columns))
+            else:
+                datums.extend(self.fetch_current_datums(coordinates=coordinates, columns=columns))
             time.sleep(sleep_duration)
         return datums
@@ -23,24 +23,39 @@ class AWSWeatherProvider(BaseWeatherProvider):
     def __init__(self,
                  coordinates: List[Coordinate],
                  aws_dispatcher: AWSDispatcher,
-                 current_timestamp: Optional[str] = None) -> None:
+                 current_timestamp: Optional[str] = None,
+                 max_workers: int = 16,
+                 catchment_name: Optional[str] = None) -> None:
         """Create an APIWeatherProvider for the given list of coordinates.
 
         Args:
             coordinates (list[Coordinate(longitude: float, latitude: float)]): Named tuple WSG84 coordinates: (longitude, latitude).
             aws_dispatcher (AWSDispatcher): The AWSDispatcher instance from which data will be drawn.
             current_timestamp (str): The 'current' timestamp for which current data will be fetched. Expected in the form "YY-mm-DD_HH-MM" in UTC. Expected to match a directory in the current weather dir for the AWSProvider.
+            max_workers (int, optional): Maximum number of coordinates to download at once. Coordinates are downloaded serially if set to 1. Defaults to 16.
+            catchment_name (str, optional): If set, data is read from the consolidated store of this catchment (as written by AWSWeatherUploader with the same catchment_name) instead of one datum per coordinate. Defaults to None.
         """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+
         self.coordinates = coordinates
         self.aws_dispatcher = aws_dispatcher
         self.current_timestamp = current_timestamp
+        self.max_workers = max_workers
+        self.catchment_name = catchment_name
 
-    def download_datums_from_aws(self, dir_path: str, columns: Optional[List[str]] = None) -> List[WeatherDatum]:
-        """Download datums from AWS. Assumes datums exist in expected location.
+    def download_datums_from_aws(self,
+                                 dir_path: str,
+                                 columns: Optional[List[str]] = None,
+                                 start_datetime: Optional[datetime] = None,
+                                 end_datetime: Optional[datetime] = None) -> List[WeatherDatum]:
+        """Download datums from AWS, up to max_workers coordinates at a time, or all at once from the catchment store if the provider has a catchment_name. Assumes datums exist in expected location.
 
         Args:
             dir_path (str): The directory path relative to the working directory of the aws_dispatcher.
             columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+            start_datetime (datetime, optional): Only fetch data at or after this time. Defaults to None.
+            end_datetime (datetime, optional): Only fetch data at or before this time. Defaults to None.
 
         Raises:
             FileNotFoundError: If no datum can be found at the provided weather
@@ -48,12 +63,20 @@ class AWSWeatherProvider(BaseWeatherProvider):
         Returns:
             list[WeatherDatum]: A list of WeatherDatum objects containing the weather data and metadata about the locations.
         """
-        datums = []
-        for coordinate in self.coordinates:
-            datum = self.aws_dispatcher.download_datum(
-                coordinate, columns=columns, dir_path=dir_path)
-            datums.append(datum)
-        return datums
+        if self.catchment_name is not None:
+            return self.aws_dispatcher.download_catchment(self.catchment_name,
+                                                          coordinates=self.coordinates,
+                                                          columns=columns,
+                                                          dir_path=dir_path,
+                                                          start_datetime=start_datetime,
+                                                          end_datetime=end_datetime)
+
+        return self.aws_dispatcher.download_datums(self.coordinates,
+                                                   columns=columns,
+                                                   dir_path=dir_path,
+                                                   start_datetime=start_datetime,
+                                                   end_datetime=end_datetime,
+                                                   max_workers=self.max_workers)
 
     def fetch_historical(self,
                          columns: Optional[List[str]] = None,
@@ -74,9 +97,6 @@ class AWSWeatherProvider(BaseWeatherProvider):
         if sleep_duration != 0.0:
             raise ValueError("sleep_duration is not supported (and generally not needed) for aws_weather_provider")
 
-        # don't use the AWS dispatcher to filter columns since the remappings can be an issue
-        datums = self.download_datums_from_aws(dir_path="historical", columns=None)
-
         if start_date is not None:
             start_dt = datetime.strptime(
                 start_date, '%Y-%m-%d').replace(tzinfo=pytz.UTC)
@@ -87,13 +107,15 @@ class AWSWeatherProvider(BaseWeatherProvider):
                 end_date, '%Y-%m-%d').replace(tzinfo=pytz.UTC)
         else:
             end_dt = None
+
+        # don't use the AWS dispatcher to filter columns since the remappings can be an issue, but let it filter the time range
+        datums = self.download_datums_from_aws(dir_path="historical", columns=None, start_datetime=start_dt, end_datetime=end_dt)
+
         for datum in datums:
             if columns:
                 datum.hourly_parameters.columns = self._remap_historical_parameters_from_adapter(datum.hourly_parameters.columns)
                 columns = self._remap_historical_parameters_from_adapter(columns)
                 datum.hourly_parameters = datum.hourly_parameters[columns]
-            # mypy doesn't like the datetime objects as slices
-            datum.hourly_parameters = datum.hourly_parameters[start_dt:end_dt]  # type:ignore[misc]
             datum.hourly_parameters.columns = self._remap_historical_parameters_from_adapter(datum.hourly_parameters.columns)
 
         return datums
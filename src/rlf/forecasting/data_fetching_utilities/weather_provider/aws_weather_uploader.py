@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import datetime, timedelta
+import logging
 from typing import List, Optional
 
 import pandas as pd
@@ -8,6 +9,9 @@ from rlf.aws_dispatcher import AWSDispatcher
 from rlf.forecasting.data_fetching_utilities.weather_provider.base_weather_provider import (
     BaseWeatherProvider
 )
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import (
+    WeatherDatum
+)
 
 DEFAULT_START_DATE = "2022-01-01"
 DEFAULT_END_DATE = datetime.now().strftime("%Y-%m-%d")
@@ -34,8 +38,12 @@ class AWSWeatherUploader():
                           end_date: str = DEFAULT_END_DATE,
                           columns: Optional[List[str]] = None,
                           years_per_query: int = 2,
-                          sleep_duration: int = 0) -> None:
-        """Refetch historical datums and store this updated data in AWS. This will overwrite whatever data was previously stored for the current river.
+                          sleep_duration: int = 0,
+                          incremental: bool = False,
+                          catchment_name: Optional[str] = None) -> None:
+        """Refetch historical datums and store this updated data in AWS. This will overwrite whatever data was previously stored for the current river, unless incremental is set.
+
+        In incremental mode the last timestamp already stored for each coordinate is looked up and only data after it is fetched. The new rows are appended to the stored datum as a new partition file without rewriting existing data. Coordinates without any stored data are fetched from start_date.
 
         Args:
             start_date (str, optional): iso8601 format YYYY-MM-DD. Expected in UTC. Defaults to DEFAULT_START_DATE.
@@ -43,52 +51,118 @@ class AWSWeatherUploader():
             columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
             years_per_query (int, optional): How many years to fetch in a single query. Defaults to 2.
             sleep_duration (int, optional): How long to sleep after each query. Helps prevent throttling. Defaults to 0.
+            incremental (bool, optional): Whether to only fetch and append data newer than what is already stored. Defaults to False.
+            catchment_name (str, optional): If set, all coordinates of the weather provider are stored together in the consolidated format for this catchment (see AWSDispatcher.upload_catchment) instead of one datum per coordinate. Defaults to None.
         """
         start_datetime = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=pytz.UTC)
         end_datetime = datetime.strptime(end_date, "%Y-%m-%d").replace(tzinfo=pytz.UTC)
 
-        partition_end_date = min(
-            [start_datetime.replace(start_datetime.year + years_per_query), end_datetime])
+        if not incremental:
+            datums = self._fetch_historical(start_datetime, end_datetime, columns, years_per_query, sleep_duration)
+            if catchment_name is not None:
+                self.aws_dispatcher.upload_catchment(datums, catchment_name, "historical")
+                return
+            for datum in datums:
+                self.aws_dispatcher.upload_datum(datum, "historical")
+            return
+
+        if catchment_name is not None:
+            folder_names = [self.aws_dispatcher.catchment_folder_name(catchment_name, "historical")]
+        else:
+            folder_names = [self.aws_dispatcher.datum_folder_name(coordinate.lon, coordinate.lat, "historical") for coordinate in self.weather_provider.coordinates]
+        last_timestamps = {folder_name: self.aws_dispatcher.get_last_timestamp(folder_name, "data") for folder_name in folder_names}
 
-        datums = self.weather_provider.fetch_historical(
-            start_date=datetime.strftime(start_datetime, "%Y-%m-%d"),
-            end_date=datetime.strftime(partition_end_date, "%Y-%m-%d"),
-            columns=columns,
-            sleep_duration=sleep_duration)
+        if any(last_timestamp is None for last_timestamp in last_timestamps.values()):
+            fetch_start_datetime = start_datetime
+        else:
+            # Restart from the beginning of the last stored day since queries are made in whole days
+            earliest_last_timestamp = min(last_timestamp for last_timestamp in last_timestamps.values() if last_timestamp is not None)
+            fetch_start_datetime = max(start_datetime, earliest_last_timestamp.to_pydatetime().replace(hour=0, minute=0, second=0, microsecond=0))
+
+        if fetch_start_datetime > end_datetime:
+            logging.info(f"Historical data is already stored up to {end_date}, nothing to fetch")
+            return
+
+        datums = self._fetch_historical(fetch_start_datetime, end_datetime, columns, years_per_query, sleep_duration)
+
+        if catchment_name is not None:
+            last_timestamp = last_timestamps[folder_names[0]]
+            if last_timestamp is None:
+                self.aws_dispatcher.upload_catchment(datums, catchment_name, "historical")
+                return
+            for datum in datums:
+                datum.hourly_parameters = datum.hourly_parameters[datum.hourly_parameters.index > last_timestamp]
+            if all(len(datum.hourly_parameters) == 0 for datum in datums):
+                logging.info(f"No new historical data for {folder_names[0]}")
+                return
+            self.aws_dispatcher.upload_catchment(datums, catchment_name, "historical", append=True)
+            return
 
-        start_datetime = start_datetime.replace(start_datetime.year + years_per_query)
-        partition_end_date = partition_end_date.replace(
-            partition_end_date.year + years_per_query)
+        for datum in datums:
+            folder_name = self.aws_dispatcher.datum_folder_name(datum.longitude, datum.latitude, "historical")
+            last_timestamp = last_timestamps.get(folder_name)
+            if last_timestamp is None:
+                self.aws_dispatcher.upload_datum(datum, "historical")
+                continue
+
+            datum.hourly_parameters = datum.hourly_parameters[datum.hourly_parameters.index > last_timestamp]
+            if len(datum.hourly_parameters) == 0:
+                logging.info(f"No new historical data for {folder_name}")
+                continue
+            self.aws_dispatcher.append_datum(datum, "historical")
+
+    def _fetch_historical(self,
+                          start_datetime: datetime,
+                          end_datetime: datetime,
+                          columns: Optional[List[str]],
+                          years_per_query: int,
+                          sleep_duration: int) -> List[WeatherDatum]:
+        """Fetch historical datums for all coordinates between two dates, querying at most years_per_query years at a time.
+
+        Args:
+            start_datetime (datetime): First day to fetch.
+            end_datetime (datetime): Last day to fetch.
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if None.
+            years_per_query (int): How many years to fetch in a single query.
+            sleep_duration (int): How long to sleep after each query.
+
+        Returns:
+            list[WeatherDatum]: One datum per coordinate covering the whole requested range.
+        """
+        datums: List[WeatherDatum] = []
+        while start_datetime <= end_datetime:
+            partition_end_date = min(start_datetime.replace(start_datetime.year + years_per_query) - timedelta(days=1), end_datetime)
 
-        while partition_end_date < end_datetime:
             partial_datums = self.weather_provider.fetch_historical(
                 start_date=datetime.strftime(start_datetime, "%Y-%m-%d"),
                 end_date=datetime.strftime(partition_end_date, "%Y-%m-%d"),
                 columns=columns,
                 sleep_duration=sleep_duration)
 
-            for (datum, partial_datum) in zip(datums, partial_datums):
-                partial_hourly_parameters = partial_datum.hourly_parameters
-                datum.hourly_parameters = pd.concat([datum.hourly_parameters,
-                                                    partial_hourly_parameters])
+            if not datums:
+                datums = partial_datums
+            else:
+                for (datum, partial_datum) in zip(datums, partial_datums):
+                    datum.hourly_parameters = pd.concat([datum.hourly_parameters,
+                                                        partial_datum.hourly_parameters])
 
-            start_datetime = start_datetime.replace(start_datetime.year + years_per_query)
-            partition_end_date = partition_end_date.replace(
-                partition_end_date.year + years_per_query)
+            # Dates are inclusive so the next query starts the day after this one ended
+            start_datetime = partition_end_date + timedelta(days=1)
 
-        for datum in datums:
-            self.aws_dispatcher.upload_datum(datum, "historical")
+        return datums
 
     def upload_current(self,
                        columns: Optional[List[str]] = None,
                        sleep_duration: float = 0.0,
-                       dir_path: Optional[str] = None) -> None:
+                       dir_path: Optional[str] = None,
+                       catchment_name: Optional[str] = None) -> None:
         """Refetch current datums and store this updated data in AWS. This will overwrite whatever data was previously stored for the current river.
 
         Args:
             columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
             sleep_duration (float, optional): How long to sleep after each query. Helps prevent throttling. Defaults to 0.0.
             dir_path (str, optional): The subdir (within 'current') to store datums. Generally set equal to the timestamp of collection. Defaults to None.
+            catchment_name (str, optional): If set, all coordinates of the weather provider are stored together in the consolidated format for this catchment (see AWSDispatcher.upload_catchment) instead of one datum per coordinate. Defaults to None.
         """
         if dir_path is None:
             dir_path = "current"
@@ -99,5 +173,9 @@ class AWSWeatherUploader():
             columns=columns,
             sleep_duration=sleep_duration)
 
+        if catchment_name is not None:
+            self.aws_dispatcher.upload_catchment(datums, catchment_name, dir_path=dir_path)
+            return
+
         for datum in datums:
             self.aws_dispatcher.upload_datum(datum, dir_path=dir_path)
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.base_api_adapter import BaseAPIAdapter
 from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.parameters import get_hourly_parameters
@@ -8,20 +8,65 @@ import requests_cache
 from openmeteo_sdk import WeatherApiResponse
 
 
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+FORECAST_URL = "https://api.open-meteo.com/v1/ecmwf"
+
+
 class OpenMeteoECMWFAdapter(BaseAPIAdapter):
     """Adapts the OpenMeteo API to be used by the RequestBuilder"""
 
     def __init__(self, archive_hourly_parameters: Optional[List[str]] = None,
-                 forecast_hourly_parameters: Optional[List[str]] = None) -> None:
+                 forecast_hourly_parameters: Optional[List[str]] = None,
+                 cache_name: str = ".cache",
+                 cache_backend: str = "sqlite",
+                 archive_expire_after: Union[int, float] = -1,
+                 forecast_expire_after: Union[int, float] = 60 * 60,
+                 retries: int = 5,
+                 backoff_factor: float = 0.2) -> None:
         """
         Adapts the OpenMeteo API to be used by the RequestBuilder
 
         Args:
             archive_hourly_parameters (list[str], optional): Which parameters to fetch for archived/historical queries. Defaults to None.
             forecast_hourly_parameters (list[str], optional): Which parameters to fetch for current/forecasted queries. Defaults to None.
+            cache_name (str, optional): Location of the response cache, e.g. a file path for the sqlite backend. Defaults to ".cache".
+            cache_backend (str, optional): requests_cache backend to use, e.g. "sqlite", "filesystem" or "memory". Defaults to "sqlite".
+            archive_expire_after (int | float, optional): Seconds to cache archived/historical responses for. -1 never expires. Defaults to -1.
+            forecast_expire_after (int | float, optional): Seconds to cache current/forecasted responses for. -1 never expires. Defaults to 1 hour.
+            retries (int, optional): How many times to retry a failed request. Defaults to 5.
+            backoff_factor (float, optional): Backoff factor between retries. Defaults to 0.2.
         """
         self.archive_hourly_parameters = archive_hourly_parameters if archive_hourly_parameters is not None else get_hourly_parameters("ecmwf_shared")
         self.forecast_hourly_parameters = forecast_hourly_parameters if forecast_hourly_parameters is not None else get_hourly_parameters("ecmwf_shared")
+        self.cache_name = cache_name
+        self.cache_backend = cache_backend
+        self.archive_expire_after = archive_expire_after
+        self.forecast_expire_after = forecast_expire_after
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        self._cache_session: Optional[requests_cache.CachedSession] = None
+        self._client: Optional[openmeteo_requests.Client] = None
+
+    @property
+    def client(self) -> openmeteo_requests.Client:
+        """The Open-Meteo API client, with cache and retry on error. Built on first access and reused for the lifetime of the adapter.
+
+        Returns:
+            openmeteo_requests.Client: The shared client.
+        """
+        if self._client is None:
+            self._cache_session = requests_cache.CachedSession(
+                self.cache_name,
+                backend=self.cache_backend,
+                expire_after=self.archive_expire_after,
+                urls_expire_after={
+                    FORECAST_URL: self.forecast_expire_after,
+                    ARCHIVE_URL: self.archive_expire_after,
+                })
+            retry_session = retry(self._cache_session, retries=self.retries, backoff_factor=self.backoff_factor)
+            self._client = openmeteo_requests.Client(session=retry_session)
+        return self._client
 
     def get_historical(self,
                        coordinate: Coordinate,
@@ -39,15 +84,9 @@ class OpenMeteoECMWFAdapter(BaseAPIAdapter):
         Returns:
             response: The WeatherApiResponse object from open meteo, containing Hourly Variables, Longitude, Latitude, etc.
         """
-        # Setup the Open-Meteo API client with cache and retry on error
-        cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        openmeteo = openmeteo_requests.Client(session=retry_session)
-
         hourly_params = columns if columns is not None else self.archive_hourly_parameters
         # Make sure all required weather variables are listed here
         # The order of variables in hourly or daily is important to assign them correctly below
-        url = "https://archive-api.open-meteo.com/v1/archive"
         params = {
             "latitude": coordinate.lat,
             "longitude": coordinate.lon,
@@ -58,7 +97,7 @@ class OpenMeteoECMWFAdapter(BaseAPIAdapter):
             "models": "ecmwf_ifs"
         }
 
-        return openmeteo.weather_api(url, params=params)[0]
+        return self.client.weather_api(ARCHIVE_URL, params=params)[0]
 
     def get_current(self,
                     coordinate: Coordinate,
@@ -76,14 +115,8 @@ class OpenMeteoECMWFAdapter(BaseAPIAdapter):
         Returns:
             response: The WeatherApiResponse object from open meteo, containing Hourly Variables, Longitude, Latitude, etc.
         """
-        # Setup the Open-Meteo API client with cache and retry on error
-        cache_session = requests_cache.CachedSession('.cache', expire_after=-1)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        openmeteo = openmeteo_requests.Client(session=retry_session)
-
         hourly_params = columns if columns is not None else self.forecast_hourly_parameters
 
-        url = "https://api.open-meteo.com/v1/ecmwf"
         params = {
             "latitude": coordinate.lat,
             "longitude": coordinate.lon,
@@ -91,7 +124,64 @@ class OpenMeteoECMWFAdapter(BaseAPIAdapter):
             "past_days": past_days,
             "forecast_days": forecast_days
         }
-        return openmeteo.weather_api(url, params=params)[0]
+        return self.client.weather_api(FORECAST_URL, params=params)[0]
+
+    def get_historical_batch(self,
+                             coordinates: List[Coordinate],
+                             start_date: str,
+                             end_date: str,
+                             columns: Optional[List[str]] = None) -> List[WeatherApiResponse]:
+        """Make a single GET request to the Open Meteo API for historical/archived data at several locations.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            start_date (str): The starting date for the requested data. In the format "YYYY-MM-DD".
+            end_date (str): The ending date for the requested data. In the format "YYYY-MM-DD".
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[WeatherApiResponse]: One WeatherApiResponse per coordinate, in the same order as coordinates.
+        """
+        hourly_params = columns if columns is not None else self.archive_hourly_parameters
+
+        params = {
+            "latitude": ",".join(str(coordinate.lat) for coordinate in coordinates),
+            "longitude": ",".join(str(coordinate.lon) for coordinate in coordinates),
+            "start_date": start_date,
+            "end_date": end_date,
+            "hourly": hourly_params,
+            "timezone": "GMT",
+            "models": "ecmwf_ifs"
+        }
+
+        return self.client.weather_api(ARCHIVE_URL, params=params)
+
+    def get_current_batch(self,
+                          coordinates: List[Coordinate],
+                          past_days: int = 92,
+                          forecast_days: int = 10,
+                          columns: Optional[List[str]] = None) -> List[WeatherApiResponse]:
+        """Make a single GET request to the Open Meteo API for current/forecasted data at several locations.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            past_days (int, optional): How many days into the past to fetch data for. Defaults to 92 (OpenMeteo max value).
+            forecast_days (int, optional): How many days into the future to fetch data for. Defaults to 10.
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[WeatherApiResponse]: One WeatherApiResponse per coordinate, in the same order as coordinates.
+        """
+        hourly_params = columns if columns is not None else self.forecast_hourly_parameters
+
+        params = {
+            "latitude": ",".join(str(coordinate.lat) for coordinate in coordinates),
+            "longitude": ",".join(str(coordinate.lon) for coordinate in coordinates),
+            "hourly": hourly_params,
+            "past_days": past_days,
+            "forecast_days": forecast_days
+        }
+        return self.client.weather_api(FORECAST_URL, params=params)
 
     def get_index_parameter(self) -> str:
         """Temporal index parameter for OpenMeteo hourly data is "time".
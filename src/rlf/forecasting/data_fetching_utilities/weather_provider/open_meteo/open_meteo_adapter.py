@@ -3,7 +3,7 @@ from typing import List, Optional
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.base_api_adapter import BaseAPIAdapter
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
-from rlf.forecasting.data_fetching_utilities.weather_provider.api.rest_invoker import RestInvoker
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.rest_invoker import PooledSession, RequestTimings, RestInvoker
 from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.parameters import get_hourly_parameters
 
 
@@ -18,7 +18,10 @@ class OpenMeteoAdapter(BaseAPIAdapter):
                  archive_path: str = "era5",
                  forecast_path: str = "gfs",
                  archive_hourly_parameters: Optional[List[str]] = None,
-                 forecast_hourly_parameters: Optional[List[str]] = None) -> None:
+                 forecast_hourly_parameters: Optional[List[str]] = None,
+                 session: Optional[PooledSession] = None,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 5.0) -> None:
         """
         Adapts the OpenMeteo API to be used by the RequestBuilder
 
@@ -31,6 +34,9 @@ class OpenMeteoAdapter(BaseAPIAdapter):
             forecast_path (str, optional): The path to use for current/forecasted data. Defaults to "gfs".
             archive_hourly_parameters (list[str], optional): Which parameters to fetch for archived/historical queries. Defaults to None.
             forecast_hourly_parameters (list[str], optional): Which parameters to fetch for current/forecasted queries. Defaults to None.
+            session (PooledSession, optional): Session shared by all requests made by this adapter. A new one is created if None. Defaults to None.
+            connect_timeout (float, optional): Seconds to wait for a connection to be established. Defaults to 5.0.
+            read_timeout (float, optional): Seconds to wait between bytes received from the server. Defaults to 5.0.
         """
         self.protocol = protocol
         self.archive_hostname = archive_hostname
@@ -41,6 +47,21 @@ class OpenMeteoAdapter(BaseAPIAdapter):
         self.archive_hourly_parameters = archive_hourly_parameters if archive_hourly_parameters is not None else get_hourly_parameters(archive_path)
         self.forecast_hourly_parameters = forecast_hourly_parameters if forecast_hourly_parameters is not None else get_hourly_parameters(forecast_path)
 
+        self.session = session if session is not None else PooledSession()
+        self._archive_invoker = RestInvoker(protocol=self.protocol, hostname=self.archive_hostname, version=self.version,
+                                            session=self.session, connect_timeout=connect_timeout, read_timeout=read_timeout)
+        self._forecast_invoker = RestInvoker(protocol=self.protocol, hostname=self.forecast_hostname, version=self.version,
+                                             session=self.session, connect_timeout=connect_timeout, read_timeout=read_timeout)
+
+    @property
+    def timings(self) -> RequestTimings:
+        """Timing counters for all requests made by this adapter.
+
+        Returns:
+            RequestTimings: The timing counters of the adapter's session.
+        """
+        return self.session.timings
+
     def get_historical(self,
                        coordinate: Coordinate,
                        start_date: str,
@@ -57,9 +78,6 @@ class OpenMeteoAdapter(BaseAPIAdapter):
         Returns:
             Response: The response object from the REST API containing response body, headers, status code
         """
-        invoker = RestInvoker(protocol=self.protocol,
-                              hostname=self.archive_hostname, version=self.version)
-
         hourly_params = columns if columns is not None else self.archive_hourly_parameters
 
         parameters = {
@@ -72,7 +90,7 @@ class OpenMeteoAdapter(BaseAPIAdapter):
             "cell_selection": "nearest",
         }
 
-        return invoker.get(path=self.archive_path, parameters=parameters)
+        return self._archive_invoker.get(path=self.archive_path, parameters=parameters)
 
     def get_current(self,
                     coordinate: Coordinate,
@@ -90,9 +108,6 @@ class OpenMeteoAdapter(BaseAPIAdapter):
         Returns:
             Response: The response object from the REST API containing response body, headers, status code
         """
-        invoker = RestInvoker(protocol=self.protocol,
-                              hostname=self.forecast_hostname, version=self.version)
-
         hourly_params = columns if columns is not None else self.forecast_hourly_parameters
         parameters = {
             "longitude": coordinate.lon,
@@ -104,7 +119,104 @@ class OpenMeteoAdapter(BaseAPIAdapter):
             "cell_selection": "nearest",
         }
 
-        return invoker.get(path=self.forecast_path, parameters=parameters)
+        return self._forecast_invoker.get(path=self.forecast_path, parameters=parameters)
+
+    def get_historical_batch(self,
+                             coordinates: List[Coordinate],
+                             start_date: str,
+                             end_date: str,
+                             columns: Optional[List[str]] = None) -> List[Response]:
+        """Make a single GET request to the Open Meteo API for historical/archived data at several locations.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            start_date (str): The starting date for the requested data. In the format "YYYY-MM-DD".
+            end_date (str): The ending date for the requested data. In the format "YYYY-MM-DD".
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[Response]: One response per coordinate, in the same order as coordinates.
+        """
+        hourly_params = columns if columns is not None else self.archive_hourly_parameters
+
+        parameters = {
+            **self._batch_location_parameters(coordinates),
+            "start_date": start_date,
+            "end_date": end_date,
+            "hourly": hourly_params,
+            "cell_selection": "nearest",
+        }
+
+        return self._split_batch_response(self._archive_invoker.get(path=self.archive_path, parameters=parameters), len(coordinates))
+
+    def get_current_batch(self,
+                          coordinates: List[Coordinate],
+                          past_days: int = 92,
+                          forecast_days: int = 16,
+                          columns: Optional[List[str]] = None) -> List[Response]:
+        """Make a single GET request to the Open Meteo API for current/forecasted data at several locations.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to fetch data for.
+            past_days (int, optional): How many days into the past to fetch data for. Defaults to 92 (OpenMeteo max value).
+            forecast_days (int, optional): How many days into the future to fetch data for. Defaults to 16 (OpenMeteo max value).
+            columns (list[str], optional): The subset of columns to fetch. If set to None, all columns will be fetched. Defaults to None.
+
+        Returns:
+            list[Response]: One response per coordinate, in the same order as coordinates.
+        """
+        hourly_params = columns if columns is not None else self.forecast_hourly_parameters
+        parameters = {
+            **self._batch_location_parameters(coordinates),
+            "past_days": past_days,
+            "forecast_days": forecast_days,
+            "hourly": hourly_params,
+            "cell_selection": "nearest",
+        }
+
+        return self._split_batch_response(self._forecast_invoker.get(path=self.forecast_path, parameters=parameters), len(coordinates))
+
+    @staticmethod
+    def _batch_location_parameters(coordinates: List[Coordinate]) -> dict:
+        """Build the comma separated location parameters used by Open Meteo for multi-location requests.
+
+        Args:
+            coordinates (list[Coordinate]): The locations to request.
+
+        Returns:
+            dict: The longitude, latitude and elevation parameters.
+        """
+        return {
+            "longitude": ",".join(str(coordinate.lon) for coordinate in coordinates),
+            "latitude": ",".join(str(coordinate.lat) for coordinate in coordinates),
+            "elevation": ",".join("nan" for _ in coordinates),
+        }
+
+    @staticmethod
+    def _split_batch_response(response: Response, num_locations: int) -> List[Response]:
+        """Split a multi-location response into one Response per location.
+
+        Open Meteo responds with a list of location objects for multi-location requests, or a single object if only one location was requested.
+
+        Args:
+            response (Response): The multi-location response.
+            num_locations (int): How many locations were requested.
+
+        Raises:
+            ValueError: If the number of locations in the response does not match the number requested.
+
+        Returns:
+            list[Response]: One response per location, in request order.
+        """
+        locations = response.data if isinstance(response.data, list) else [response.data]
+        if len(locations) != num_locations:
+            raise ValueError(f"Expected {num_locations} locations in the response but received {len(locations)}")
+
+        return [Response(status_code=response.status_code,
+                         url=response.url,
+                         message=response.message,
+                         headers=response.headers,
+                         data=location) for location in locations]
 
     def get_index_parameter(self) -> str:
         """Temporal index parameter for OpenMeteo hourly data is "time".
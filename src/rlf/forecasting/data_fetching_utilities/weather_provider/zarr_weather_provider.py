@@ -0,0 +1,228 @@
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import pytz
+import xarray as xr
+
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.data_fetching_utilities.weather_provider.base_weather_provider import (
+    BaseWeatherProvider
+)
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import (
+    WeatherDatum
+)
+
+# Coordinates are matched to grid points within this many degrees, the same precision used to name datum folders in AWS
+COORDINATE_TOLERANCE = 0.005
+
+# Chunk shape of the (time, lat, lon) weather variables: one month of hourly data for a block of grid points
+TIME_CHUNK_SIZE = 24 * 31
+SPACE_CHUNK_SIZE = 16
+
+# Per location metadata stored as (lat, lon) variables next to the weather variables
+META_DATA_VARIABLES = ["api_response_longitude", "api_response_latitude", "elevation", "utc_offset_seconds", "timezone"]
+
+
+def zarr_store_path(store_path: str, dir_path: str) -> str:
+    """Get the path of the Zarr store holding the data of a given directory, mirroring the directory layout used in AWS.
+
+    Args:
+        store_path (str): Root path of the gridded weather stores. Local path or any fsspec URL (e.g. "s3://bucket/gridded").
+        dir_path (str): "historical" or "current/{timestamp}".
+
+    Returns:
+        str: Path of the Zarr store.
+    """
+    return f"{store_path}/{dir_path}.zarr"
+
+
+class ZarrWeatherProvider(BaseWeatherProvider):
+    """Provides historical or forecasted weather for a given set of locations, backed by chunked Zarr stores of gridded (time x lat x lon) weather on local disk or S3.
+
+    Selecting the locations and time window of a catchment only reads the chunks covering them, rather than a set of files per location. Stores are written with ZarrWeatherUploader.
+    """
+
+    def __init__(self,
+                 coordinates: List[Coordinate],
+                 store_path: str,
+                 current_timestamp: Optional[str] = None,
+                 storage_options: Optional[dict] = None) -> None:
+        """Create a ZarrWeatherProvider for the given list of coordinates.
+
+        Args:
+            coordinates (list[Coordinate(longitude: float, latitude: float)]): Named tuple WSG84 coordinates: (longitude, latitude).
+            store_path (str): Root path of the gridded weather stores. Local path or any fsspec URL (e.g. "s3://bucket/gridded").
+            current_timestamp (str, optional): The 'current' timestamp for which current data will be fetched. Expected in the form "YY-mm-DD_HH-MM" in UTC. Defaults to None.
+            storage_options (dict, optional): Options passed to fsspec when opening remote stores. Defaults to None.
+        """
+        self.coordinates = coordinates
+        self.store_path = store_path
+        self.current_timestamp = current_timestamp
+        self.storage_options = storage_options
+
+    def download_datums(self,
+                        dir_path: str,
+                        columns: Optional[List[str]] = None,
+                        start_datetime: Optional[datetime] = None,
+                        end_datetime: Optional[datetime] = None) -> List[WeatherDatum]:
+        """Read the datums for all coordinates from a Zarr store. Only the chunks covering the coordinates and time range are read.
+
+        Args:
+            dir_path (str): "historical" or "current/{timestamp}".
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+            start_datetime (datetime, optional): Only fetch data at or after this time. Defaults to None.
+            end_datetime (datetime, optional): Only fetch data at or before this time. Defaults to None.
+
+        Raises:
+            FileNotFoundError: If the store does not exist or holds no data for one of the coordinates.
+
+        Returns:
+            list[WeatherDatum]: One datum per coordinate, in the same order as self.coordinates.
+        """
+        path = zarr_store_path(self.store_path, dir_path)
+        try:
+            # chunks=None keeps the variables lazily indexed without requiring dask
+            ds = xr.open_zarr(path, consolidated=True, chunks=None, storage_options=self.storage_options)
+        except (FileNotFoundError, KeyError):
+            raise FileNotFoundError("Could not find a Zarr store at path: " + path)
+
+        if columns is None:
+            columns = list(ds.attrs.get("columns", [name for name in ds.data_vars if name not in META_DATA_VARIABLES]))
+
+        lon_indices = self._grid_indices(ds.indexes["lon"], [coordinate.lon for coordinate in self.coordinates], path)
+        lat_indices = self._grid_indices(ds.indexes["lat"], [coordinate.lat for coordinate in self.coordinates], path)
+
+        time_index = ds.indexes["time"]
+        time_slice = time_index.slice_indexer(self._to_naive_utc(start_datetime), self._to_naive_utc(end_datetime))
+
+        # Load the bounding box of all requested points at once, then pick the points out of it in memory
+        unique_lon_indices = np.unique(lon_indices)
+        unique_lat_indices = np.unique(lat_indices)
+        box = ds[columns + META_DATA_VARIABLES].isel(lon=unique_lon_indices, lat=unique_lat_indices)
+        meta_data_box = box[META_DATA_VARIABLES].load()
+        weather_box = box[columns].isel(time=time_slice).load()
+
+        times = pd.DatetimeIndex(weather_box.indexes["time"]).tz_localize(pytz.UTC).rename("time")
+        datums = []
+        for coordinate, lon_index, lat_index in zip(self.coordinates, lon_indices, lat_indices):
+            point = {"lon": int(np.searchsorted(unique_lon_indices, lon_index)), "lat": int(np.searchsorted(unique_lat_indices, lat_index))}
+            point_meta_data = meta_data_box.isel(point)
+            if np.isnan(point_meta_data["api_response_longitude"].values):
+                raise FileNotFoundError(f"No data stored in {path} for coordinate: {coordinate}")
+
+            point_weather = weather_box.isel(point)
+            hourly_parameters = pd.DataFrame({column: point_weather[column].values.astype("float32", copy=False) for column in columns}, index=times)
+            datums.append(WeatherDatum(longitude=coordinate.lon,
+                                       latitude=coordinate.lat,
+                                       api_response_longitude=float(point_meta_data["api_response_longitude"].values),
+                                       api_response_latitude=float(point_meta_data["api_response_latitude"].values),
+                                       elevation=float(point_meta_data["elevation"].values),
+                                       utc_offset_seconds=float(point_meta_data["utc_offset_seconds"].values),
+                                       timezone=str(point_meta_data["timezone"].values),
+                                       hourly_units={column: ds[column].attrs.get("units") for column in columns},
+                                       hourly_parameters=hourly_parameters))
+        return datums
+
+    @staticmethod
+    def _grid_indices(grid: pd.Index, values: List[float], path: str) -> np.ndarray:
+        """Find the positions of the grid values nearest to the given values.
+
+        Args:
+            grid (pd.Index): Sorted grid values along one dimension.
+            values (list[float]): Values to find.
+            path (str): Path of the store, for error messages.
+
+        Raises:
+            FileNotFoundError: If a value is not within COORDINATE_TOLERANCE of any grid value.
+
+        Returns:
+            np.ndarray: Position in grid of each value.
+        """
+        indices = grid.get_indexer(values, method="nearest", tolerance=COORDINATE_TOLERANCE)
+        if (indices < 0).any():
+            missing = [value for value, index in zip(values, indices) if index < 0]
+            raise FileNotFoundError(f"No grid points in {path} for coordinate values: {missing}")
+        return indices
+
+    @staticmethod
+    def _to_naive_utc(dt: Optional[datetime]) -> Optional[pd.Timestamp]:
+        """Convert a datetime to a naive UTC Timestamp, as used for the time index of the stores.
+
+        Args:
+            dt (datetime, optional): Datetime to convert. Naive datetimes are assumed to be UTC.
+
+        Returns:
+            Timestamp | None: Converted timestamp, or None if dt is None.
+        """
+        if dt is None:
+            return None
+        timestamp = pd.Timestamp(dt)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.tz_convert(pytz.UTC).tz_localize(None)
+        return timestamp
+
+    def fetch_historical(self,
+                         columns: Optional[List[str]] = None,
+                         start_date: Optional[str] = None,
+                         end_date: Optional[str] = None,
+                         sleep_duration: float = 0.0) -> List[WeatherDatum]:
+        """Fetch historical weather for all coordinates.
+
+        Args:
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+            start_date (str): The starting date for the requested data. In the format "YYYY-MM-DD".
+            end_date (str): The ending date for the requested data. In the format "YYYY-MM-DD".
+            sleep_duration (float, optional): Not supported. Defaults to 0.0.
+
+        Returns:
+            list[WeatherDatum]: A list of WeatherDatums containing the weather data about the location.
+        """
+        if sleep_duration != 0.0:
+            raise ValueError("sleep_duration is not supported (and generally not needed) for zarr_weather_provider")
+
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d').replace(tzinfo=pytz.UTC) if start_date is not None else None
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d').replace(tzinfo=pytz.UTC) if end_date is not None else None
+
+        if columns:
+            columns = self._remap_historical_parameters_to_adapter(columns)
+
+        datums = self.download_datums("historical", columns=columns, start_datetime=start_dt, end_datetime=end_dt)
+        for datum in datums:
+            datum.hourly_parameters.columns = self._remap_historical_parameters_from_adapter(datum.hourly_parameters.columns)
+
+        return datums
+
+    def fetch_current(self, columns: Optional[List[str]] = None, sleep_duration: float = 0.0) -> List[WeatherDatum]:
+        """Fetch current weather for all coordinates.
+
+        Args:
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+            sleep_duration (float, optional): Not supported. Defaults to 0.0.
+
+        Returns:
+            list[WeatherDatum]: A list of WeatherDatums containing the weather data about the location.
+        """
+        if sleep_duration != 0.0:
+            raise ValueError("sleep_duration is not supported (and generally not needed) for zarr_weather_provider")
+
+        if self.current_timestamp is None:
+            raise ValueError("Cannot fetch current data without a timestamp.")
+
+        if columns:
+            columns = self._remap_current_parameters_to_adapter(columns)
+
+        datums = self.download_datums(f"current/{self.current_timestamp}", columns=columns)
+        for datum in datums:
+            datum.hourly_parameters.columns = self._remap_current_parameters_from_adapter(datum.hourly_parameters.columns)
+
+        return datums
+
+    def set_timestamp(self, new_timestamp: str) -> None:
+        """Set the current timestamp for the weather provider. Fetched "current" weather will be relative to this point in time.
+
+        Args:
+            new_timestamp (str): Timestamp in the format "YY-mm-DD_HH-MM" in UTC.
+        """
+        self.current_timestamp = new_timestamp
@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pytz
+import xarray as xr
+
+from rlf.forecasting.data_fetching_utilities.weather_provider.base_weather_provider import (
+    BaseWeatherProvider
+)
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import (
+    WeatherDatum
+)
+from rlf.forecasting.data_fetching_utilities.weather_provider.zarr_weather_provider import (
+    COORDINATE_TOLERANCE,
+    META_DATA_VARIABLES,
+    SPACE_CHUNK_SIZE,
+    TIME_CHUNK_SIZE,
+    zarr_store_path
+)
+
+
+class ZarrWeatherUploader():
+    """Utility for fetching data from some WeatherProvider and storing it as gridded (time x lat x lon) Zarr stores, to be read by ZarrWeatherProvider instances. Using an AWSWeatherProvider as the source converts data stored by an AWSDispatcher."""
+
+    def __init__(self,
+                 weather_provider: BaseWeatherProvider,
+                 store_path: str,
+                 storage_options: Optional[dict] = None) -> None:
+        """Create a new ZarrWeatherUploader instance.
+
+        Args:
+            weather_provider (BaseWeatherProvider): Source for fetching data.
+            store_path (str): Root path of the gridded weather stores. Local path or any fsspec URL (e.g. "s3://bucket/gridded").
+            storage_options (dict, optional): Options passed to fsspec when writing remote stores. Defaults to None.
+        """
+        self.weather_provider = weather_provider
+        self.store_path = store_path
+        self.storage_options = storage_options
+
+    def upload_historical(self,
+                          columns: Optional[List[str]] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> None:
+        """Fetch historical datums and store them as the historical Zarr store, replacing any previously stored.
+
+        Args:
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+            start_date (str, optional): iso8601 format YYYY-MM-DD. Uses the weather provider's default if None. Defaults to None.
+            end_date (str, optional): iso8601 format YYYY-MM-DD. Uses the weather provider's default if None. Defaults to None.
+        """
+        kwargs: Dict[str, Any] = {}
+        if start_date is not None:
+            kwargs["start_date"] = start_date
+        if end_date is not None:
+            kwargs["end_date"] = end_date
+
+        datums = self.weather_provider.fetch_historical(columns=columns, **kwargs)
+        self.write_datums(datums, "historical")
+
+    def upload_current(self, dir_path: str, columns: Optional[List[str]] = None) -> None:
+        """Fetch current datums and store them as the Zarr store of a given timestamp, replacing any previously stored.
+
+        Args:
+            dir_path (str): The subdir (within 'current') to store datums. Generally set equal to the timestamp of collection.
+            columns (list[str], optional): The columns/parameters to fetch. All available will be fetched if left equal to None. Defaults to None.
+        """
+        datums = self.weather_provider.fetch_current(columns=columns)
+        self.write_datums(datums, f"current/{dir_path}")
+
+    @staticmethod
+    def _grid_positions(values: List[float]) -> Tuple[List[float], Dict[float, int]]:
+        """Build a sorted grid from coordinate values, merging values closer than COORDINATE_TOLERANCE.
+
+        Args:
+            values (list[float]): Coordinate values along one dimension.
+
+        Returns:
+            tuple(list[float], dict[float, int]): The grid values, and the position on the grid of each distinct input value.
+        """
+        positions: Dict[float, int] = {}
+        grid: List[float] = []
+        for value in sorted(set(values)):
+            if grid and value - grid[-1] < COORDINATE_TOLERANCE:
+                positions[value] = len(grid) - 1
+                continue
+            positions[value] = len(grid)
+            grid.append(value)
+        return grid, positions
+
+    def write_datums(self, datums: List[WeatherDatum], dir_path: str) -> None:
+        """Write datums to the Zarr store of a given directory, replacing any previously stored.
+
+        The grid is made of every longitude and latitude value of the datums. Grid points without a datum are left empty, and chunks holding only empty points are never written. Data is written one block of SPACE_CHUNK_SIZE x SPACE_CHUNK_SIZE grid points and one variable at a time to bound memory use.
+
+        Args:
+            datums (list[WeatherDatum]): Datums to write. All are expected to have the same columns.
+            dir_path (str): "historical" or "current/{timestamp}".
+
+        Raises:
+            ValueError: If there are no datums, or two datums fall on the same grid point.
+        """
+        if len(datums) == 0:
+            raise ValueError("Cannot write an empty list of datums")
+
+        path = zarr_store_path(self.store_path, dir_path)
+        columns = list(datums[0].hourly_parameters.columns)
+
+        lons, lon_positions = self._grid_positions([datum.longitude for datum in datums])
+        lats, lat_positions = self._grid_positions([datum.latitude for datum in datums])
+
+        times = datums[0].hourly_parameters.index
+        for datum in datums[1:]:
+            times = times.union(datum.hourly_parameters.index)
+        times = pd.DatetimeIndex(times).tz_convert(pytz.UTC).tz_localize(None)
+
+        points: Dict[tuple, WeatherDatum] = {}
+        for datum in datums:
+            point = (lat_positions[datum.latitude], lon_positions[datum.longitude])
+            if point in points:
+                raise ValueError(f"Two datums fall on the same grid point: ({datum.longitude}, {datum.latitude})")
+            points[point] = datum
+
+        shape = (len(times), len(lats), len(lons))
+        chunks = (min(TIME_CHUNK_SIZE, shape[0]), min(SPACE_CHUNK_SIZE, shape[1]), min(SPACE_CHUNK_SIZE, shape[2]))
+
+        # Write the store layout and metadata first. The weather variables are empty broadcast views, so they take no memory and none of their chunks are written
+        meta_data: Dict[str, np.ndarray] = {name: np.full(shape[1:], np.nan) for name in META_DATA_VARIABLES if name != "timezone"}
+        timezones = np.full(shape[1:], "", dtype=object)
+        for (lat_position, lon_position), datum in points.items():
+            for name in meta_data:
+                meta_data[name][lat_position, lon_position] = getattr(datum, name)
+            timezones[lat_position, lon_position] = str(datum.timezone)
+
+        data_vars: Dict[str, tuple] = {column: (("time", "lat", "lon"), np.broadcast_to(np.float32(np.nan), shape), {"units": (datums[0].hourly_units or {}).get(column)})
+                                       for column in columns}
+        data_vars.update({name: (("lat", "lon"), values) for name, values in meta_data.items()})
+        data_vars["timezone"] = (("lat", "lon"), timezones.astype(str))
+        template = xr.Dataset(data_vars, coords={"time": times, "lat": lats, "lon": lons}, attrs={"columns": columns})
+        encoding = {column: {"chunks": chunks, "dtype": "float32"} for column in columns}
+        template.to_zarr(path, mode="w", encoding=encoding, consolidated=True, write_empty_chunks=False, storage_options=self.storage_options)
+
+        # Fill in the weather variables one block of grid points at a time
+        blocks: Dict[tuple, List[tuple]] = {}
+        for (lat_position, lon_position) in points:
+            blocks.setdefault((lat_position // chunks[1], lon_position // chunks[2]), []).append((lat_position, lon_position))
+
+        for (lat_block, lon_block), block_points in blocks.items():
+            lat_slice = slice(lat_block * chunks[1], min((lat_block + 1) * chunks[1], shape[1]))
+            lon_slice = slice(lon_block * chunks[2], min((lon_block + 1) * chunks[2], shape[2]))
+            for column in columns:
+                values = np.full((shape[0], lat_slice.stop - lat_slice.start, lon_slice.stop - lon_slice.start), np.nan, dtype=np.float32)
+                for lat_position, lon_position in block_points:
+                    series = points[(lat_position, lon_position)].hourly_parameters[column]
+                    time_positions = times.get_indexer(pd.DatetimeIndex(series.index).tz_convert(pytz.UTC).tz_localize(None))
+                    values[time_positions, lat_position - lat_slice.start, lon_position - lon_slice.start] = series.to_numpy(dtype=np.float32)
+                block = xr.Dataset({column: (("time", "lat", "lon"), values)})
+                block.to_zarr(path, region={"time": slice(0, shape[0]), "lat": lat_slice, "lon": lon_slice}, write_empty_chunks=False, storage_options=self.storage_options)
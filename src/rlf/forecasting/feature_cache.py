@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+
+import numpy as np
+from pandas import DatetimeIndex
+
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+
+# darts is imported on first use rather than with this module, as it is slow to import
+if TYPE_CHECKING:
+    from darts import TimeSeries
+
+
+DEFAULT_FEATURE_CACHE_PATH = os.path.join("data", "features")
+
+# Part of every key, to be incremented whenever a change to feature processing makes previously cached features stale
+FEATURE_CACHE_FORMAT_VERSION = 1
+
+
+class FeatureCache():
+    """Persistent cache of processed, unscaled datasets on local disk, for reuse by every job training on the same data (e.g. all jobs of a grid search).
+
+    Entries are content addressed: keyed by a hash of everything the processed data depends on, i.e. the catchment, coordinates, columns, rolling feature configuration and the version of the source data. Each entry is a directory holding the values and time index of X and y as NPY files, and a json file of their components and any metadata of the dataset.
+
+    Entries are written to a temporary directory which is then renamed into place, so that several processes on the same machine can safely share a cache directory.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_FEATURE_CACHE_PATH) -> None:
+        """Create a FeatureCache storing its entries in cache_dir.
+
+        Args:
+            cache_dir (str, optional): Local directory for cached entries. Created if it does not exist. Defaults to DEFAULT_FEATURE_CACHE_PATH.
+        """
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(
+        catchment_name: str,
+        coordinates: Sequence[Coordinate],
+        columns: Optional[Sequence[str]],
+        rolling_sum_columns: Sequence[str],
+        rolling_mean_columns: Sequence[str],
+        rolling_window_sizes: Sequence[int],
+        data_version: str
+    ) -> str:
+        """Generate the key of a processed dataset.
+
+        Args:
+            catchment_name (str): Name of the catchment, i.e. the gauge.
+            coordinates (Sequence[Coordinate]): Coordinates of the weather data, in order.
+            columns (Sequence[str], optional): Weather columns requested, or None if all available were requested.
+            rolling_sum_columns (Sequence[str]): Columns rolling sums are generated for.
+            rolling_mean_columns (Sequence[str]): Columns rolling means are generated for.
+            rolling_window_sizes (Sequence[int]): Window sizes of the rolling sums and means.
+            data_version (str): Version of the source weather and level data.
+
+        Returns:
+            str: Hex digest identifying the processed dataset.
+        """
+        config = {
+            "format_version": FEATURE_CACHE_FORMAT_VERSION,
+            "catchment_name": catchment_name,
+            "coordinates": [[float(coordinate.lon), float(coordinate.lat)] for coordinate in coordinates],
+            "columns": list(columns) if columns is not None else None,
+            "rolling_sum_columns": list(rolling_sum_columns),
+            "rolling_mean_columns": list(rolling_mean_columns),
+            "rolling_window_sizes": [int(window_size) for window_size in rolling_window_sizes],
+            "data_version": data_version,
+        }
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[Tuple[TimeSeries, TimeSeries, dict]]:
+        """Load a cached dataset.
+
+        Args:
+            key (str): Key of the dataset, as generated by key.
+
+        Returns:
+            tuple[TimeSeries, TimeSeries, dict] | None: (X, y, metadata) of the dataset, or None if it is not cached.
+        """
+        entry_dir = self._entry_dir(key)
+        try:
+            with open(os.path.join(entry_dir, "meta.json")) as f:
+                meta = json.load(f)
+            X = self._load_series(entry_dir, "X", meta["X_components"])
+            y = self._load_series(entry_dir, "y", meta["y_components"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            with self._lock:
+                self.misses += 1
+            logging.info(f"Feature cache miss for {key} ({self.hits} hits, {self.misses} misses)")
+            return None
+
+        with self._lock:
+            self.hits += 1
+        logging.info(f"Feature cache hit for {key} ({self.hits} hits, {self.misses} misses)")
+        return X, y, meta["dataset"]
+
+    @staticmethod
+    def _load_series(entry_dir: str, name: str, components: list) -> TimeSeries:
+        """Load a TimeSeries from its stored values and time index.
+
+        Args:
+            entry_dir (str): Directory of the cache entry.
+            name (str): Name of the series within the entry.
+            components (list): Component names of the series.
+
+        Returns:
+            TimeSeries: Loaded series.
+        """
+        from darts import TimeSeries
+
+        values = np.load(os.path.join(entry_dir, f"{name}_values.npy"))
+        time_index = DatetimeIndex(np.load(os.path.join(entry_dir, f"{name}_time.npy")), name="time")
+        return TimeSeries.from_times_and_values(time_index, values, columns=components)
+
+    def store(self, key: str, X: TimeSeries, y: TimeSeries, dataset_meta: dict) -> None:
+        """Store a processed dataset. If another process stored the same key first, its entry is kept.
+
+        Args:
+            key (str): Key of the dataset, as generated by key.
+            X (TimeSeries): Processed, unscaled X.
+            y (TimeSeries): Processed, unscaled y.
+            dataset_meta (dict): json serializable metadata of the dataset to return with it when loaded.
+        """
+        entry_dir = self._entry_dir(key)
+        tmp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+        os.makedirs(tmp_dir)
+        try:
+            for name, series in (("X", X), ("y", y)):
+                np.save(os.path.join(tmp_dir, f"{name}_values.npy"), series.values(copy=False))
+                np.save(os.path.join(tmp_dir, f"{name}_time.npy"), series.time_index.to_numpy())
+            with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+                json.dump({"X_components": list(X.components), "y_components": list(y.components), "dataset": dataset_meta}, f)
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            if not os.path.isdir(entry_dir):
+                raise
+        finally:
+            if os.path.isdir(tmp_dir):
+                shutil.rmtree(tmp_dir)
@@ -1,10 +1,18 @@
-from typing import List, Optional, Tuple
+from __future__ import annotations
 
-from darts import TimeSeries
-from darts.dataprocessing.transformers import Scaler
+import logging
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+from pandas import concat, DataFrame, Timedelta, Timestamp
 
 from rlf.forecasting.base_dataset import BaseDataset
 from rlf.forecasting.catchment_data import CatchmentData
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
+
+if TYPE_CHECKING:
+    from darts import TimeSeries
+    from darts.dataprocessing.transformers import Scaler
 
 
 class InferenceDataset(BaseDataset):
@@ -41,6 +49,9 @@ class InferenceDataset(BaseDataset):
         self.scaler = scaler
         self.target_scaler = target_scaler
 
+        # State of the processing of each coordinate's datum, keyed by column prefix, from which update continues
+        self._datum_states: Dict[str, DatumState] = {}
+
         self.X, self.y = self._get_data()
 
         # TODO add validation call - ie all X sets are same size, match y sets.
@@ -70,6 +81,188 @@ class InferenceDataset(BaseDataset):
 
         return (X_current, y_current)
 
+    def _process_datum(self, datum: WeatherDatum, first_date: Timestamp, last_date: Optional[Timestamp]) -> DataFrame:
+        """Process a single X datum as BaseDataset._process_datum, keeping the state of its processing for update.
+
+        Args:
+            datum (WeatherDatum): Datum to process.
+            first_date (Timestamp): First allowed date for the time index. Any dates prior to this should be dropped.
+            last_date (Timestamp): Last allowed date for the time index. Any dates after this should be dropped. If None then no bounding in this direction is done.
+
+        Raises:
+            ValueError: If the generated prefix for this datum already exists.
+
+        Returns:
+            DataFrame: Processed datum, with a timezone naive UTC time index.
+        """
+        prefix = self._register_prefix(datum)
+        state = DatumState(self)
+        X, _ = state.update(datum.hourly_parameters)
+        self._datum_states[prefix] = state
+
+        X.columns = [prefix + c for c in X.columns]
+
+        logging.log(logging.INFO, f"Datum processed with length: {len(X)}")
+
+        return self._bound_time_index(X, first_date, last_date)
+
     def update(self) -> None:
-        """Update the underlying catchment data for inference with up to date data. This triggers new weather data queries and a rebuild of all current datasets."""
-        self.X_current, self.y_current = self._get_data(update=True)
+        """Update the underlying catchment data for inference with up to date data. This triggers new weather data queries.
+
+        Only the rows of each coordinate's weather data that are new or changed since the last update are processed and scaled, and appended to the existing X. Rows that dropped out of the current window are removed. y is rebuilt.
+        """
+        from darts import TimeSeries
+
+        self.catchment_data.update_for_inference()
+        current_weather, recent_level = self.catchment_data.all_current
+
+        prefixes = [self._prefix(datum) for datum in current_weather]
+        first_date, last_date = self._find_timestamp_boundaries(current_weather, recent_level)
+        if sorted(prefixes) != sorted(self._datum_states) or first_date > self.X.end_time() + self.X.freq:
+            # The coordinates changed, or the current window starts after the end of X, so there is nothing to continue from
+            self.subsets = {}
+            self._datum_states = {}
+            self.X, self.y = self._get_data()
+            return
+
+        processed_Xs = []
+        changed_from = None
+        for prefix, datum in zip(prefixes, current_weather):
+            X, datum_changed_from = self._datum_states[prefix].update(datum.hourly_parameters)
+            X.columns = [prefix + c for c in X.columns]
+            processed_Xs.append(X)
+            if datum_changed_from is not None:
+                datum_changed_from = self._to_naive_utc(datum_changed_from)
+                changed_from = datum_changed_from if changed_from is None else min(changed_from, datum_changed_from)
+
+        X = self.X
+        if changed_from is not None:
+            # The unchanged rows must be followed directly by the changed rows
+            changed_from = min(changed_from, X.end_time() + X.freq)
+            # Process and scale only the new or changed rows, and append them to the unchanged rows
+            changed_Xs = [self._bound_time_index(X_, max(first_date, changed_from), None) for X_ in processed_Xs]
+            changed_X = self.scaler.transform(self._assemble(changed_Xs, len(changed_Xs)))
+            X = X.drop_after(changed_X.start_time()).append(changed_X) if X.start_time() < changed_X.start_time() else changed_X
+
+        X_start = max(first_date, self._to_naive_utc(processed_Xs[0].index[0]))
+        if X.start_time() < X_start:
+            X = X.drop_before(X_start - X.freq)
+        if X.start_time() > first_date:
+            first_date = X.start_time()
+
+        y = TimeSeries.from_dataframe(recent_level).slice(first_date, last_date).astype("float32")
+        self.X, self.y = X, self.target_scaler.transform(y)
+
+    @staticmethod
+    def _to_naive_utc(timestamp: Timestamp) -> Timestamp:
+        """Convert a timestamp to the timezone naive UTC timestamps of TimeSeries time indexes.
+
+        Args:
+            timestamp (Timestamp): Timezone aware or naive timestamp.
+
+        Returns:
+            Timestamp: Timezone naive timestamp.
+        """
+        return timestamp.tz_convert("UTC").tz_localize(None) if timestamp.tzinfo is not None else timestamp
+
+
+class DatumState():
+    """State of the processing of the weather datum of a single coordinate, from which a newer datum of the same coordinate is processed incrementally.
+
+    Holds the last raw data, its interpolated rows, the accumulated rolling window sums and the processed (engineered but unscaled) rows.
+    """
+
+    def __init__(self, dataset: BaseDataset) -> None:
+        """Create a state without any processed data.
+
+        Args:
+            dataset (BaseDataset): Dataset whose processing of data is continued.
+        """
+        self.dataset = dataset
+        self.raw: Optional[DataFrame] = None
+        self.interpolated: Optional[DataFrame] = None
+        self.processed: Optional[DataFrame] = None
+        self.rolling_state = dataset._new_rolling_state()
+        # Number of leading rows of the interpolated data without complete rolling windows, dropped from the processed rows
+        has_rolling_features = bool(dataset.rolling_sum_columns or dataset.rolling_mean_columns)
+        self._incomplete_rows = max(dataset.rolling_window_sizes, default=1) - 1 if has_rolling_features else 0
+
+    def update(self, raw: DataFrame) -> Tuple[DataFrame, Optional[Timestamp]]:
+        """Process raw data, reprocessing only the rows that are new or follow a change since the last processed raw data.
+
+        The result matches processing raw from scratch (strip trailing NaNs, interpolate, add engineered features), up to float rounding.
+
+        Args:
+            raw (DataFrame): Hourly parameters of the datum.
+
+        Returns:
+            tuple[DataFrame, Timestamp | None]: A copy of the processed rows, and the earliest time at which they differ from the previously processed rows. None if only leading rows were dropped.
+        """
+        resume_from = self._resume_time(raw)
+        unchanged = resume_from is not None and raw.equals(self.raw.loc[raw.index[0]:])  # type: ignore[union-attr]
+
+        stripped = self.dataset._strip_trailing_nans(raw).astype(np.float32, copy=False)
+        if resume_from is None:
+            self.rolling_state = self.dataset._new_rolling_state()
+            kept_interpolated = stripped.iloc[:0]
+            kept_processed = None
+        else:
+            assert self.interpolated is not None and self.processed is not None
+            kept_interpolated = self.interpolated.loc[(self.interpolated.index >= raw.index[0]) & (self.interpolated.index < resume_from)]
+            kept_processed = self.processed.loc[self.processed.index < resume_from]
+            stripped = stripped.loc[stripped.index >= resume_from]
+
+        # Rows before the new first row are forgotten, so that windows reaching before it are incomplete as when processing raw from scratch
+        self.rolling_state.drop_before(raw.index[0])
+
+        new_interpolated = stripped.interpolate(limit_direction="both")
+        new_processed = self.dataset._add_engineered_features(new_interpolated.copy(), rolling_state=self.rolling_state)
+
+        self.raw = raw.copy()
+        self.interpolated = concat([kept_interpolated, new_interpolated])
+        processed = new_processed if kept_processed is None else concat([kept_processed, new_processed])
+        if len(self.interpolated) > self._incomplete_rows:
+            processed = processed.loc[processed.index >= self.interpolated.index[self._incomplete_rows]]
+        else:
+            processed = processed.iloc[:0]
+        self.processed = processed
+
+        changed_from = None
+        if not unchanged:
+            changed_from = new_processed.index[0] if len(new_processed) else resume_from
+        return processed.copy(), changed_from
+
+    def _resume_time(self, raw: DataFrame) -> Optional[Timestamp]:
+        """Find the time from which raw must be reprocessed.
+
+        This is the last row before the first change (or new row) that is valid in every column, as the interpolation of the rows before a fully valid row does not depend on the rows after it.
+
+        Args:
+            raw (DataFrame): New hourly parameters of the datum.
+
+        Returns:
+            Timestamp | None: Time from which to reprocess raw, or None if raw must be processed from scratch.
+        """
+        if self.raw is None or self.interpolated is None or not len(raw) or not raw.columns.equals(self.raw.columns) or raw.index[0] < self.raw.index[0]:
+            return None
+
+        # Leading NaNs of the new first row would be back filled rather than interpolated from the rows before it
+        if raw.iloc[0].isna().any():
+            return None
+
+        old = self.raw.loc[raw.index[0]:]
+        common = old.index.intersection(raw.index)
+        # raw starts after the end of the old raw data, or does not share any of its rows
+        if not len(common):
+            return None
+
+        old_values = old.loc[common].to_numpy()
+        new_values = raw.loc[common].to_numpy()
+        differs = ~((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values))).all(axis=1)
+        first_change = common[differs][0] if differs.any() else old.index[-1] + (old.index[-1] - old.index[-2] if len(old) > 1 else Timedelta(hours=1))
+
+        valid = old.loc[old.index < first_change].notna().all(axis=1)
+        valid_times = valid.index[valid.to_numpy()]
+        if not len(valid_times) or valid_times[-1] > self.interpolated.index[-1]:
+            return None
+        return valid_times[-1]
@@ -1,16 +1,21 @@
+from __future__ import annotations
+
+import copy
 import json
 import os
 import pickle
-from typing import Mapping
-
-from darts import TimeSeries
-from darts.dataprocessing.transformers import Scaler
-from darts.models.forecasting.forecasting_model import ForecastingModel
+from typing import TYPE_CHECKING, Mapping, Optional, Tuple
 
 from rlf.forecasting.base_forecaster import BaseForecaster, DEFAULT_WORK_DIR
 from rlf.forecasting.catchment_data import CatchmentData
 from rlf.forecasting.inference_dataset import InferenceDataset
-from rlf.models.ensemble import Ensemble
+from rlf.forecasting.model_registry import ModelRegistry
+
+# darts (and torch through the ensemble) are imported on first use rather than with this module, as they are slow to import
+if TYPE_CHECKING:
+    from darts import TimeSeries
+    from darts.dataprocessing.transformers import Scaler
+    from darts.models.forecasting.forecasting_model import ForecastingModel
 
 
 class InferenceForecaster(BaseForecaster):
@@ -21,7 +26,8 @@ class InferenceForecaster(BaseForecaster):
         catchment_data: CatchmentData,
         root_dir: str = DEFAULT_WORK_DIR,
         filename: str = "frcstr",
-        load_cpu: bool = False
+        load_cpu: bool = False,
+        model_registry: Optional[ModelRegistry] = None
     ) -> None:
         """Create an inference forecaster.
 
@@ -30,13 +36,17 @@ class InferenceForecaster(BaseForecaster):
             root_dir (str, optional): Root directory where the model should be located. Defaults to DEFAULT_WORK_DIR.
             filename (str, optional): Name of file where the pickled model is located. Defaults to "frcstr".
             load_cpu (bool): If True then when loading the models set them to run inference on CPU. Defaults to False.
+            model_registry (ModelRegistry, optional): Registry of loaded models shared by forecasters of the same process. The model, scalers and metadata are only loaded from disk if they are not in the registry or changed on disk. Always loaded from disk if None. Defaults to None.
         """
         super().__init__(catchment_data=catchment_data, root_dir=root_dir, filename=filename)
 
-        self._model = self._load_ensemble(load_cpu)
+        if model_registry is None:
+            self._model, scalers, metadata = self._load(load_cpu)
+        else:
+            self._model, scalers, metadata = model_registry.get(self.work_dir, lambda: self._load(load_cpu), variant=(self.scaler_filename, load_cpu))
+            # The metadata is shared with other forecasters, so copy it before handing out parts of it
+            metadata = copy.deepcopy(metadata)
 
-        scalers = self._load_scalers()
-        metadata = self._load_metadata()
         catchment_data.columns = metadata["api_columns"]
         self.use_future_covariates = metadata["use_future_covariates"] if "use_future_covariates" in metadata else True
 
@@ -58,6 +68,17 @@ class InferenceForecaster(BaseForecaster):
         """
         return self._model
 
+    def _load(self, load_cpu: bool) -> Tuple[ForecastingModel, Mapping[str, Scaler], dict]:
+        """Load the underlying ForecastingModel, scalers and metadata from disk.
+
+        Args:
+            load_cpu (bool): Whether or not to load models to run inference on CPU.
+
+        Returns:
+            tuple(ForecastingModel, Mapping[str, Scaler], dict): Loaded model, scalers and metadata.
+        """
+        return self._load_ensemble(load_cpu), self._load_scalers(), self._load_metadata()
+
     def _load_ensemble(self, load_cpu: bool) -> ForecastingModel:
         """Load the underlying ForecastingModel.
 
@@ -67,6 +88,8 @@ class InferenceForecaster(BaseForecaster):
         Returns:
             ForecastingModel: Loaded ForecastingModel.
         """
+        from rlf.models.ensemble import Ensemble
+
         model = Ensemble.load(os.path.join(self.work_dir), load_cpu)
         return model
 
@@ -0,0 +1,125 @@
+from collections import OrderedDict
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+DEFAULT_MAX_SIZE_BYTES = 2 * 1024 ** 3
+
+
+class ModelRegistry():
+    """In memory cache of loaded models, for reuse by every forecaster of a process (e.g. across invocations of a warm Lambda container).
+
+    Entries are keyed by model directory and invalidated when any file within the directory changes (by size or modification time). The size of an entry is estimated from the size of its files on disk. Once the registry grows past its size cap, the least recently used entries are evicted.
+    """
+
+    def __init__(self, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES) -> None:
+        """Create an empty ModelRegistry.
+
+        Args:
+            max_size_bytes (int, optional): Total estimated size of loaded models above which least recently used models are evicted. Defaults to DEFAULT_MAX_SIZE_BYTES (2 GiB).
+
+        Raises:
+            ValueError: If max_size_bytes is negative.
+        """
+        if max_size_bytes < 0:
+            raise ValueError(f"max_size_bytes must not be negative, got {max_size_bytes}")
+
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        # key -> (version, size in bytes, loaded value), ordered from least to most recently used
+        self._entries: "OrderedDict[Hashable, Tuple[tuple, int, Any]]" = OrderedDict()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _version(model_dir: str) -> Tuple[tuple, int]:
+        """Identify the version of the files of a model directory.
+
+        Args:
+            model_dir (str): Model directory.
+
+        Raises:
+            FileNotFoundError: If model_dir does not exist.
+
+        Returns:
+            tuple(tuple, int): The (relative path, size, modification time) of each file in the directory, and their total size in bytes.
+        """
+        if not os.path.isdir(model_dir):
+            raise FileNotFoundError(f"Could not find a model directory at path: {model_dir}")
+
+        files = []
+        for dir_path, _, filenames in os.walk(model_dir):
+            for filename in filenames:
+                stat = os.stat(os.path.join(dir_path, filename))
+                files.append((os.path.relpath(os.path.join(dir_path, filename), model_dir), stat.st_size, stat.st_mtime_ns))
+        files.sort()
+        return tuple(files), sum(size for _, size, _ in files)
+
+    def get(self, model_dir: str, load: Callable[[], Any], variant: Optional[Hashable] = None) -> Any:
+        """Get the loaded model of a directory, loading it only if it is not cached or its files changed.
+
+        Args:
+            model_dir (str): Directory holding the model files.
+            load (Callable[[], Any]): Loads the model from model_dir. Only called on a cache miss.
+            variant (Hashable, optional): Distinguishes different ways of loading the same directory, e.g. on CPU or GPU. Defaults to None.
+
+        Raises:
+            FileNotFoundError: If model_dir does not exist.
+
+        Returns:
+            Any: The value returned by load. Shared between all callers, so it must not be modified.
+        """
+        key = (os.path.abspath(model_dir), variant)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same model wait for a single load
+        with key_lock:
+            version, size = self._version(model_dir)
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self.misses += 1
+
+            logging.info(f"Model registry miss for {model_dir}, loading")
+            value = load()
+
+            with self._lock:
+                self._entries[key] = (version, size, value)
+                self._entries.move_to_end(key)
+                self._evict(keep=key)
+            return value
+
+    def size_bytes(self) -> int:
+        """Get the total estimated size of the loaded models.
+
+        Returns:
+            int: Size in bytes.
+        """
+        with self._lock:
+            return sum(size for _, size, _ in self._entries.values())
+
+    def clear(self) -> None:
+        """Remove every loaded model from the registry."""
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self, keep: Hashable) -> None:
+        """Remove least recently used models until the registry is within its size cap. Expects self._lock to be held.
+
+        Args:
+            keep (Hashable): Key of a model which must not be evicted, i.e. the model that was just loaded.
+        """
+        total_size = sum(size for _, size, _ in self._entries.values())
+        for key in list(self._entries):
+            if total_size <= self.max_size_bytes:
+                break
+            if key == keep:
+                continue
+            total_size -= self._entries.pop(key)[1]
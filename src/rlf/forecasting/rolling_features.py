@@ -0,0 +1,143 @@
+from typing import Hashable, List, Optional, Sequence
+
+import numpy as np
+from pandas import DataFrame, Index
+
+
+def rolling_feature_names(sum_columns: Sequence[str], mean_columns: Sequence[str], window_sizes: Sequence[int]) -> List[str]:
+    """Get the names of the rolling features of rolling_features, in order.
+
+    Args:
+        sum_columns (Sequence[str]): Columns to generate rolling sums for.
+        mean_columns (Sequence[str]): Columns to generate rolling means for.
+        window_sizes (Sequence[int]): Window sizes to generate rolling sums and means for.
+
+    Returns:
+        list[str]: For each window size, the name of the rolling sum of each sum column followed by the rolling mean of each mean column.
+    """
+    names = []
+    for window_size in dict.fromkeys(window_sizes):
+        names += [f"{column}_sum_{window_size}" for column in sum_columns]
+        names += [f"{column}_mean_{window_size}" for column in mean_columns]
+    return names
+
+
+def rolling_features(df: DataFrame, sum_columns: Sequence[str], mean_columns: Sequence[str], window_sizes: Sequence[int]) -> DataFrame:
+    """Compute the rolling sums and means of columns of df over every window size, in a single pass over the cumulative sums of the columns.
+
+    Matches df[column].rolling(window_size).sum() and .mean(): the first window_size - 1 rows, and every window containing a NaN, are NaN.
+    The cumulative sums are accumulated in float64 so that sums over long records do not lose precision. The features are returned in float32.
+
+    Args:
+        df (DataFrame): Data to compute rolling features of.
+        sum_columns (Sequence[str]): Columns to generate rolling sums for.
+        mean_columns (Sequence[str]): Columns to generate rolling means for.
+        window_sizes (Sequence[int]): Window sizes to generate rolling sums and means for. Repeated window sizes are only generated once.
+
+    Raises:
+        ValueError: If a window size is less than 1.
+
+    Returns:
+        DataFrame: Rolling features with the same index as df, named and ordered as by rolling_feature_names.
+    """
+    return RollingFeatureState(sum_columns, mean_columns, window_sizes).update(df)
+
+
+class RollingFeatureState():
+    """Cumulative sums of the rolling columns of a sequence of rows, which can be rewound and extended with new rows to compute the rolling features of only those rows.
+
+    Windows are counted in rows, as by pandas rolling windows. A window reaching before the first accumulated row is incomplete and its features are NaN.
+    """
+
+    def __init__(self, sum_columns: Sequence[str], mean_columns: Sequence[str], window_sizes: Sequence[int]) -> None:
+        """Create a RollingFeatureState without any rows.
+
+        Args:
+            sum_columns (Sequence[str]): Columns to generate rolling sums for.
+            mean_columns (Sequence[str]): Columns to generate rolling means for.
+            window_sizes (Sequence[int]): Window sizes to generate rolling sums and means for. Repeated window sizes are only generated once.
+
+        Raises:
+            ValueError: If a window size is less than 1.
+        """
+        self.window_sizes = list(dict.fromkeys(window_sizes))
+        if any(window_size < 1 for window_size in self.window_sizes):
+            raise ValueError(f"Window sizes must be at least 1, got {self.window_sizes}")
+
+        self.feature_names = rolling_feature_names(sum_columns, mean_columns, self.window_sizes)
+        self._columns = list(dict.fromkeys([*sum_columns, *mean_columns]))
+        self._sum_indices = [self._columns.index(column) for column in sum_columns]
+        self._mean_indices = [self._columns.index(column) for column in mean_columns]
+
+        self.index = Index([])
+        # (columns, rows + 1) running totals, in a layout where they run along contiguous memory. The leading column is the total before the first row,
+        # so that the sum over rows [i - window_size + 1, i] is cumsum[:, i + 1] - cumsum[:, i + 1 - window_size]
+        self._cumsum = np.zeros((len(self._columns), 1))
+        # Running count of NaNs in the same layout, None while no row had a NaN
+        self._nan_count: Optional[np.ndarray] = None
+
+    def update(self, df: DataFrame) -> DataFrame:
+        """Replace the accumulated rows from the first row of df onwards with the rows of df, and compute the rolling features of the rows of df.
+
+        Args:
+            df (DataFrame): Rows to accumulate, continuing the accumulated rows before its first row.
+
+        Returns:
+            DataFrame: float32 rolling features of the rows of df, named and ordered as by rolling_feature_names.
+        """
+        position = int(self.index.searchsorted(df.index[0])) if len(df) else len(self.index)
+        num_rows = len(df)
+
+        values = df[self._columns].to_numpy(dtype=np.float64).T
+        is_nan = np.isnan(values)
+        has_nan = bool(is_nan.any())
+
+        cumsum = np.empty((len(self._columns), position + 1 + num_rows))
+        cumsum[:, :position + 1] = self._cumsum[:, :position + 1]
+        np.cumsum(np.where(is_nan, 0.0, values) if has_nan else values, axis=1, out=cumsum[:, position + 1:])
+        cumsum[:, position + 1:] += cumsum[:, position:position + 1]
+
+        nan_count = None
+        if has_nan or self._nan_count is not None:
+            nan_count = np.zeros((len(self._columns), position + 1 + num_rows), dtype=np.int64)
+            if self._nan_count is not None:
+                nan_count[:, :position + 1] = self._nan_count[:, :position + 1]
+            np.cumsum(is_nan, axis=1, out=nan_count[:, position + 1:])
+            nan_count[:, position + 1:] += nan_count[:, position:position + 1]
+
+        self.index = self.index[:position].append(df.index) if position else df.index
+        self._cumsum = cumsum
+        self._nan_count = nan_count
+
+        # One row per feature, i.e. the transpose of the returned features
+        num_sums = len(self._sum_indices)
+        features_per_window = num_sums + len(self._mean_indices)
+        block = np.full((len(self.window_sizes) * features_per_window, num_rows), np.nan, dtype=np.float32)
+        for i, window_size in enumerate(self.window_sizes):
+            # first row of df with a complete window
+            first_row = max(position, window_size - 1)
+            if first_row >= position + num_rows:
+                continue
+
+            window_sums = cumsum[:, first_row + 1:] - cumsum[:, first_row + 1 - window_size:position + 1 + num_rows - window_size]
+            if nan_count is not None:
+                window_nans = nan_count[:, first_row + 1:] - nan_count[:, first_row + 1 - window_size:position + 1 + num_rows - window_size]
+                window_sums[window_nans > 0] = np.nan
+
+            start = i * features_per_window
+            block[start:start + num_sums, first_row - position:] = window_sums[self._sum_indices]
+            block[start + num_sums:start + features_per_window, first_row - position:] = window_sums[self._mean_indices] / window_size
+
+        return DataFrame(block.T, index=df.index, columns=self.feature_names)
+
+    def drop_before(self, time: Hashable) -> None:
+        """Forget the accumulated rows before time. Windows reaching before time are then incomplete.
+
+        Args:
+            time (Hashable): Index value of the first row to keep.
+        """
+        position = int(self.index.searchsorted(time))
+        self.index = self.index[position:]
+        self._cumsum = self._cumsum[:, position:]
+        if self._nan_count is not None:
+            self._nan_count = self._nan_count[:, position:]
@@ -6,6 +6,8 @@ from sklearn.preprocessing import MinMaxScaler
 
 from rlf.forecasting.base_dataset import BaseDataset
 from rlf.forecasting.catchment_data import CatchmentData
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.feature_cache import FeatureCache
 
 
 class TrainingDataset(BaseDataset):
@@ -18,7 +20,9 @@ class TrainingDataset(BaseDataset):
         test_size: int = 24 * 365 * 3,
         rolling_sum_columns: Optional[List[str]] = None,
         rolling_mean_columns: Optional[List[str]] = None,
-        rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24)
+        rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24),
+        feature_cache: Optional[FeatureCache] = None,
+        data_version: Optional[str] = None
     ) -> None:
         """Generate a Dataset for training from a CatchmentData instance.
 
@@ -31,7 +35,15 @@ class TrainingDataset(BaseDataset):
             rolling_sum_columns (list[str], optional): List of columns to compute rolling sums for. Defaults to None.
             rolling_mean_columns (list[str], optional): List of columns to compute rolling means for. Defaults to None.
             rolling_window_sizes (list[int], optional): Window sizes to use for rolling computations. Defaults to 10 days (10 days * 24 hrs/day) and 30 days (30 days * 24 hrs/day).
+            feature_cache (FeatureCache, optional): Cache to load the processed, unscaled X and y from, or store them in, rather than fetching and processing the historical data. Defaults to None.
+            data_version (str, optional): Version of the historical weather and level data, e.g. the date they were last refreshed. Part of the feature cache key, so a new version builds new features. Required with a feature_cache. Defaults to None.
+
+        Raises:
+            ValueError: If the sum of test_size and validation_size is not less than the number of samples, or a feature_cache is given without a data_version.
         """
+        if feature_cache is not None and data_version is None:
+            raise ValueError("A data_version is required to use a feature_cache")
+
         super().__init__(
             catchment_data,
             rolling_sum_columns=rolling_sum_columns,
@@ -40,6 +52,8 @@ class TrainingDataset(BaseDataset):
         )
         self.scaler = Scaler(MinMaxScaler())
         self.target_scaler = Scaler(MinMaxScaler())
+        self.feature_cache = feature_cache
+        self.data_version = data_version
         self.X, self.y = self._load_data()
         if len(self.X) <= test_size + validation_size:
             raise ValueError(f"The sum of test size ({test_size}) and validation size ({validation_size}) must be less than the total number of samples ({len(self.X)}).")
@@ -49,6 +63,35 @@ class TrainingDataset(BaseDataset):
     def _load_data(self) -> Tuple[TimeSeries, TimeSeries]:
         """Load and process data.
 
+        Returns:
+            tuple[TimeSeries, TimeSeries]: Tuple of (X and y) historical data.
+        """
+        if self.feature_cache is None:
+            return self._process_historical()
+
+        assert self.data_version is not None
+        key = FeatureCache.key(self.catchment_data.name,
+                               self.catchment_data.weather_provider.coordinates,
+                               self.catchment_data.columns,
+                               self.rolling_sum_columns,
+                               self.rolling_mean_columns,
+                               self.rolling_window_sizes,
+                               self.data_version)
+        cached = self.feature_cache.load(key)
+        if cached is not None:
+            X, y, meta = cached
+            self.base_columns = meta["base_columns"]
+            self.subsets = {prefix: Coordinate(lon=lon, lat=lat) for prefix, (lon, lat) in meta["subsets"].items()}
+            return X, y
+
+        X, y = self._process_historical()
+        meta = {"base_columns": self.base_columns, "subsets": {prefix: list(coordinate) for prefix, coordinate in self.subsets.items()}}
+        self.feature_cache.store(key, X, y, meta)
+        return X, y
+
+    def _process_historical(self) -> Tuple[TimeSeries, TimeSeries]:
+        """Fetch and process the historical data.
+
         Returns:
             tuple[TimeSeries, TimeSeries]: Tuple of (X and y) historical data.
         """
@@ -1,6 +1,7 @@
 import json
 import os
 import pickle
+from typing import Optional
 
 from darts.metrics.metrics import mae
 from darts.timeseries import TimeSeries
@@ -51,9 +52,18 @@ class TrainingForecaster(BaseForecaster):
         if (os.path.isfile(self.scaler_save_path)):
             raise ValueError(f"{self.scaler_save_path} already exists. Specify a unique save path.")
 
-    def fit(self) -> None:
-        """Fit the underlying Darts ForecastingModel model."""
-        self.model.fit_dataset(self.dataset, use_future_covariates=self.use_future_covariates, retrain_contributing_models=True)
+    def fit(self, max_workers: int = 1, torch_threads_per_worker: Optional[int] = None) -> None:
+        """Fit the underlying Darts ForecastingModel model.
+
+        Args:
+            max_workers (int, optional): Number of worker processes the contributing models are fit in, see Ensemble.fit. Defaults to 1.
+            torch_threads_per_worker (int, optional): Number of threads torch may use in each worker process. Defaults to None, splitting the CPUs between the workers.
+        """
+        self.model.fit_dataset(self.dataset,
+                               use_future_covariates=self.use_future_covariates,
+                               retrain_contributing_models=True,
+                               max_workers=max_workers,
+                               torch_threads_per_worker=torch_threads_per_worker)
         self.save_model()
 
     def save_model(self) -> None:
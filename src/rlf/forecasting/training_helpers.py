@@ -21,12 +21,15 @@ except ImportError as e:
     exit(1)
 
 try:
-    from rlf.aws_dispatcher import AWSDispatcher
+    from rlf.aws_dispatcher import AWSDispatcher, DEFAULT_LOCAL_PATH
     from rlf.forecasting.catchment_data import CatchmentData
     from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
     from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+    from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
     from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
+    from rlf.forecasting.feature_cache import FeatureCache
     from rlf.forecasting.training_dataset import TrainingDataset
+    from rlf.local_file_cache import LocalFileCache
     from rlf.models.contributing_model import ContributingModel
     from rlf.models.ensemble import Ensemble
 except ImportError as e:
@@ -170,7 +173,9 @@ def get_training_data(
     columns: List[str],
     rolling_sum_columns: Optional[List[str]] = None,
     rolling_mean_columns: Optional[List[str]] = None,
-    rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24)
+    rolling_window_sizes: Sequence[int] = (10 * 24, 30 * 24),
+    feature_cache: Optional[FeatureCache] = None,
+    data_version: Optional[str] = None
 ) -> TrainingDataset:
     """Generate the TrainingDataset for the given gauge ID, coordinates, and columns.
 
@@ -181,15 +186,17 @@ def get_training_data(
         rolling_sum_columns (Optional[List[str]], optional): Columns to generate rolling sums for. Defaults to None.
         rolling_mean_columns (Optional[List[str]], optional): Columns to generate rolling means for. Defaults to None.
         rolling_window_sizes (Sequence[int], optional): Window sizes to use for rolling sums and means. Defaults to (10 * 24, 30 * 24).
+        feature_cache (Optional[FeatureCache], optional): Cache of processed features to reuse across jobs with the same data configuration. Defaults to None.
+        data_version (Optional[str], optional): Version of the source weather and level data. Required with a feature_cache. Defaults to None.
 
     Returns:
         TrainingDataset: A TrainingDataset instance for the specified gauge ID, coordinates and columns.
     """
     weather_provider = AWSWeatherProvider(
         coordinates,
-        AWSDispatcher("all-weather-data", "open-meteo")
+        AWSDispatcher("all-weather-data", "open-meteo", local_cache=LocalFileCache(DEFAULT_LOCAL_PATH))
     )
-    level_provider = LevelProviderNWIS(gauge_id)
+    level_provider = LevelProviderNWIS(gauge_id, level_store=LevelStore())
     catchment_data = CatchmentData(
         gauge_id,
         weather_provider,
@@ -199,7 +206,9 @@ def get_training_data(
     dataset = TrainingDataset(catchment_data,
                               rolling_sum_columns=rolling_sum_columns,
                               rolling_mean_columns=rolling_mean_columns,
-                              rolling_window_sizes=rolling_window_sizes)
+                              rolling_window_sizes=rolling_window_sizes,
+                              feature_cache=feature_cache,
+                              data_version=data_version)
     return dataset
 
 
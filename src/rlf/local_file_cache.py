@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Optional, Tuple
+
+from fsspec import AbstractFileSystem
+
+
+DEFAULT_MAX_SIZE_BYTES = 5 * 1024 ** 3
+DEFAULT_EVICTION_GRACE_PERIOD = 30.0
+
+
+class LocalFileCache():
+    """Read-through cache of remote files on local disk.
+
+    Entries are keyed by the remote path and the version (ETag) of the remote file. Whenever a cached file is requested the remote version is checked (a metadata only request) and the file is downloaded again only if it changed. Once the cache grows past its size cap, the least recently used files are evicted, except those used within a grace period, which may have just been handed out to be read.
+
+    Each entry is stored as a data file plus a small json sidecar, both written atomically, so that several processes on the same machine can safely share a cache directory.
+    """
+
+    def __init__(self,
+                 cache_dir: str,
+                 max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 revalidate_after: float = 0.0,
+                 eviction_grace_period: float = DEFAULT_EVICTION_GRACE_PERIOD) -> None:
+        """Create a LocalFileCache storing its files in cache_dir.
+
+        Args:
+            cache_dir (str): Local directory for cached files. Created if it does not exist.
+            max_size_bytes (int, optional): Total size of cached files above which least recently used files are evicted. Defaults to DEFAULT_MAX_SIZE_BYTES (5 GiB).
+            revalidate_after (float, optional): Seconds during which a cached file is served without checking the remote version again. 0 checks on every request. Defaults to 0.0.
+            eviction_grace_period (float, optional): Seconds after its last use during which a file is not evicted, so that it can be read by whoever requested it, even from another thread. Defaults to DEFAULT_EVICTION_GRACE_PERIOD (30s).
+
+        Raises:
+            ValueError: If max_size_bytes, revalidate_after or eviction_grace_period are negative.
+        """
+        if max_size_bytes < 0:
+            raise ValueError(f"max_size_bytes must not be negative, got {max_size_bytes}")
+        if revalidate_after < 0:
+            raise ValueError(f"revalidate_after must not be negative, got {revalidate_after}")
+        if eviction_grace_period < 0:
+            raise ValueError(f"eviction_grace_period must not be negative, got {eviction_grace_period}")
+
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_bytes
+        self.revalidate_after = revalidate_after
+        self.eviction_grace_period = eviction_grace_period
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def _cache_key(path: str) -> str:
+        """Normalize a remote path so that the same file gets the same key with or without protocol, e.g. "s3://bucket/key" and "bucket/key".
+
+        Args:
+            path (str): Remote path.
+
+        Returns:
+            str: Normalized path.
+        """
+        return path.split("://", 1)[-1].lstrip("/")
+
+    def _entry_paths(self, path: str) -> Tuple[str, str]:
+        """Get the local data and metadata file paths for a remote path.
+
+        Args:
+            path (str): Remote path.
+
+        Returns:
+            tuple(str, str): Local paths of the cached data and of its json metadata.
+        """
+        key = hashlib.sha256(self._cache_key(path).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.data"), os.path.join(self.cache_dir, f"{key}.json")
+
+    @staticmethod
+    def _version(info: dict) -> str:
+        """Identify the version of a remote file from its fsspec info.
+
+        Args:
+            info (dict): Output of AbstractFileSystem.info.
+
+        Returns:
+            str: The ETag if the filesystem provides one, else a combination of the size and modification time.
+        """
+        etag = info.get("ETag")
+        if etag is not None:
+            return str(etag)
+        modified = info.get("LastModified", info.get("mtime", info.get("created")))
+        return f"{info.get('size')}-{modified}"
+
+    @staticmethod
+    def _read_entry(meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    @staticmethod
+    def _write_entry(meta_path: str, entry: dict) -> None:
+        tmp_path = f"{meta_path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
+
+    def get(self, fs: AbstractFileSystem, path: str) -> str:
+        """Get a local copy of a remote file, downloading it only if it is not cached or changed remotely.
+
+        Args:
+            fs (AbstractFileSystem): Filesystem the remote file is stored on.
+            path (str): Remote path of the file.
+
+        Raises:
+            FileNotFoundError: If the remote file does not exist.
+
+        Returns:
+            str: Path of the local copy. Only protected from eviction for the eviction grace period, so it should be read straight away.
+        """
+        data_path, meta_path = self._entry_paths(path)
+        entry = self._read_entry(meta_path)
+
+        version = None
+        if entry is not None and self._mark_used(data_path):
+            if time.time() - entry["validated_at"] < self.revalidate_after:
+                return self._hit(data_path)
+            version = self._version(fs.info(path))
+            if version == entry["version"]:
+                entry["validated_at"] = time.time()
+                self._write_entry(meta_path, entry)
+                return self._hit(data_path)
+        if version is None:
+            version = self._version(fs.info(path))
+
+        with self._lock:
+            self.misses += 1
+        logging.debug(f"Local cache miss for {path}")
+
+        tmp_path = f"{data_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            fs.get_file(path, tmp_path)
+            os.replace(tmp_path, data_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._write_entry(meta_path, {"path": path, "version": version, "validated_at": time.time()})
+
+        self._evict(keep=data_path)
+        return data_path
+
+    def _mark_used(self, data_path: str) -> bool:
+        """Mark a cached file as used now, which protects it from eviction for the eviction grace period.
+
+        Args:
+            data_path (str): Local path of the cached data.
+
+        Returns:
+            bool: False if the file is not cached (anymore).
+        """
+        # Under the lock, so that the file cannot be evicted between being checked and being handed out
+        with self._lock:
+            try:
+                os.utime(data_path)
+            except FileNotFoundError:
+                return False
+        return True
+
+    def _hit(self, data_path: str) -> str:
+        """Record a cache hit.
+
+        Args:
+            data_path (str): Local path of the cached data, already marked as used.
+
+        Returns:
+            str: data_path.
+        """
+        with self._lock:
+            self.hits += 1
+        return data_path
+
+    def invalidate(self, path: str) -> None:
+        """Remove a remote file from the cache, e.g. after overwriting it.
+
+        Args:
+            path (str): Remote path of the file.
+        """
+        for local_path in self._entry_paths(path):
+            try:
+                os.remove(local_path)
+            except FileNotFoundError:
+                pass
+
+    def size_bytes(self) -> int:
+        """Get the total size of the cached files.
+
+        Returns:
+            int: Size in bytes.
+        """
+        return sum(size for _, size, _ in self._data_files())
+
+    def _data_files(self) -> list:
+        """List the cached data files.
+
+        Returns:
+            list[tuple(float, int, str)]: (last use time, size in bytes, path) of each cached data file.
+        """
+        data_files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".data"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            data_files.append((stat.st_mtime, stat.st_size, path))
+        return data_files
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Remove least recently used files until the cache is within its size cap. Files used within the eviction grace period are kept.
+
+        Args:
+            keep (str, optional): Local path of a file which must not be evicted, i.e. the file that was just requested. Defaults to None.
+        """
+        data_files = sorted(self._data_files())
+        total_size = sum(size for _, size, _ in data_files)
+        for _, size, path in data_files:
+            if total_size <= self.max_size_bytes:
+                break
+            if path == keep:
+                continue
+            # The file may have been handed out since it was listed, so its last use is checked again under the lock
+            with self._lock:
+                try:
+                    recently_used = time.time() - os.stat(path).st_mtime < self.eviction_grace_period
+                except FileNotFoundError:
+                    recently_used = False
+                if recently_used:
+                    continue
+                for local_path in (path, path[:-len(".data")] + ".json"):
+                    try:
+                        os.remove(local_path)
+                    except FileNotFoundError:
+                        pass
+            total_size -= size
@@ -1,6 +1,6 @@
 import logging
 import pickle
-from typing import Callable, List, Optional, Set, Tuple, Union
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
 
 from darts import TimeSeries
 from darts.models.forecasting.forecasting_model import GlobalForecastingModel
@@ -17,6 +17,10 @@ import pandas as pd
 from rlf.types import CovariateType
 
 
+# Number of prediction times predicted together by historical_forecasts
+DEFAULT_HISTORICAL_FORECASTS_BATCH_SIZE = 256
+
+
 class ContributingModel(GlobalForecastingModel):
     """ContributingModel wraps another forecasting model that is used to contribute to the ensembled prediction."""
 
@@ -92,13 +96,43 @@ class ContributingModel(GlobalForecastingModel):
         overlap_end: bool = False,
         last_points_only: bool = True,
         verbose: bool = False,
-        show_warnings: bool = False
+        show_warnings: bool = False,
+        batch_size: int = DEFAULT_HISTORICAL_FORECASTS_BATCH_SIZE,
     ) -> Union[TimeSeries, List[TimeSeries], CovariateType]:
+        """Compute the historical forecasts of the base model, as darts' historical_forecasts without retraining.
+
+        Rather than predicting once per prediction time, the series truncated at each prediction time are predicted in batches and the covariate columns are filtered once for all predictions.
+
+        Args:
+            series (CovariateType): Target series to forecast.
+            past_covariates (CovariateType, optional): Past covariates, filtered by column_prefix. Defaults to None.
+            future_covariates (CovariateType, optional): Future covariates, filtered by column_prefix. Defaults to None.
+            num_samples (int, optional): Number of samples of probabilistic predictions. Defaults to 1.
+            train_length (int, optional): Unused as the model is never retrained. Defaults to None.
+            start (Union[pd.Timestamp, float, int], optional): First prediction time, see darts. Defaults to None.
+            forecast_horizon (int, optional): Number of points predicted at each prediction time. Defaults to 1.
+            stride (int, optional): Number of time steps between two consecutive prediction times. Defaults to 1.
+            retrain (Union[bool, int, Callable[..., bool]], optional): Must be False. Defaults to True.
+            overlap_end (bool, optional): Whether the forecasts can go beyond the end of series. Defaults to False.
+            last_points_only (bool, optional): Whether to return a single series of the last point of each forecast rather than every forecast. Defaults to True.
+            verbose (bool, optional): Whether to print progress. Defaults to False.
+            show_warnings (bool, optional): Whether to warn if start is ignored. Defaults to False.
+            batch_size (int, optional): Number of prediction times predicted together in a single call to the base model. Defaults to DEFAULT_HISTORICAL_FORECASTS_BATCH_SIZE (256).
+
+        Raises:
+            ValueError: If batch_size is less than 1, or series is too short to be predicted.
+
+        Returns:
+            Union[TimeSeries, List[TimeSeries], CovariateType]: Last points series or list of forecasts, for each series if series is a sequence.
+        """
         past_covariates, future_covariates = self._preprocess_input_data(past_covariates, future_covariates)
 
         # we will never retrain the model and have removed the functionality to do so
         assert retrain is False
 
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
         model = self._base_model
 
         assert model._fit_called
@@ -194,52 +228,42 @@ class ContributingModel(GlobalForecastingModel):
                         start_time_,
                     )
 
+            # The series truncated at each prediction time are predicted as a sequence, batch_size at a time, so that
+            # the base model builds its inputs for a whole batch at once (e.g. one forward pass per batch for torch models)
+            pred_times = historical_forecasts_time_index[::stride]
+            batches = [pred_times[i:i + batch_size] for i in range(0, len(pred_times), batch_size)]
             if len(series) == 1:
                 # Only use tqdm if there's no outer loop
-                iterator = _build_tqdm_iterator(
-                    historical_forecasts_time_index[::stride], verbose
-                )
+                iterator = _build_tqdm_iterator(batches, verbose)
             else:
-                iterator = historical_forecasts_time_index[::stride]
+                iterator = batches
 
             # Either store the whole forecasts or only the last points of each forecast, depending on last_points_only
             forecasts = []
 
             last_points_times = []
-            last_points_values = []
+            last_points_values: List[np.ndarray] = []
 
             # iterate and forecast
-            for pred_time in iterator:
-                train_series = series_.drop_after(pred_time)
-
-                # for regression models with lags=None, lags_past_covariates=None and min(lags_future_covariates)>=0,
-                # the first predictable timestamp is the first timestamp of the series, a dummy ts must be created
-                # to support `predict()`
-                # >>>> I don't think this is needed but I haven't grokked what is happening yet
-                # if len(train_series) == 0:
-                #     train_series = TimeSeries.from_times_and_values(
-                #         times=generate_index(
-                #             start=pred_time - 1 * series_.freq,
-                #             length=1,
-                #             freq=series_.freq,
-                #         ),
-                #         values=np.array([np.NaN]),
-                #     )
-
-                forecast = model._predict_wrapper(
+            for batch in iterator:
+                # series_.drop_after(pred_time) for every prediction time, positioned in a single search of the time index
+                train_series = [series_[:end] for end in np.searchsorted(series_.time_index, batch)]
+
+                # the covariates were filtered once above, so the base model is predicted directly
+                batch_forecasts = model.predict(
                     n=forecast_horizon,
                     series=train_series,
-                    past_covariates=past_covariates_,
-                    future_covariates=future_covariates_,
+                    past_covariates=[past_covariates_] * len(batch) if past_covariates_ is not None else None,
+                    future_covariates=[future_covariates_] * len(batch) if future_covariates_ is not None else None,
                     num_samples=num_samples,
-                    verbose=verbose,
                 )
 
-                if last_points_only:
-                    last_points_values.append(forecast.all_values(copy=False)[-1])
-                    last_points_times.append(forecast.end_time())
-                else:
-                    forecasts.append(forecast)
+                for forecast in batch_forecasts:
+                    if last_points_only:
+                        last_points_values.append(forecast.all_values(copy=False)[-1])
+                        last_points_times.append(forecast.end_time())
+                    else:
+                        forecasts.append(forecast)
 
             if last_points_only:
                 forecasts_list.append(
@@ -291,7 +315,12 @@ class ContributingModel(GlobalForecastingModel):
         if isinstance(covariates, TimeSeries):
             covariates = covariates.drop_columns(self._columns_to_drop(covariates.columns))
         elif covariates is not None:
-            covariates = [covariate.drop_columns(self._columns_to_drop(covariate.columns)) for covariate in covariates]
+            # Batched predictions pass the same covariates once per series, filter each distinct series only once
+            modified: Dict[int, TimeSeries] = {}
+            for covariate in covariates:
+                if id(covariate) not in modified:
+                    modified[id(covariate)] = covariate.drop_columns(self._columns_to_drop(covariate.columns))
+            covariates = [modified[id(covariate)] for covariate in covariates]
         return covariates
 
     def _columns_to_drop(self, all_columns: List[str]) -> List[str]:
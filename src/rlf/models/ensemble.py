@@ -1,11 +1,15 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
 from functools import reduce
 import logging
+import multiprocessing
 import os
 import pickle
-from typing import Callable, List, Optional, Sequence, Union
+from typing import Any, Callable, ContextManager, List, Optional, Sequence, Tuple, Union
 
 from darts.timeseries import TimeSeries
 from darts.models.forecasting.forecasting_model import GlobalForecastingModel
+from darts.models.forecasting.regression_model import RegressionModel
 from darts.utils import _build_tqdm_iterator
 from darts.utils.timeseries_generation import generate_index
 from darts.utils.utils import (
@@ -16,7 +20,8 @@ from darts.utils.utils import (
 import numpy as np
 import pandas as pd
 
-from rlf.models.contributing_model import ContributingModel
+from rlf.models.contributing_model import ContributingModel, DEFAULT_HISTORICAL_FORECASTS_BATCH_SIZE
+from rlf.types import CovariateType
 
 
 class Ensemble(GlobalForecastingModel):
@@ -49,63 +54,125 @@ class Ensemble(GlobalForecastingModel):
             *,
             past_covariates: TimeSeries = None,
             future_covariates: TimeSeries = None,
-            retrain_contributing_models: bool = False) -> "Ensemble":
-        super().fit(series, past_covariates, future_covariates)
-        contributing_model_y = series[:-self._combiner_holdout_size]
+            retrain_contributing_models: bool = False,
+            max_workers: int = 1,
+            torch_threads_per_worker: Optional[int] = None) -> "Ensemble":
+        """Fit the contributing models, then fit the combiner on their historical forecasts over the combiner holdout.
 
-        combiner_start = len(series) - self._combiner_holdout_size + self.contributing_models[0].input_chunk_length
+        The contributing models are independent, so with max_workers > 1 they are fit, and their historical forecasts computed, in parallel worker processes. This is intended for training on CPU.
 
-        for contributing_model in self.contributing_models:
-            contributing_model.fit(series=contributing_model_y, past_covariates=past_covariates, future_covariates=future_covariates)
-
-        del contributing_model_y
-
-        predictions: List[TimeSeries] = [
-            contributing_model.historical_forecasts(
-                series=series,
-                past_covariates=past_covariates,
-                future_covariates=future_covariates,
-                start=combiner_start,
-                last_points_only=True,
-                retrain=False,
-                forecast_horizon=self._target_horizon,
-                stride=self._combiner_train_stride,
-                verbose=False,
-                show_warnings=False
-            )
-            for contributing_model in self.contributing_models
-        ]
-        predictions = reduce(self._stack_op, predictions)
+        Args:
+            series (TimeSeries): Target series to fit on.
+            past_covariates (TimeSeries, optional): Past covariates of series. Defaults to None.
+            future_covariates (TimeSeries, optional): Future covariates of series. Defaults to None.
+            retrain_contributing_models (bool, optional): Whether to fit the contributing models again on the whole series, including the combiner holdout, once the combiner is fit. Defaults to False.
+            max_workers (int, optional): Number of worker processes the contributing models are fit in. 1 fits them one after another in this process. Defaults to 1.
+            torch_threads_per_worker (int, optional): Number of threads torch may use in each worker process. Defaults to None, splitting the CPUs between the workers.
+
+        Raises:
+            ValueError: If max_workers or torch_threads_per_worker is less than 1.
+
+        Returns:
+            Ensemble: self
+        """
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        if torch_threads_per_worker is not None and torch_threads_per_worker < 1:
+            raise ValueError(f"torch_threads_per_worker must be at least 1, got {torch_threads_per_worker}")
 
-        self.combiner.fit(series=series.slice_intersect(predictions), future_covariates=predictions)
+        super().fit(series, past_covariates, future_covariates)
+        contributing_model_y = series[:-self._combiner_holdout_size]
 
-        del predictions
+        combiner_start = len(series) - self._combiner_holdout_size + self.contributing_models[0].input_chunk_length
 
-        if retrain_contributing_models:
-            for contributing_model in self.contributing_models:
-                contributing_model.fit(series=series, past_covariates=past_covariates, future_covariates=future_covariates)
+        with self._contributing_model_executor(max_workers, torch_threads_per_worker) as executor:
+            self.contributing_models = self._map_contributing_models(executor,
+                                                                     _fit_contributing_model,
+                                                                     series=contributing_model_y,
+                                                                     past_covariates=past_covariates,
+                                                                     future_covariates=future_covariates)
+
+            del contributing_model_y
+
+            predictions: List[TimeSeries] = self._map_contributing_models(executor,
+                                                                          _contributing_model_historical_forecasts,
+                                                                          series=series,
+                                                                          past_covariates=past_covariates,
+                                                                          future_covariates=future_covariates,
+                                                                          start=combiner_start,
+                                                                          last_points_only=True,
+                                                                          retrain=False,
+                                                                          forecast_horizon=self._target_horizon,
+                                                                          stride=self._combiner_train_stride,
+                                                                          verbose=False,
+                                                                          show_warnings=False)
+            predictions = reduce(self._stack_op, predictions)
+
+            self.combiner.fit(series=series.slice_intersect(predictions), future_covariates=predictions)
+
+            del predictions
+
+            if retrain_contributing_models:
+                self.contributing_models = self._map_contributing_models(executor,
+                                                                         _fit_contributing_model,
+                                                                         series=series,
+                                                                         past_covariates=past_covariates,
+                                                                         future_covariates=future_covariates)
 
         return self
 
-    def fit_dataset(self, dataset, use_future_covariates: bool = True, retrain_contributing_models: bool = False):
+    def fit_dataset(self,
+                    dataset,
+                    use_future_covariates: bool = True,
+                    retrain_contributing_models: bool = False,
+                    max_workers: int = 1,
+                    torch_threads_per_worker: Optional[int] = None):
         if use_future_covariates:
             return self.fit(
                 dataset.y_train,
                 future_covariates=dataset.X_train,
-                retrain_contributing_models=retrain_contributing_models)
+                retrain_contributing_models=retrain_contributing_models,
+                max_workers=max_workers,
+                torch_threads_per_worker=torch_threads_per_worker)
         else:
             return self.fit(
                 dataset.y_train,
                 past_covariates=dataset.X_train,
-                retrain_contributing_models=retrain_contributing_models)
+                retrain_contributing_models=retrain_contributing_models,
+                max_workers=max_workers,
+                torch_threads_per_worker=torch_threads_per_worker)
 
     def predict(self,
                 n: int,
-                series: TimeSeries,
-                past_covariates: TimeSeries = None,
-                future_covariates: TimeSeries = None,
+                series: CovariateType,
+                past_covariates: Optional[CovariateType] = None,
+                future_covariates: Optional[CovariateType] = None,
                 num_samples: int = 1,
-                verbose: bool = False) -> TimeSeries:
+                verbose: bool = False) -> CovariateType:
+        """Predict n points after the end of the given series.
+
+        A sequence of series (e.g. one per catchment sharing this ensemble's architecture) is predicted as a batch: each contributing model and the combiner are called once for the whole sequence rather than once per series.
+
+        Args:
+            n (int): Number of points to predict.
+            series (CovariateType): Target series, or sequence of target series, to predict from.
+            past_covariates (CovariateType, optional): Past covariates matching series, i.e. a sequence of the same length if series is a sequence. Defaults to None.
+            future_covariates (CovariateType, optional): Future covariates matching series, i.e. a sequence of the same length if series is a sequence. Defaults to None.
+            num_samples (int, optional): Unused, predictions are deterministic. Defaults to 1.
+            verbose (bool, optional): Whether to print progress. Defaults to False.
+
+        Raises:
+            ValueError: If the covariates do not match series.
+
+        Returns:
+            CovariateType: Predictions, a sequence with one prediction per series if series is a sequence.
+        """
+        for name, covariates in (("past_covariates", past_covariates), ("future_covariates", future_covariates)):
+            if covariates is None:
+                continue
+            if isinstance(series, TimeSeries) != isinstance(covariates, TimeSeries) or (not isinstance(series, TimeSeries) and len(series) != len(covariates)):
+                raise ValueError(f"{name} must be a single TimeSeries if series is a single TimeSeries, or a sequence of the same length as series")
+
         predictions = self._compute_and_stack_contributing_predictions(n,
                                                                        series,
                                                                        past_covariates=past_covariates,
@@ -128,6 +195,7 @@ class Ensemble(GlobalForecastingModel):
         last_points_only: bool = True,
         verbose: bool = False,
         show_warnings: bool = True,
+        batch_size: int = DEFAULT_HISTORICAL_FORECASTS_BATCH_SIZE,
     ) -> Union[
         TimeSeries, List[TimeSeries], Sequence[TimeSeries], Sequence[List[TimeSeries]]
     ]:
@@ -213,6 +281,9 @@ class Ensemble(GlobalForecastingModel):
             Whether to print progress.
         show_warnings
             Whether to show warnings related to parameters `start`, and `train_length`.
+        batch_size
+            Number of prediction times predicted together in a single call to each contributing model and the
+            combiner. Larger batches are faster but hold more truncated series and forecasts in memory at once.
         Returns
         -------
         TimeSeries or List[TimeSeries] or List[List[TimeSeries]]
@@ -230,6 +301,9 @@ class Ensemble(GlobalForecastingModel):
         # we will never retrain the model and have removed the functionality to do so
         assert retrain is False
 
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+
         model: Ensemble = self
 
         assert model._fit_called
@@ -325,52 +399,57 @@ class Ensemble(GlobalForecastingModel):
                         start_time_,
                     )
 
+            # Rather than predicting once per prediction time, the series truncated at each prediction time are predicted
+            # as a sequence, batch_size at a time, so that every contributing model and the combiner build their inputs
+            # for a whole batch at once and are called once per batch
+            pred_times = historical_forecasts_time_index[::stride]
+            batches = [pred_times[i:i + batch_size] for i in range(0, len(pred_times), batch_size)]
             if len(series) == 1:
                 # Only use tqdm if there's no outer loop
-                iterator = _build_tqdm_iterator(
-                    historical_forecasts_time_index[::stride], verbose
-                )
+                iterator = _build_tqdm_iterator(batches, verbose)
             else:
-                iterator = historical_forecasts_time_index[::stride]
+                iterator = batches
 
             # Either store the whole forecasts or only the last points of each forecast, depending on last_points_only
             forecasts = []
 
             last_points_times = []
-            last_points_values = []
+            last_points_values: List[np.ndarray] = []
+
+            combine_last_points = last_points_only and model._combines_time_steps_independently(series_)
 
             # iterate and forecast
-            for pred_time in iterator:
-                train_series = series_.drop_after(pred_time)
-
-                # for regression models with lags=None, lags_past_covariates=None and min(lags_future_covariates)>=0,
-                # the first predictable timestamp is the first timestamp of the series, a dummy ts must be created
-                # to support `predict()`
-                # >>>> I don't think this is needed but I haven't grokked what is happening yet
-                # if len(train_series) == 0:
-                #     train_series = TimeSeries.from_times_and_values(
-                #         times=generate_index(
-                #             start=pred_time - 1 * series_.freq,
-                #             length=1,
-                #             freq=series_.freq,
-                #         ),
-                #         values=np.array([np.NaN]),
-                #     )
-
-                forecast = model._predict_wrapper(
+            for batch in iterator:
+                # series_.drop_after(pred_time) for every prediction time, positioned in a single search of the time index
+                train_series = [series_[:end] for end in np.searchsorted(series_.time_index, batch)]
+                batch_past_covariates = [past_covariates_] * len(batch) if past_covariates_ is not None else None
+                batch_future_covariates = [future_covariates_] * len(batch) if future_covariates_ is not None else None
+
+                if combine_last_points:
+                    batch_times, batch_values = model._predict_last_points(
+                        forecast_horizon,
+                        train_series,
+                        past_covariates=batch_past_covariates,
+                        future_covariates=batch_future_covariates,
+                    )
+                    last_points_times.extend(batch_times)
+                    last_points_values.extend(batch_values)
+                    continue
+
+                batch_forecasts = model.predict(
                     n=forecast_horizon,
                     series=train_series,
-                    past_covariates=past_covariates_,
-                    future_covariates=future_covariates_,
+                    past_covariates=batch_past_covariates,
+                    future_covariates=batch_future_covariates,
                     num_samples=num_samples,
-                    verbose=verbose,
                 )
 
-                if last_points_only:
-                    last_points_values.append(forecast.all_values(copy=False)[-1])
-                    last_points_times.append(forecast.end_time())
-                else:
-                    forecasts.append(forecast)
+                for forecast in batch_forecasts:
+                    if last_points_only:
+                        last_points_values.append(forecast.all_values(copy=False)[-1])
+                        last_points_times.append(forecast.end_time())
+                    else:
+                        forecasts.append(forecast)
 
             if last_points_only:
                 forecasts_list.append(
@@ -426,17 +505,118 @@ class Ensemble(GlobalForecastingModel):
 
     def _compute_and_stack_contributing_predictions(self,
                                                     n: int,
-                                                    series: TimeSeries,
-                                                    past_covariates: Optional[TimeSeries] = None,
-                                                    future_covariates: Optional[TimeSeries] = None) -> TimeSeries:
+                                                    series: CovariateType,
+                                                    past_covariates: Optional[CovariateType] = None,
+                                                    future_covariates: Optional[CovariateType] = None) -> CovariateType:
         predictions = [
             contributing_model.predict(n, series=series, past_covariates=past_covariates, future_covariates=future_covariates, verbose=False)
             for contributing_model in self.contributing_models
         ]
 
-        predictions = reduce(self._stack_op, predictions)
+        if isinstance(series, TimeSeries):
+            return reduce(self._stack_op, predictions)
+
+        # one prediction per series from each contributing model, stack those of the same series
+        return [reduce(self._stack_op, series_predictions) for series_predictions in zip(*predictions)]
+
+    def _combines_time_steps_independently(self, series: TimeSeries) -> bool:
+        """Whether each combiner prediction only depends on the contributing model predictions of the same time step.
+
+        This is the case for a deterministic regression combiner using only the current future covariates, e.g. RegressionModel(lags=None, lags_future_covariates=[0]).
 
-        return predictions
+        Args:
+            series (TimeSeries): Target series that will be predicted.
+
+        Returns:
+            bool: True if the last point of a forecast can be combined from the last points of the contributing model predictions alone.
+        """
+        combiner = self.combiner
+        return (isinstance(combiner, RegressionModel)
+                and combiner.lags == {"future": [0]}
+                and combiner.output_chunk_length == 1
+                and not combiner._is_probabilistic()
+                and not combiner.add_encoders
+                and series.static_covariates is None)
+
+    def _predict_last_points(self,
+                             n: int,
+                             series: Sequence[TimeSeries],
+                             past_covariates: Optional[Sequence[TimeSeries]] = None,
+                             future_covariates: Optional[Sequence[TimeSeries]] = None) -> Tuple[List[pd.Timestamp], np.ndarray]:
+        """Predict only the last of n points after the end of each series, with a single combiner call for all series.
+
+        Only valid if _combines_time_steps_independently.
+
+        Args:
+            n (int): Number of points after the end of each series to predict the last of.
+            series (Sequence[TimeSeries]): Target series to predict from.
+            past_covariates (Sequence[TimeSeries], optional): Past covariates of each series. Defaults to None.
+            future_covariates (Sequence[TimeSeries], optional): Future covariates of each series. Defaults to None.
+
+        Returns:
+            tuple(list[pd.Timestamp], np.ndarray): Time of the last point of each forecast, and their values with shape (series, components, samples).
+        """
+        predictions = [
+            contributing_model.predict(n, series=series, past_covariates=past_covariates, future_covariates=future_covariates, verbose=False)
+            for contributing_model in self.contributing_models
+        ]
+
+        # (series, components) array of the last points of the contributing predictions, with the components in the order they are stacked in
+        contributing_last_points = np.concatenate([
+            np.stack([prediction.all_values(copy=False)[-1, :, 0] for prediction in model_predictions])
+            for model_predictions in predictions
+        ], axis=1)
+
+        # These are exactly the features of the combiner's fitted scikit-learn model, so it predicts all last points at once
+        values = self.combiner.model.predict(contributing_last_points).reshape(len(contributing_last_points), -1)
+        return [prediction.end_time() for prediction in predictions[0]], values[:, :, np.newaxis]
+
+    @staticmethod
+    def _contributing_model_executor(max_workers: int, torch_threads_per_worker: Optional[int] = None) -> ContextManager[Optional[Executor]]:
+        """Create the pool of worker processes contributing models are fit in.
+
+        Args:
+            max_workers (int): Number of worker processes. No pool is created for a single worker.
+            torch_threads_per_worker (int, optional): Number of threads torch may use in each worker process. Defaults to None, splitting the CPUs between the workers.
+
+        Returns:
+            ContextManager[Optional[Executor]]: Process pool, or None if max_workers is 1.
+        """
+        if max_workers == 1:
+            return nullcontext()
+
+        if torch_threads_per_worker is None:
+            torch_threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+
+        # Worker processes are spawned rather than forked, as forking a process which already used torch's thread pools can deadlock
+        return ProcessPoolExecutor(max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_limit_torch_threads,
+                                   initargs=(torch_threads_per_worker,))
+
+    def _map_contributing_models(self, executor: Optional[Executor], function: Callable[..., Any], **kwargs) -> list:
+        """Call function on each contributing model, in the worker processes of executor if given.
+
+        When called in worker processes, the past and future covariates in kwargs are narrowed to the columns of each contributing model before they are sent to its worker, so that each task only carries the data its model uses.
+
+        Args:
+            executor (Executor, optional): Worker processes to call function in, or None to call it in this process.
+            function (Callable[..., Any]): Module level function taking a contributing model and kwargs.
+
+        Returns:
+            list: Result of function for each contributing model, in order.
+        """
+        if executor is None:
+            return [function(contributing_model, **kwargs) for contributing_model in self.contributing_models]
+
+        futures = []
+        for contributing_model in self.contributing_models:
+            model_kwargs = dict(kwargs)
+            if "past_covariates" in kwargs or "future_covariates" in kwargs:
+                model_kwargs["past_covariates"], model_kwargs["future_covariates"] = contributing_model._preprocess_input_data(
+                    kwargs.get("past_covariates"), kwargs.get("future_covariates"))
+            futures.append(executor.submit(function, contributing_model, **model_kwargs))
+        return [future.result() for future in futures]
 
     @staticmethod
     def _stack_op(a: TimeSeries, b: TimeSeries) -> TimeSeries:
@@ -444,3 +624,33 @@ class Ensemble(GlobalForecastingModel):
 
     def _model_encoder_settings(self):
         raise NotImplementedError()
+
+
+def _limit_torch_threads(num_threads: int) -> None:
+    """Limit the threads torch uses in a worker process, so that parallel workers do not oversubscribe the CPU.
+
+    Args:
+        num_threads (int): Number of threads.
+    """
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def _fit_contributing_model(contributing_model: ContributingModel, **kwargs) -> ContributingModel:
+    """Fit a contributing model. Module level so that it can be called in worker processes.
+
+    Returns:
+        ContributingModel: The fitted model.
+    """
+    contributing_model.fit(**kwargs)
+    return contributing_model
+
+
+def _contributing_model_historical_forecasts(contributing_model: ContributingModel, **kwargs) -> TimeSeries:
+    """Compute the historical forecasts of a contributing model. Module level so that it can be called in worker processes.
+
+    Returns:
+        TimeSeries: Historical forecasts of the model.
+    """
+    return contributing_model.historical_forecasts(**kwargs)
@@ -1,13 +1,25 @@
+import fsspec
 import pytest
 
+from rlf.aws_dispatcher import AWSDispatcher
+
 
 def pytest_addoption(parser):
     parser.addoption(
         "--fast", action="store_true", default=False, help="skip slow tests"
     )
+    parser.addoption(
+        "--benchmark", action="store_true", default=False, help="run wall clock benchmarks"
+    )
 
 
 def pytest_collection_modifyitems(config, items):
+    # Wall clock benchmarks depend on the load of the machine, so they only run when asked for
+    if not config.getoption("--benchmark"):
+        skip_benchmark = pytest.mark.skip(reason="need --benchmark option to run")
+        for item in items:
+            if "benchmark" in item.keywords:
+                item.add_marker(skip_benchmark)
     if not config.getoption("--fast"):
         # --fast given in cli: skip slow tests
         return
@@ -15,3 +27,14 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if "slow" in item.keywords:
             item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def memory_aws_dispatcher():
+    """AWSDispatcher backed by an in-memory filesystem so that it can be used without AWS credentials."""
+    aws_dispatcher = AWSDispatcher("fake-bucket", "testing")
+    aws_dispatcher.s3 = fsspec.filesystem("memory")
+    aws_dispatcher.working_dir = "memory://fake-bucket/testing"
+    yield aws_dispatcher
+    if aws_dispatcher.s3.exists("memory://fake-bucket"):
+        aws_dispatcher.s3.rm("memory://fake-bucket", recursive=True)
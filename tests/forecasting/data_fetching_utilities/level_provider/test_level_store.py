@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from rlf.forecasting.data_fetching_utilities.level_provider import level_provider_nwis
+from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+from rlf.forecasting.data_fetching_utilities.level_provider.level_store import LevelStore
+
+
+class FakeNWIS():
+    """Serves 15 minute observations up to a movable 'now', recording the requested date ranges."""
+
+    def __init__(self, now: str) -> None:
+        self.now = pd.Timestamp(now, tz="UTC")
+        self.requests: list = []
+
+    def get_record(self, sites, service, start, end, parameterCd):
+        self.requests.append((start, end))
+        index = pd.date_range(pd.Timestamp("2022-01-01", tz="UTC"), self.now, freq="15min", name="datetime")
+        df = pd.DataFrame({parameterCd: range(len(index)), f"{parameterCd}_cd": "A", "site_no": sites}, index=index, dtype=object)
+        df[parameterCd] = df[parameterCd].astype(float)
+        in_range = df.index >= pd.Timestamp(start, tz="UTC")
+        if end is not None:
+            in_range &= df.index < pd.Timestamp(end, tz="UTC") + pd.Timedelta(days=1)
+        return df[in_range]
+
+
+@pytest.fixture
+def fake_nwis(monkeypatch):
+    fake_nwis = FakeNWIS("2022-03-01 12:00")
+    monkeypatch.setattr(level_provider_nwis, "nwis", fake_nwis)
+    return fake_nwis
+
+
+def test_fetch_level_matches_direct_fetch(tmp_path, fake_nwis):
+    direct = LevelProviderNWIS("1234").fetch_level(start="2022-02-01", end="2022-02-10")
+    stored = LevelProviderNWIS("1234", level_store=LevelStore(str(tmp_path))).fetch_level(start="2022-02-01", end="2022-02-10")
+    pd.testing.assert_frame_equal(stored, direct)
+
+
+def test_incremental_fetch(tmp_path, fake_nwis):
+    level_store = LevelStore(str(tmp_path), refresh_after=0)
+    level_provider = LevelProviderNWIS("1234", level_store=level_store)
+
+    level_provider.fetch_level(start="2022-02-01")
+    assert fake_nwis.requests == [("2022-02-01", None)]
+
+    # Ranges within what has been fetched are served from the store
+    level_provider.fetch_level(start="2022-02-10", end="2022-02-20")
+    assert len(fake_nwis.requests) == 1
+
+    # Only newer observations are fetched
+    fake_nwis.now = pd.Timestamp("2022-03-05 12:00", tz="UTC")
+    level = level_provider.fetch_level(start="2022-02-01")
+    assert fake_nwis.requests[-1] == ("2022-02-28", None)
+    assert level.index[-1] == pd.Timestamp("2022-03-05 12:00", tz="UTC")
+
+    # Only older observations than the earliest fetched are fetched
+    level = level_provider.fetch_level(start="2022-01-15", end="2022-02-05")
+    assert fake_nwis.requests[-1] == ("2022-01-15", "2022-02-01")
+    pd.testing.assert_frame_equal(level, LevelProviderNWIS("1234").fetch_level(start="2022-01-15", end="2022-02-05"))
+
+    # The store is shared with other instances
+    LevelProviderNWIS("1234", level_store=LevelStore(str(tmp_path), refresh_after=3600)).fetch_level(start="2022-01-20")
+    assert len(fake_nwis.requests) == 4
+
+
+def test_recent_level_refresh(tmp_path, fake_nwis):
+    fake_nwis.now = pd.Timestamp.now(tz="UTC")
+    level_provider = LevelProviderNWIS("1234", level_store=LevelStore(str(tmp_path), refresh_after=3600))
+    assert len(level_provider.fetch_recent_level(5)) == 5
+
+    # New observations are not fetched again within refresh_after
+    level_provider.fetch_recent_level(5)
+    assert len(fake_nwis.requests) == 1
+
+
+def test_invalid_refresh_after(tmp_path):
+    with pytest.raises(ValueError):
+        LevelStore(str(tmp_path), refresh_after=-1)
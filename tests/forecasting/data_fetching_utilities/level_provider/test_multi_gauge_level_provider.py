@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from rlf.forecasting.catchment_data import CatchmentData
+from rlf.forecasting.data_fetching_utilities.level_provider import level_provider_nwis, multi_gauge_level_provider
+from rlf.forecasting.data_fetching_utilities.level_provider.level_provider_nwis import LevelProviderNWIS
+from rlf.forecasting.data_fetching_utilities.level_provider.multi_gauge_level_provider import MultiGaugeLevelProvider
+
+
+class FakeNWIS():
+    """Serves 15 minute observations for any site except "missing", recording the requested sites."""
+
+    def __init__(self) -> None:
+        self.requests: list = []
+
+    def get_record(self, sites, service, start, end, parameterCd, multi_index=True):
+        sites = [sites] if isinstance(sites, str) else sites
+        self.requests.append(sites)
+        end_ts = pd.Timestamp(end, tz="UTC") + pd.Timedelta(days=1) if end is not None else pd.Timestamp.now(tz="UTC")
+        index = pd.date_range(pd.Timestamp(start, tz="UTC"), end_ts, freq="15min", inclusive="left", name="datetime")
+        dfs = [pd.DataFrame({"site_no": site, parameterCd: float(i) + index.hour, f"{parameterCd}_cd": "P"}, index=index)
+               for i, site in enumerate(sites) if site != "missing"]
+        if not dfs:
+            return pd.DataFrame(columns=["site_no"], index=pd.DatetimeIndex([], tz="UTC", name="datetime"))
+        return pd.concat(dfs).sort_index(kind="stable")
+
+
+@pytest.fixture
+def fake_nwis(monkeypatch):
+    fake_nwis = FakeNWIS()
+    monkeypatch.setattr(level_provider_nwis, "nwis", fake_nwis)
+    monkeypatch.setattr(multi_gauge_level_provider, "nwis", fake_nwis)
+    return fake_nwis
+
+
+def test_recent_level_matches_single_gauge(fake_nwis):
+    gauge_ids = ["101", "102", "103", "104", "105"]
+    multi_gauge_provider = MultiGaugeLevelProvider(gauge_ids, batch_size=2)
+
+    for i, gauge_id in enumerate(gauge_ids):
+        provider = multi_gauge_provider.provider(gauge_id)
+        provider.set_timestamp("22-12-01_12-00")
+        level = provider.fetch_recent_level(24)
+
+        # Each fake site is numbered by its position within its request
+        single_provider = LevelProviderNWIS(gauge_id)
+        single_provider.set_timestamp("22-12-01_12-00")
+        expected = single_provider.fetch_recent_level(24) + i % 2
+        pd.testing.assert_frame_equal(level, expected)
+
+    # Three batched requests were made for all gauges, followed by one request per single gauge provider
+    assert fake_nwis.requests[:3] == [["101", "102"], ["103", "104"], ["105"]]
+    assert len(fake_nwis.requests) == 3 + len(gauge_ids)
+
+
+def test_catchment_data_concurrent(fake_nwis):
+    gauge_ids = [str(i) for i in range(10)]
+    multi_gauge_provider = MultiGaugeLevelProvider(gauge_ids)
+
+    def fetch(gauge_id):
+        catchment_data = CatchmentData(gauge_id, None, multi_gauge_provider.provider(gauge_id))
+        return catchment_data.level_provider.fetch_recent_level(5)
+
+    with ThreadPoolExecutor(4) as executor:
+        levels = list(executor.map(fetch, gauge_ids))
+
+    assert fake_nwis.requests == [gauge_ids]
+    assert all(len(level) == 5 for level in levels)
+
+
+def test_missing_gauge(fake_nwis):
+    multi_gauge_provider = MultiGaugeLevelProvider(["101", "missing"])
+    assert multi_gauge_provider.fetch_raw_level("missing", "2022-01-01", "2022-01-02").empty
+
+    with pytest.raises(ValueError):
+        multi_gauge_provider.provider("999")
+
+
+def test_invalid_batch_size():
+    with pytest.raises(ValueError):
+        MultiGaugeLevelProvider(["101"], batch_size=0)
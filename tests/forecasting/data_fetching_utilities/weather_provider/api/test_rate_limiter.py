@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.rate_limiter import RateLimiter
+
+
+def test_rate_limiter_allows_burst():
+    rate_limiter = RateLimiter(rate=1.0, capacity=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        rate_limiter.acquire()
+
+    assert time.monotonic() - start < 0.5
+
+
+def test_rate_limiter_throttles_past_capacity():
+    rate_limiter = RateLimiter(rate=20.0, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(5):
+        rate_limiter.acquire()
+
+    # first token is available immediately, the next 4 are each 1/20th of a second apart
+    assert time.monotonic() - start >= 0.19
+
+
+def test_rate_limiter_invalid_arguments():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0.0)
+
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1.0, capacity=0)
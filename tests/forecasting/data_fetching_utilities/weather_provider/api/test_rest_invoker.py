@@ -1,8 +1,12 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
 import pytest
 
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.exceptions import RestInvokerException
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
-from rlf.forecasting.data_fetching_utilities.weather_provider.api.rest_invoker import RestInvoker
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.rest_invoker import PooledSession, RestInvoker
 
 
 @pytest.fixture
@@ -28,3 +32,80 @@ def test_get():
     assert isinstance(res, Response)
     assert res.status_code == 200
     assert res.url == "https://jsonplaceholder.typicode.com/posts"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # status codes to respond with before responding with 200
+    failures: list = []
+
+    def do_GET(self):
+        if StubHandler.failures:
+            status = StubHandler.failures.pop(0)
+            body = b"unavailable"
+        else:
+            status = 200
+            body = json.dumps({"path": self.path}).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_hostname():
+    StubHandler.failures = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_reuses_connections(stub_hostname):
+    invoker = RestInvoker(protocol="http", hostname=stub_hostname, version="v1")
+
+    for _ in range(3):
+        res = invoker.get(path="posts")
+        assert res.status_code == 200
+        assert res.data == {"path": "/v1/posts"}
+
+    assert invoker.timings.num_requests == 3
+    assert invoker.timings.num_connections == 1
+    assert invoker.timings.total_seconds >= invoker.timings.connect_seconds > 0
+
+
+def test_get_shared_session(stub_hostname):
+    session = PooledSession()
+    invoker_1 = RestInvoker(protocol="http", hostname=stub_hostname, session=session)
+    invoker_2 = RestInvoker(protocol="http", hostname=stub_hostname, session=session)
+
+    invoker_1.get(path="posts")
+    invoker_2.get(path="posts")
+
+    assert invoker_1.timings is invoker_2.timings
+    assert session.timings.num_requests == 2
+    assert session.timings.num_connections == 1
+
+
+def test_get_retries_on_server_error(stub_hostname):
+    StubHandler.failures = [503, 429]
+    invoker = RestInvoker(protocol="http", hostname=stub_hostname, session=PooledSession(max_retries=2, backoff_factor=0.01))
+
+    res = invoker.get(path="posts")
+
+    assert res.status_code == 200
+    assert StubHandler.failures == []
+
+
+def test_get_fails_after_max_retries(stub_hostname):
+    StubHandler.failures = [500, 500, 500]
+    invoker = RestInvoker(protocol="http", hostname=stub_hostname, session=PooledSession(max_retries=1, backoff_factor=0.01))
+
+    with pytest.raises(RestInvokerException):
+        invoker.get(path="posts")
@@ -1,7 +1,7 @@
 import pytest
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 
-from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.ecmwf_adapter import OpenMeteoECMWFAdapter
+from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.ecmwf_adapter import ARCHIVE_URL, FORECAST_URL, OpenMeteoECMWFAdapter
 
 REAL_LATITUDE = 44.2
 REAL_LONGITUDE = -119.3
@@ -56,3 +56,19 @@ def test_get_current_columns_subset(fake_coordinate):
     assert pytest.approx(REAL_LONGITUDE, rel=1e-2) == response.Longitude()
     assert pytest.approx(REAL_LATITUDE, rel=1e-2) == response.Latitude()
     assert response.Hourly().VariablesLength() == len(REAL_COLUMNS)
+
+
+def test_client_is_reused():
+    adapter = OpenMeteoECMWFAdapter(cache_backend="memory")
+
+    assert adapter.client is adapter.client
+
+
+def test_cache_expiry_configuration():
+    adapter = OpenMeteoECMWFAdapter(cache_backend="memory", archive_expire_after=-1, forecast_expire_after=600)
+
+    adapter.client
+    cache_session = adapter._cache_session
+    assert cache_session is not None
+    assert cache_session.settings.urls_expire_after[FORECAST_URL] == 600
+    assert cache_session.settings.urls_expire_after[ARCHIVE_URL] == -1
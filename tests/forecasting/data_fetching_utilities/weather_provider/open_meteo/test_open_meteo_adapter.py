@@ -1,6 +1,7 @@
 import pytest
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
 from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.open_meteo_adapter import OpenMeteoAdapter
 
 
@@ -54,3 +55,34 @@ def test_get_current_columns_subset(fake_coordinate):
     assert pytest.approx(30.0, rel=1e-2) == response.data["latitude"]
     assert len(response.data["hourly"]) == 2  # Time column and 'temperature_2m' column
     assert len(response.data["hourly_units"]) == 2
+
+
+@pytest.mark.slow
+def test_get_current_batch_columns_subset():
+    coordinates = [Coordinate(lon=110.0, lat=30.0), Coordinate(lon=111.0, lat=31.0)]
+    adapter = OpenMeteoAdapter()
+    responses = adapter.get_current_batch(coordinates=coordinates, past_days=1, forecast_days=1, columns=["temperature_2m"])
+    assert len(responses) == 2
+    for response, coordinate in zip(responses, coordinates):
+        assert response.status_code == 200
+        assert pytest.approx(coordinate.lon, rel=1e-2) == response.data["longitude"]
+        assert pytest.approx(coordinate.lat, rel=1e-2) == response.data["latitude"]
+        assert len(response.data["hourly"]) == 2  # Time column and 'temperature_2m' column
+
+
+def test_split_batch_response():
+    response = Response(status_code=200, url="fake url", message="OK", headers={}, data=[{"longitude": 1.0}, {"longitude": 2.0}])  # type: ignore[arg-type]
+    responses = OpenMeteoAdapter._split_batch_response(response, 2)
+    assert [r.data["longitude"] for r in responses] == [1.0, 2.0]
+
+
+def test_split_batch_response_single_location():
+    response = Response(status_code=200, url="fake url", message="OK", headers={}, data={"longitude": 1.0})
+    responses = OpenMeteoAdapter._split_batch_response(response, 1)
+    assert responses == [response]
+
+
+def test_split_batch_response_wrong_length():
+    response = Response(status_code=200, url="fake url", message="OK", headers={}, data={"longitude": 1.0})
+    with pytest.raises(ValueError):
+        OpenMeteoAdapter._split_batch_response(response, 2)
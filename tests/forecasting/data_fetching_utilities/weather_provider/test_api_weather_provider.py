@@ -1,11 +1,19 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
 from typing import Dict, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
 
+import numpy as np
 import pytest
 
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.base_api_adapter import BaseAPIAdapter
 from rlf.forecasting.data_fetching_utilities.weather_provider.api.models import Response
+from rlf.forecasting.data_fetching_utilities.weather_provider.api.rate_limiter import RateLimiter
 from rlf.forecasting.data_fetching_utilities.weather_provider.api_weather_provider import APIWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.open_meteo.open_meteo_adapter import OpenMeteoAdapter
 
 
 def fake_response(coordinate, columns: List[str]):
@@ -30,9 +38,10 @@ def fake_response(coordinate, columns: List[str]):
 
 class FakeWeatherAPIAdapter(BaseAPIAdapter):
 
-    def __init__(self, columns: List[str] = ["temperature_2m"], expected_request_columns: Optional[List[str]] = None) -> None:
+    def __init__(self, columns: List[str] = ["temperature_2m"], expected_request_columns: Optional[List[str]] = None, delay: float = 0.0) -> None:
         self._response_columns = columns
         self._expected_request_columns = expected_request_columns
+        self._delay = delay
 
     # mypy wants this signature to match BaseAPIAdapter, but that will couple the test too hard
     def get_current(self, coordinate: Coordinate, **kwargs) -> Response:  # type: ignore[override]
@@ -40,6 +49,7 @@ class FakeWeatherAPIAdapter(BaseAPIAdapter):
             assert "columns" in kwargs
             assert kwargs["columns"] is not None
             assert sorted(self._expected_request_columns) == sorted(kwargs["columns"])
+        time.sleep(self._delay)
         response = fake_response(coordinate=coordinate, columns=self._response_columns)
         return response
 
@@ -49,6 +59,7 @@ class FakeWeatherAPIAdapter(BaseAPIAdapter):
             assert "columns" in kwargs
             assert kwargs["columns"] is not None
             assert sorted(self._expected_request_columns) == sorted(kwargs["columns"])
+        time.sleep(self._delay)
         response = fake_response(coordinate=coordinate, columns=self._response_columns)
         return response
 
@@ -80,9 +91,21 @@ def test_fetch_historical_returns_expected_datum(weather_provider):
     for weather_datum in weather_datums:
         assert weather_datum.hourly_parameters.index.dtype == "datetime64[ns, UTC]"
         assert list(weather_datum.hourly_parameters.columns) == ["temperature_2m"]
+        assert weather_datum.hourly_parameters["temperature_2m"].dtype == "float32"
         assert len(weather_datum.hourly_parameters) == 3
 
 
+def test_build_hourly_parameters_from_response_missing_values(weather_provider):
+    response = {"time": ["2023-01-01T00:00", "2023-01-01T01:00"], "temperature_2m": [1.5, None]}
+
+    df = weather_provider._build_hourly_parameters_from_response(response, "GMT")
+
+    assert df.index.name == "time"
+    assert df["temperature_2m"].dtype == "float32"
+    assert df["temperature_2m"].iloc[0] == 1.5
+    assert np.isnan(df["temperature_2m"].iloc[1])
+
+
 def test_fetch_current_fetches_one_per_location(weather_provider):
     weather_datums = weather_provider.fetch_current()
     assert len(weather_datums) == len(weather_provider.coordinates)
@@ -240,3 +263,126 @@ def test_fetch_current_passed_columns_are_remapped():
     ]
 
     assert expected_columns == actual_columns
+
+
+def test_fetch_current_concurrent_preserves_order():
+    coordinates = [Coordinate(lon=float(i), lat=float(i + 1)) for i in range(8)]
+    fake_adapter = FakeWeatherAPIAdapter(delay=0.01)
+    weather_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=fake_adapter, max_workers=4)
+
+    weather_datums = weather_provider.fetch_current()
+
+    assert [Coordinate(datum.longitude, datum.latitude) for datum in weather_datums] == coordinates
+
+
+def test_fetch_historical_concurrent_preserves_order():
+    coordinates = [Coordinate(lon=float(i), lat=float(i + 1)) for i in range(8)]
+    fake_adapter = FakeWeatherAPIAdapter(delay=0.01)
+    weather_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=fake_adapter, max_workers=4)
+
+    weather_datums = weather_provider.fetch_historical()
+
+    assert [Coordinate(datum.longitude, datum.latitude) for datum in weather_datums] == coordinates
+
+
+def test_fetch_current_uses_rate_limiter():
+    coordinates = [Coordinate(lon=float(i), lat=float(i + 1)) for i in range(5)]
+    weather_provider = APIWeatherProvider(coordinates=coordinates,
+                                          api_adapter=FakeWeatherAPIAdapter(),
+                                          max_workers=5,
+                                          rate_limiter=RateLimiter(rate=20.0))
+
+    start = time.monotonic()
+    weather_provider.fetch_current()
+
+    assert time.monotonic() - start >= 0.19
+
+
+def test_invalid_max_workers():
+    with pytest.raises(ValueError):
+        APIWeatherProvider(coordinates=[], api_adapter=FakeWeatherAPIAdapter(), max_workers=0)
+
+
+class StubOpenMeteoHandler(BaseHTTPRequestHandler):
+    delay = 0.05
+    num_requests = 0
+
+    def do_GET(self):
+        StubOpenMeteoHandler.num_requests += 1
+        query = parse_qs(urlparse(self.path).query)
+        lons = query["longitude"][0].split(",")
+        lats = query["latitude"][0].split(",")
+        coordinates = [Coordinate(lon=float(lon), lat=float(lat)) for lon, lat in zip(lons, lats)]
+        time.sleep(self.delay)
+
+        locations = [fake_response(coordinate, ["temperature_2m"]).data for coordinate in coordinates]
+        body = json.dumps(locations if len(locations) > 1 else locations[0]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_open_meteo_adapter():
+    StubOpenMeteoHandler.num_requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOpenMeteoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    hostname = f"127.0.0.1:{server.server_address[1]}"
+    yield OpenMeteoAdapter(protocol="http", archive_hostname=hostname, forecast_hostname=hostname)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.benchmark
+def test_fetch_current_concurrent_benchmark(stub_open_meteo_adapter):
+    coordinates = [Coordinate(lon=round(0.1 * i, 1), lat=round(0.1 * i + 1, 1)) for i in range(20)]
+
+    serial_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=stub_open_meteo_adapter)
+    start = time.monotonic()
+    serial_datums = serial_provider.fetch_current()
+    serial_duration = time.monotonic() - start
+
+    concurrent_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=stub_open_meteo_adapter, max_workers=8)
+    start = time.monotonic()
+    concurrent_datums = concurrent_provider.fetch_current()
+    concurrent_duration = time.monotonic() - start
+
+    assert [(datum.longitude, datum.latitude) for datum in concurrent_datums] == [(datum.longitude, datum.latitude) for datum in serial_datums]
+    for serial_datum, concurrent_datum in zip(serial_datums, concurrent_datums):
+        assert serial_datum.hourly_parameters.equals(concurrent_datum.hourly_parameters)
+
+    # 20 requests of 50ms each take ~1s serially and ~150ms with 8 in flight
+    assert concurrent_duration * 3 < serial_duration
+
+
+@pytest.mark.parametrize("fetch", ["fetch_current", "fetch_historical"])
+def test_fetch_batched_matches_unbatched(stub_open_meteo_adapter, fetch):
+    coordinates = [Coordinate(lon=round(0.1 * i, 1), lat=round(0.1 * i + 1, 1)) for i in range(7)]
+
+    unbatched_datums = getattr(APIWeatherProvider(coordinates=coordinates, api_adapter=stub_open_meteo_adapter), fetch)()
+    assert StubOpenMeteoHandler.num_requests == 7
+
+    StubOpenMeteoHandler.num_requests = 0
+    batched_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=stub_open_meteo_adapter, batch_size=3, max_workers=2)
+    batched_datums = getattr(batched_provider, fetch)()
+    assert StubOpenMeteoHandler.num_requests == 3
+
+    assert [Coordinate(datum.longitude, datum.latitude) for datum in batched_datums] == coordinates
+    for unbatched_datum, batched_datum in zip(unbatched_datums, batched_datums):
+        assert unbatched_datum.meta_data == batched_datum.meta_data
+        assert unbatched_datum.hourly_parameters.equals(batched_datum.hourly_parameters)
+
+
+def test_fetch_current_batched_falls_back_to_single_requests():
+    coordinates = [Coordinate(lon=float(i), lat=float(i + 1)) for i in range(5)]
+    weather_provider = APIWeatherProvider(coordinates=coordinates, api_adapter=FakeWeatherAPIAdapter(), batch_size=2)
+
+    weather_datums = weather_provider.fetch_current()
+
+    assert [Coordinate(datum.longitude, datum.latitude) for datum in weather_datums] == coordinates
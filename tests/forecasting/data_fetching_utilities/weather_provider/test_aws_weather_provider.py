@@ -1,10 +1,14 @@
+import threading
+import time
 from typing import List
 
+import pandas as pd
 import pytest
 
 from rlf.aws_dispatcher import AWSDispatcher
 from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
 
 # It is expected that datums will be stored for this timestamp in the bucket specified for the coordinates specified.
 CURRENT_TESTING_TIMESTAMP = "23-01-31_07-42"
@@ -179,3 +183,77 @@ def test_fetch_historical_with_consistent_columns(weather_provider):
 
     for weather_datum in weather_datums:
         assert expected_columns == sorted(list(weather_datum.hourly_parameters.columns))
+
+
+def test_fetch_historical_date_range(memory_aws_dispatcher, coordinates):
+    index = pd.date_range("2021-12-01", "2022-02-01", freq="H", tz="UTC", name="time")
+    for coordinate in coordinates:
+        memory_aws_dispatcher.upload_datum(WeatherDatum(longitude=coordinate.lon,
+                                                        latitude=coordinate.lat,
+                                                        api_response_longitude=coordinate.lon,
+                                                        api_response_latitude=coordinate.lat,
+                                                        elevation=0.0,
+                                                        utc_offset_seconds=0.0,
+                                                        timezone="UTC",
+                                                        hourly_units={"soil_moisture_0_to_7cm": "m³/m³"},
+                                                        hourly_parameters=pd.DataFrame({"soil_moisture_0_to_7cm": 0.5}, index=index)),
+                                           "historical")
+
+    weather_provider = AWSWeatherProvider(coordinates=coordinates, aws_dispatcher=memory_aws_dispatcher)
+    datums = weather_provider.fetch_historical(columns=["soil_moisture_level_1"], start_date="2021-12-31", end_date="2022-01-02")
+
+    assert len(datums) == len(coordinates)
+    for datum in datums:
+        assert list(datum.hourly_parameters.columns) == ["soil_moisture_level_1"]
+        assert datum.hourly_parameters.index[0] == pd.Timestamp("2021-12-31", tz="UTC")
+        # The end date is inclusive of its first hour only
+        assert datum.hourly_parameters.index[-1] == pd.Timestamp("2022-01-02", tz="UTC")
+        assert len(datum.hourly_parameters) == 2 * 24 + 1
+
+
+def test_download_datums_concurrently(memory_aws_dispatcher, monkeypatch):
+    coordinates = [Coordinate(lon=-120.0 - i, lat=44.0 + i) for i in range(8)]
+    index = pd.date_range("2022-01-01", "2022-01-03", freq="H", tz="UTC", name="time")
+    for i, coordinate in enumerate(coordinates):
+        memory_aws_dispatcher.upload_datum(WeatherDatum(longitude=coordinate.lon,
+                                                        latitude=coordinate.lat,
+                                                        api_response_longitude=coordinate.lon,
+                                                        api_response_latitude=coordinate.lat,
+                                                        elevation=0.0,
+                                                        utc_offset_seconds=0.0,
+                                                        timezone="UTC",
+                                                        hourly_units={"temperature_2m": "C"},
+                                                        hourly_parameters=pd.DataFrame({"temperature_2m": float(i)}, index=index)),
+                                           "historical")
+
+    serial_datums = AWSWeatherProvider(coordinates, memory_aws_dispatcher, max_workers=1).fetch_historical()
+
+    # Track how many downloads are in flight at once
+    in_flight = []
+    max_in_flight = []
+    lock = threading.Lock()
+    download_datum = memory_aws_dispatcher.download_datum
+
+    def slow_download_datum(*args, **kwargs):
+        with lock:
+            in_flight.append(1)
+            max_in_flight.append(len(in_flight))
+        time.sleep(0.05)
+        try:
+            return download_datum(*args, **kwargs)
+        finally:
+            with lock:
+                in_flight.pop()
+
+    monkeypatch.setattr(memory_aws_dispatcher, "download_datum", slow_download_datum)
+    datums = AWSWeatherProvider(coordinates, memory_aws_dispatcher, max_workers=4).fetch_historical()
+
+    assert max(max_in_flight) == 4
+    for datum, serial_datum, coordinate in zip(datums, serial_datums, coordinates):
+        assert (datum.longitude, datum.latitude) == (coordinate.lon, coordinate.lat)
+        pd.testing.assert_frame_equal(datum.hourly_parameters, serial_datum.hourly_parameters)
+
+
+def test_invalid_max_workers(memory_aws_dispatcher, coordinates):
+    with pytest.raises(ValueError):
+        AWSWeatherProvider(coordinates, memory_aws_dispatcher, max_workers=0)
@@ -10,6 +10,7 @@ from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
 from rlf.forecasting.data_fetching_utilities.weather_provider.api_weather_provider import APIWeatherProvider
 from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_uploader import AWSWeatherUploader
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
 
 DEFAULT_START_DATE = "2020-01-01"
 END_DATE = "2020-02-01"
@@ -93,3 +94,107 @@ def test_upload_current(aws_weather_uploader, weather_provider):
         assert (expected_end_date.year == actual_end_date.year)
         assert (expected_end_date.month == actual_end_date.month)
         assert (expected_end_date.day == actual_end_date.day)
+
+
+class FakeDateRangeWeatherProvider():
+    """Returns one value per hour for each coordinate over the requested dates and records the requested date ranges."""
+
+    def __init__(self, coordinates):
+        self.coordinates = coordinates
+        self.requested_ranges = []
+
+    def fetch_historical(self, columns=None, start_date=DEFAULT_START_DATE, end_date=END_DATE, sleep_duration=0.0):
+        self.requested_ranges.append((start_date, end_date))
+        index = pd.date_range(start_date, pd.Timestamp(end_date) + timedelta(hours=23), freq="H", tz="UTC", name="time")
+        datums = []
+        for coordinate in self.coordinates:
+            hourly_parameters = pd.DataFrame({"temperature_2m": index.hour.astype(float) + coordinate.lon}, index=index)
+            datums.append(WeatherDatum(longitude=coordinate.lon,
+                                       latitude=coordinate.lat,
+                                       api_response_longitude=coordinate.lon,
+                                       api_response_latitude=coordinate.lat,
+                                       elevation=0.0,
+                                       utc_offset_seconds=0.0,
+                                       timezone="UTC",
+                                       hourly_units={"temperature_2m": "C"},
+                                       hourly_parameters=hourly_parameters))
+        return datums
+
+
+@pytest.fixture
+def memory_uploader(coordinates, memory_aws_dispatcher):
+    return AWSWeatherUploader(weather_provider=FakeDateRangeWeatherProvider(coordinates), aws_dispatcher=memory_aws_dispatcher)
+
+
+def test_upload_historical_queries_cover_range(memory_uploader):
+    memory_uploader.upload_historical(start_date="2019-06-01", end_date="2023-03-01", years_per_query=2)
+    assert memory_uploader.weather_provider.requested_ranges == [("2019-06-01", "2021-05-31"),
+                                                                 ("2021-06-01", "2023-03-01")]
+
+    datum = memory_uploader.aws_dispatcher.download_datum(memory_uploader.weather_provider.coordinates[0], dir_path="historical")
+    assert datum.hourly_parameters.index.is_unique
+    assert datum.hourly_parameters.index[0] == pd.Timestamp("2019-06-01", tz="UTC")
+    assert datum.hourly_parameters.index[-1] == pd.Timestamp("2023-03-01 23:00", tz="UTC")
+
+
+def test_upload_historical_incremental(memory_uploader, coordinates):
+    aws_dispatcher = memory_uploader.aws_dispatcher
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-10")
+    expected = aws_dispatcher.download_datum(coordinates[0], dir_path="historical").hourly_parameters
+
+    memory_uploader.weather_provider.requested_ranges.clear()
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-15", incremental=True)
+
+    # Only the days after the last stored day are fetched and appended as a partition
+    assert memory_uploader.weather_provider.requested_ranges == [("2020-01-10", "2020-01-15")]
+    folder_name = aws_dispatcher.datum_folder_name(coordinates[0].lon, coordinates[0].lat, "historical")
+    assert len(aws_dispatcher._parquet_paths(folder_name, "data")) == 2
+    assert aws_dispatcher.get_last_timestamp(folder_name, "data") == pd.Timestamp("2020-01-15 23:00", tz="UTC")
+
+    for coordinate in coordinates:
+        df = aws_dispatcher.download_datum(coordinate, dir_path="historical").hourly_parameters
+        assert df.index.is_unique
+        assert df.index.is_monotonic_increasing
+        assert len(df) == 15 * 24
+        if coordinate == coordinates[0]:
+            pd.testing.assert_frame_equal(df.iloc[:len(expected)], expected, check_freq=False)
+
+
+def test_upload_historical_incremental_up_to_date(memory_uploader):
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-10")
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-10", incremental=True)
+    folder_name = memory_uploader.aws_dispatcher.datum_folder_name(memory_uploader.weather_provider.coordinates[0].lon,
+                                                                   memory_uploader.weather_provider.coordinates[0].lat,
+                                                                   "historical")
+    assert len(memory_uploader.aws_dispatcher._parquet_paths(folder_name, "data")) == 1
+
+
+def test_upload_historical_incremental_without_stored_data(memory_uploader, coordinates):
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-03", incremental=True)
+    assert memory_uploader.weather_provider.requested_ranges == [("2020-01-01", "2020-01-03")]
+    df = memory_uploader.aws_dispatcher.download_datum(coordinates[1], dir_path="historical").hourly_parameters
+    assert len(df) == 3 * 24
+
+
+def test_upload_historical_overwrite_removes_partitions(memory_uploader, coordinates):
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-03")
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-05", incremental=True)
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-02")
+    df = memory_uploader.aws_dispatcher.download_datum(coordinates[0], dir_path="historical").hourly_parameters
+    assert len(df) == 2 * 24
+
+
+def test_upload_historical_catchment(memory_uploader, coordinates):
+    aws_dispatcher = memory_uploader.aws_dispatcher
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-10", catchment_name="12345678")
+    memory_uploader.upload_historical(start_date="2020-01-01", end_date="2020-01-15", incremental=True, catchment_name="12345678")
+
+    assert memory_uploader.weather_provider.requested_ranges[-1] == ("2020-01-10", "2020-01-15")
+    assert not aws_dispatcher.s3.exists(f"{aws_dispatcher.working_dir}/{aws_dispatcher.datum_folder_name(coordinates[0].lon, coordinates[0].lat, 'historical')}")
+
+    weather_provider = AWSWeatherProvider(coordinates=coordinates, aws_dispatcher=aws_dispatcher, catchment_name="12345678")
+    datums = weather_provider.fetch_historical(start_date="2020-01-02", end_date="2020-01-15")
+    expected_datums = memory_uploader.weather_provider.fetch_historical(start_date="2020-01-02", end_date="2020-01-14")
+    for datum, expected_datum in zip(datums, expected_datums):
+        assert (datum.longitude, datum.latitude) == (expected_datum.longitude, expected_datum.latitude)
+        pd.testing.assert_frame_equal(datum.hourly_parameters.iloc[:-1], expected_datum.hourly_parameters.astype("float32"), check_freq=False)
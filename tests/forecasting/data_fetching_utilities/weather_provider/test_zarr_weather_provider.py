@@ -0,0 +1,119 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.data_fetching_utilities.weather_provider import zarr_weather_uploader
+from rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider import AWSWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
+from rlf.forecasting.data_fetching_utilities.weather_provider.zarr_weather_provider import ZarrWeatherProvider
+from rlf.forecasting.data_fetching_utilities.weather_provider.zarr_weather_uploader import ZarrWeatherUploader
+
+
+@pytest.fixture
+def coordinates() -> List[Coordinate]:
+    # A sparse 3x3 grid, so that some grid points have no data
+    return [Coordinate(lon=-121.0 + 0.1 * i, lat=44.0 + 0.1 * j) for i in range(3) for j in range(3) if (i + j) % 2 == 0]
+
+
+@pytest.fixture
+def datums(coordinates) -> List[WeatherDatum]:
+    index = pd.date_range("2021-12-30", "2022-01-03", freq="H", tz="UTC", name="time")
+    datums = []
+    for i, coordinate in enumerate(coordinates):
+        datums.append(WeatherDatum(longitude=coordinate.lon,
+                                   latitude=coordinate.lat,
+                                   api_response_longitude=coordinate.lon + 0.01,
+                                   api_response_latitude=coordinate.lat - 0.01,
+                                   elevation=100.0 + i,
+                                   utc_offset_seconds=0.0,
+                                   timezone="GMT",
+                                   hourly_units={"temperature_2m": "C", "soil_moisture_0_to_7cm": "m³/m³"},
+                                   hourly_parameters=pd.DataFrame({"temperature_2m": np.arange(len(index)) + i,
+                                                                   "soil_moisture_0_to_7cm": 0.25},
+                                                                  index=index,
+                                                                  dtype=float)))
+    return datums
+
+
+class FakeDatumsProvider():
+    def __init__(self, datums):
+        self.datums = datums
+
+    def fetch_historical(self, columns=None, **kwargs):
+        return self.datums
+
+    def fetch_current(self, columns=None, **kwargs):
+        return self.datums
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Spread the grid over several spatial chunks
+    monkeypatch.setattr(zarr_weather_uploader, "SPACE_CHUNK_SIZE", 2)
+
+
+def test_fetch_historical(tmp_path, coordinates, datums, small_chunks):
+    ZarrWeatherUploader(FakeDatumsProvider(datums), str(tmp_path)).upload_historical()
+
+    weather_provider = ZarrWeatherProvider(list(reversed(coordinates)), str(tmp_path))
+    fetched_datums = weather_provider.fetch_historical(start_date="2022-01-01", end_date="2022-01-02")
+
+    assert len(fetched_datums) == len(datums)
+    for fetched_datum, datum in zip(fetched_datums, reversed(datums)):
+        assert fetched_datum.meta_data == datum.meta_data
+        assert fetched_datum.hourly_units == datum.hourly_units
+        expected = datum.hourly_parameters["2022-01-01":"2022-01-02 00:00"].astype("float32")
+        expected.columns = ["temperature_2m", "soil_moisture_level_1"]
+        pd.testing.assert_frame_equal(fetched_datum.hourly_parameters, expected, check_freq=False)
+
+
+def test_fetch_historical_columns(tmp_path, coordinates, datums):
+    ZarrWeatherUploader(FakeDatumsProvider(datums), str(tmp_path)).upload_historical()
+    fetched_datums = ZarrWeatherProvider(coordinates[:1], str(tmp_path)).fetch_historical(columns=["soil_moisture_level_1"])
+    assert list(fetched_datums[0].hourly_parameters.columns) == ["soil_moisture_level_1"]
+    assert len(fetched_datums[0].hourly_parameters) == len(datums[0].hourly_parameters)
+
+
+def test_fetch_current(tmp_path, coordinates, datums):
+    ZarrWeatherUploader(FakeDatumsProvider(datums), str(tmp_path)).upload_current("23-01-31_07-42")
+    weather_provider = ZarrWeatherProvider(coordinates, str(tmp_path))
+    with pytest.raises(ValueError):
+        weather_provider.fetch_current()
+
+    weather_provider.set_timestamp("23-01-31_07-42")
+    fetched_datums = weather_provider.fetch_current(columns=["temperature_2m"])
+    pd.testing.assert_frame_equal(fetched_datums[1].hourly_parameters, datums[1].hourly_parameters[["temperature_2m"]].astype("float32"), check_freq=False)
+
+
+def test_missing_coordinates(tmp_path, coordinates, datums):
+    ZarrWeatherUploader(FakeDatumsProvider(datums), str(tmp_path)).upload_historical()
+
+    # Off the grid
+    with pytest.raises(FileNotFoundError):
+        ZarrWeatherProvider([Coordinate(lon=0.0, lat=0.0)], str(tmp_path)).fetch_historical()
+    # On the grid, but no data stored for that point
+    with pytest.raises(FileNotFoundError):
+        ZarrWeatherProvider([Coordinate(lon=-120.9, lat=44.0)], str(tmp_path)).fetch_historical()
+    # No store
+    with pytest.raises(FileNotFoundError):
+        ZarrWeatherProvider(coordinates, str(tmp_path / "missing")).fetch_historical()
+
+
+def test_write_duplicate_points(tmp_path, datums):
+    with pytest.raises(ValueError):
+        ZarrWeatherUploader(FakeDatumsProvider([datums[0], datums[0]]), str(tmp_path)).upload_historical()
+
+
+def test_convert_from_aws(tmp_path, memory_aws_dispatcher, coordinates, datums):
+    for datum in datums:
+        memory_aws_dispatcher.upload_datum(datum, "historical")
+    aws_weather_provider = AWSWeatherProvider(coordinates, memory_aws_dispatcher)
+    ZarrWeatherUploader(aws_weather_provider, str(tmp_path)).upload_historical()
+
+    expected_datums = aws_weather_provider.fetch_historical()
+    fetched_datums = ZarrWeatherProvider(coordinates, str(tmp_path)).fetch_historical()
+    for fetched_datum, expected_datum in zip(fetched_datums, expected_datums):
+        pd.testing.assert_frame_equal(fetched_datum.hourly_parameters, expected_datum.hourly_parameters, check_freq=False)
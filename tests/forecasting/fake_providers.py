@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
 from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
 
 
@@ -65,6 +66,7 @@ class FakeWeatherProvider:
     def __init__(self, num_locs=12, num_historical_samples=10) -> None:
         self.num_locs = num_locs
         self.num_historical_samples = num_historical_samples
+        self.coordinates = [Coordinate(lon=i + 0.1, lat=i + 1.1) for i in range(num_locs)]
 
     def fetch_current(self, columns=None):
         return weather_datums(10, self.num_locs)
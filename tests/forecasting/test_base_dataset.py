@@ -1,6 +1,9 @@
 from datetime import datetime
+import tracemalloc
 
+import numpy as np
 import pandas as pd
+import pytest
 
 from rlf.forecasting.base_dataset import BaseDataset
 from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
@@ -48,6 +51,82 @@ def test_base_dataset_process_datum_with_leading_nans():
     df = pd.DataFrame(data, index=[datetime(2022, 1, 1, h) for h in range(1, 6)])
     datum = WeatherDatum(1.0, 2.0, 1.0, 2.0, 1.0, 0.0, "utc", {"c": "units"}, df)
 
-    result_df = dataset._process_datum(datum, pd.Timestamp(datetime(2022, 1, 1, 2)), None).pd_dataframe()
+    result_df = dataset._process_datum(datum, pd.Timestamp(datetime(2022, 1, 1, 2)), None)
 
     assert list(result_df["1.00_2.00_c"]) == [1.0, 1.0, 2.0, 3.0]
+
+
+def test_base_dataset_process_datum_float32():
+    dataset = BaseDataset(FakeCatchmentData(), rolling_sum_columns=["c"], rolling_window_sizes=[2])
+    df = pd.DataFrame({"c": [1.0, float("nan"), 3.0, 4.0]}, index=[datetime(2022, 1, 1, h) for h in range(1, 5)])
+    datum = WeatherDatum(1.0, 2.0, 1.0, 2.0, 1.0, 0.0, "utc", {"c": "units"}, df)
+
+    result_df = dataset._process_datum(datum, pd.Timestamp(datetime(2022, 1, 1, 1)), None)
+
+    assert result_df["1.00_2.00_c"].dtype == np.float32
+    assert result_df["1.00_2.00_c_sum_2"].dtype == np.float32
+    assert list(result_df["1.00_2.00_c_sum_2"]) == [3.0, 5.0, 7.0]
+
+
+def weather_datums(num_datums, num_samples, tz=None):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2000-01-01", periods=num_samples, freq="h", tz=tz)
+    return [
+        WeatherDatum(i + 0.1, i + 1.1, i + 0.1, i + 1.1, 0.0, 0.0, tz, None, pd.DataFrame(rng.random((num_samples, 8)) * 100, index=index, columns=[f"c{j}" for j in range(8)]))
+        for i in range(num_datums)
+    ]
+
+
+def level(num_samples, tz=None):
+    return pd.DataFrame({"level": np.arange(num_samples, dtype=float)}, index=pd.date_range("2000-01-01", periods=num_samples, freq="h", tz=tz))
+
+
+def reference_pre_process(dataset, Xs, y):
+    """Convert each processed datum to a TimeSeries and concatenate them with darts, as before the single preallocated array."""
+    from darts import TimeSeries
+    from darts.timeseries import concatenate
+
+    first_date, last_date = dataset._find_timestamp_boundaries(Xs, y)
+    processed_Xs = [TimeSeries.from_dataframe(dataset._process_datum(datum, first_date, last_date)) for datum in Xs]
+    return concatenate(processed_Xs, axis="component").astype("float32")
+
+
+@pytest.mark.parametrize("tz", [None, "UTC"])
+def test_base_dataset_pre_process_matches_concatenate(tz):
+    Xs = weather_datums(3, 500, tz=tz)
+    X, y = BaseDataset(FakeCatchmentData(), rolling_sum_columns=["c0"], rolling_window_sizes=[24])._pre_process(Xs, level(400, tz=tz))
+    expected = reference_pre_process(BaseDataset(FakeCatchmentData(), rolling_sum_columns=["c0"], rolling_window_sizes=[24]), Xs, level(400, tz=tz))
+
+    assert X.dtype == np.float32
+    assert X.time_index.equals(expected.time_index)
+    assert list(X.components) == list(expected.components)
+    np.testing.assert_array_equal(X.values(), expected.values())
+    assert y.time_index.equals(X.time_index)
+
+
+def test_base_dataset_assemble_mismatched_time_index():
+    dataset = BaseDataset(FakeCatchmentData())
+    processed_Xs = [dataset._process_datum(datum, pd.Timestamp("2000-01-01"), None) for datum in weather_datums(2, 50)]
+    processed_Xs[1] = processed_Xs[1].iloc[1:]
+
+    with pytest.raises(ValueError):
+        BaseDataset._assemble(processed_Xs, len(processed_Xs))
+
+
+@pytest.mark.slow
+def test_base_dataset_pre_process_memory_benchmark():
+    # 10 years of hourly data for a dozen coordinates
+    Xs = weather_datums(12, 10 * 365 * 24)
+    y = level(10 * 365 * 24)
+
+    tracemalloc.start()
+    reference_pre_process(BaseDataset(FakeCatchmentData()), Xs, y)
+    _, reference_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    BaseDataset(FakeCatchmentData())._pre_process(Xs, y)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert peak * 2 < reference_peak
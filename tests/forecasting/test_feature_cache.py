@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from darts import TimeSeries
+
+from rlf.forecasting.catchment_data import CatchmentData
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.feature_cache import FeatureCache
+from rlf.forecasting.training_dataset import TrainingDataset
+from fake_providers import FakeLevelProvider, FakeWeatherProvider
+
+
+KEY_ARGS = dict(
+    catchment_name="12345678",
+    coordinates=[Coordinate(lon=1.0, lat=2.0), Coordinate(lon=3.0, lat=4.0)],
+    columns=["rain", "temperature_2m"],
+    rolling_sum_columns=["rain"],
+    rolling_mean_columns=["temperature_2m"],
+    rolling_window_sizes=[240, 720],
+    data_version="2024-01-01",
+)
+
+
+class CountingWeatherProvider(FakeWeatherProvider):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.num_historical_fetches = 0
+
+    def fetch_historical(self, columns=None, start_date=None):
+        self.num_historical_fetches += 1
+        return super().fetch_historical(columns=columns, start_date=start_date)
+
+
+def series(columns, num_samples=50):
+    index = pd.date_range("2020-01-01", periods=num_samples, freq="h", name="time")
+    values = np.random.default_rng(0).random((num_samples, len(columns))).astype(np.float32)
+    return TimeSeries.from_times_and_values(index, values, columns=columns)
+
+
+def test_key_depends_on_every_argument():
+    key = FeatureCache.key(**KEY_ARGS)
+    assert FeatureCache.key(**KEY_ARGS) == key
+
+    changes = dict(
+        catchment_name="87654321",
+        coordinates=list(reversed(KEY_ARGS["coordinates"])),
+        columns=None,
+        rolling_sum_columns=[],
+        rolling_mean_columns=["rain"],
+        rolling_window_sizes=[240],
+        data_version="2024-01-02",
+    )
+    for name, value in changes.items():
+        assert FeatureCache.key(**{**KEY_ARGS, name: value}) != key
+
+
+def test_store_load(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    X, y = series(["a", "b", "c"]), series(["level"])
+
+    assert cache.load("key") is None
+    cache.store("key", X, y, {"base_columns": ["a"]})
+    loaded_X, loaded_y, meta = cache.load("key")
+
+    for loaded, expected in [(loaded_X, X), (loaded_y, y)]:
+        assert loaded.time_index.equals(expected.time_index)
+        assert loaded.freq == expected.freq
+        assert list(loaded.components) == list(expected.components)
+        assert loaded.dtype == np.float32
+        np.testing.assert_array_equal(loaded.values(), expected.values())
+    assert meta == {"base_columns": ["a"]}
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert os.listdir(tmp_path) == ["key"]
+
+
+def test_store_keeps_existing_entry(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    cache.store("key", series(["a"]), series(["level"]), {"version": 1})
+    cache.store("key", series(["a"]), series(["level"]), {"version": 2})
+
+    assert cache.load("key")[2] == {"version": 1}
+    assert os.listdir(tmp_path) == ["key"]
+
+
+def test_training_dataset_feature_cache(tmp_path):
+    cache = FeatureCache(str(tmp_path))
+    kwargs = dict(validation_size=10, test_size=10, rolling_sum_columns=["weather_attr_1"], rolling_window_sizes=[5], feature_cache=cache, data_version="1")
+
+    weather_provider = CountingWeatherProvider(num_historical_samples=1000)
+    expected = TrainingDataset(CatchmentData("test_catchment", weather_provider, FakeLevelProvider(num_historical_samples=1000)), **kwargs)
+    weather_provider = CountingWeatherProvider(num_historical_samples=1000)
+    dataset = TrainingDataset(CatchmentData("test_catchment", weather_provider, FakeLevelProvider(num_historical_samples=1000)), **kwargs)
+
+    assert weather_provider.num_historical_fetches == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert dataset.subsets == expected.subsets
+    assert dataset.base_columns == expected.base_columns
+    for name in ["X", "y", "X_train", "X_validation", "X_test", "y_train", "y_validation", "y_test"]:
+        assert getattr(dataset, name).time_index.equals(getattr(expected, name).time_index)
+        assert list(getattr(dataset, name).components) == list(getattr(expected, name).components)
+        np.testing.assert_array_equal(getattr(dataset, name).values(), getattr(expected, name).values())
+
+    # a new data version processes the data again
+    weather_provider = CountingWeatherProvider(num_historical_samples=1000)
+    TrainingDataset(CatchmentData("test_catchment", weather_provider, FakeLevelProvider(num_historical_samples=1000)), **{**kwargs, "data_version": "2"})
+    assert weather_provider.num_historical_fetches == 1
+
+
+def test_training_dataset_feature_cache_requires_data_version(tmp_path):
+    catchment_data = CatchmentData("test_catchment", FakeWeatherProvider(num_historical_samples=1000), FakeLevelProvider(num_historical_samples=1000))
+    with pytest.raises(ValueError):
+        TrainingDataset(catchment_data, validation_size=10, test_size=10, feature_cache=FeatureCache(str(tmp_path)))
@@ -1,7 +1,11 @@
+import numpy as np
+import pandas as pd
 import pytest
 
 from rlf.forecasting.catchment_data import CatchmentData
-from rlf.forecasting.inference_dataset import InferenceDataset
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
+from rlf.forecasting.inference_dataset import DatumState, InferenceDataset
+from rlf.forecasting.rolling_features import RollingFeatureState
 from rlf.forecasting.training_dataset import TrainingDataset
 from fake_providers import FakeLevelProvider, FakeWeatherProvider
 
@@ -34,3 +38,109 @@ def test_data_scaled_0_1(inference_dataset):
 
     assert inference_dataset.X.values().min() >= -0.1
     assert inference_dataset.X.values().max() <= 1.1
+
+
+class ShiftingWeatherProvider:
+    """Weather of a window of hours which moves forward with now, with forecasts after now revised on every fetch."""
+
+    def __init__(self, num_locs=3, num_past=300, num_forecast=48) -> None:
+        self.num_locs = num_locs
+        self.num_past = num_past
+        self.num_forecast = num_forecast
+        self.now = 2000
+        self.revision = 0
+
+    def _weather(self, hours, loc):
+        rng = np.random.default_rng(loc)
+        values = rng.gamma(0.5, 2.0, (4000, 2))[hours] * 10
+        values[hours > self.now] += self.revision
+        df = pd.DataFrame(values, index=pd.Timestamp("2021-01-01") + pd.to_timedelta(hours, unit="h"), columns=["weather_attr_1", "weather_attr_2"])
+        # gaps in the observations, and a shorter forecast for one of the columns
+        df.loc[(hours % 37 == 0) & (hours <= self.now), "weather_attr_1"] = np.nan
+        df.loc[hours > self.now + 24, "weather_attr_2"] = np.nan
+        return df
+
+    def _datums(self, hours):
+        return [
+            WeatherDatum(loc + 0.1, loc + 1.1, loc + 0.1, loc + 1.1, 0.0, 0.0, None, None, self._weather(hours, loc))
+            for loc in range(self.num_locs)
+        ]
+
+    def fetch_current(self, columns=None):
+        return self._datums(np.arange(self.now - self.num_past, self.now + self.num_forecast))
+
+    def fetch_historical(self, columns=None, start_date=None):
+        return self._datums(np.arange(0, 1500))
+
+
+class ShiftingLevelProvider:
+    def __init__(self, weather_provider) -> None:
+        self.weather_provider = weather_provider
+
+    def _level(self, hours):
+        return pd.DataFrame({"level": np.sin(hours / 50) + 2}, index=pd.Timestamp("2021-01-01") + pd.to_timedelta(hours, unit="h"))
+
+    def fetch_recent_level(self, samples_to_fetch):
+        now = self.weather_provider.now
+        return self._level(np.arange(now - samples_to_fetch + 1, now + 1))
+
+    def fetch_historical_level(self):
+        return self._level(np.arange(0, 1500))
+
+
+def test_update_matches_full_recompute():
+    weather_provider = ShiftingWeatherProvider()
+    catchment_data = CatchmentData("test_catchment", weather_provider, ShiftingLevelProvider(weather_provider), num_recent_samples=200)
+    rolling_kwargs = dict(rolling_sum_columns=["weather_attr_1"], rolling_mean_columns=["weather_attr_2"], rolling_window_sizes=[24, 72])
+    training_dataset = TrainingDataset(catchment_data, validation_size=100, test_size=100, **rolling_kwargs)
+    dataset = InferenceDataset(catchment_data=catchment_data, scaler=training_dataset.scaler, target_scaler=training_dataset.target_scaler, **rolling_kwargs)
+
+    # After a gap longer than the window, nothing carries over from the previous update
+    for hours, revision in [(1, 1), (0, 1), (0, 2), (5, 3), (1, 3), (400, 4), (1, 4)]:
+        weather_provider.now += hours
+        weather_provider.revision = revision
+        dataset.update()
+
+        expected = InferenceDataset(catchment_data=catchment_data, scaler=training_dataset.scaler, target_scaler=training_dataset.target_scaler, **rolling_kwargs)
+        assert dataset.X.time_index.equals(expected.X.time_index)
+        assert list(dataset.X.components) == list(expected.X.components)
+        np.testing.assert_allclose(dataset.X.values(), expected.X.values(), rtol=1e-5, atol=1e-6)
+        assert dataset.y.time_index.equals(expected.y.time_index)
+        np.testing.assert_allclose(dataset.y.values(), expected.y.values(), rtol=1e-6)
+
+
+def test_datum_state_update_after_gap():
+    weather_provider = ShiftingWeatherProvider()
+    catchment_data = CatchmentData("test_catchment", weather_provider, ShiftingLevelProvider(weather_provider), num_recent_samples=200)
+    dataset = TrainingDataset(catchment_data, validation_size=100, test_size=100, rolling_sum_columns=["weather_attr_1"], rolling_mean_columns=["weather_attr_2"], rolling_window_sizes=[24, 72])
+    state = DatumState(dataset)
+    state.update(weather_provider._weather(np.arange(1700, 2048), 0))
+
+    # The new raw data starts after the end of the previously processed raw data
+    weather_provider.now += 400
+    raw = weather_provider._weather(np.arange(2100, 2448), 0)
+    processed, changed_from = state.update(raw)
+
+    expected, _ = DatumState(dataset).update(raw)
+    pd.testing.assert_frame_equal(processed, expected)
+    assert changed_from == expected.index[0]
+
+
+def test_update_processes_only_changed_rows(monkeypatch):
+    weather_provider = ShiftingWeatherProvider()
+    catchment_data = CatchmentData("test_catchment", weather_provider, ShiftingLevelProvider(weather_provider), num_recent_samples=200)
+    rolling_kwargs = dict(rolling_sum_columns=["weather_attr_1"], rolling_mean_columns=["weather_attr_2"], rolling_window_sizes=[24, 72])
+    training_dataset = TrainingDataset(catchment_data, validation_size=100, test_size=100, **rolling_kwargs)
+    dataset = InferenceDataset(catchment_data=catchment_data, scaler=training_dataset.scaler, target_scaler=training_dataset.target_scaler, **rolling_kwargs)
+
+    processed_rows = []
+    rolling_update = RollingFeatureState.update
+    monkeypatch.setattr(RollingFeatureState, "update", lambda self, df: processed_rows.append(len(df)) or rolling_update(self, df))
+
+    weather_provider.now += 1
+    weather_provider.revision = 1
+    dataset.update()
+
+    # only the forecast rows, which were revised, and the new hour are reprocessed for each coordinate
+    assert len(processed_rows) == weather_provider.num_locs
+    assert max(processed_rows) <= weather_provider.num_forecast + 2
@@ -4,6 +4,7 @@ from rlf.forecasting.catchment_data import CatchmentData
 from rlf.forecasting.inference_dataset import InferenceDataset
 from rlf.forecasting.training_dataset import TrainingDataset
 from rlf.forecasting.inference_forecaster import InferenceForecaster
+from rlf.forecasting.model_registry import ModelRegistry
 from fake_providers import FakeLevelProvider, FakeWeatherProvider
 
 
@@ -112,3 +113,14 @@ def test_inference_forecaster_predict(inference_dataset, catchment_data, scalers
     expected_results = [n for n in range(24)]
 
     assert actual_results == expected_results
+
+
+def test_inference_forecaster_model_registry(tmp_path, catchment_data, scalers):
+    (tmp_path / catchment_data.name).mkdir()
+    model_registry = ModelRegistry()
+
+    inference_forecasters = [FakeInferenceForecaster(None, scalers, catchment_data=catchment_data, root_dir=str(tmp_path), model_registry=model_registry) for _ in range(3)]
+
+    assert (model_registry.misses == 1)
+    assert (model_registry.hits == 2)
+    assert (inference_forecasters[0].dataset.scaler is inference_forecasters[2].dataset.scaler)
@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import pytest
+
+from rlf.forecasting.model_registry import ModelRegistry
+
+
+def make_model_dir(path, size: int = 10) -> str:
+    os.makedirs(os.path.join(path, "contributing_model_0"), exist_ok=True)
+    with open(os.path.join(path, "ensemble"), "wb") as f:
+        f.write(b"0" * size)
+    with open(os.path.join(path, "contributing_model_0", "weights"), "wb") as f:
+        f.write(b"0" * size)
+    return str(path)
+
+
+def test_get_caches_loaded_model(tmp_path):
+    model_dir = make_model_dir(tmp_path / "model")
+    model_registry = ModelRegistry()
+
+    first = model_registry.get(model_dir, lambda: object())
+    assert model_registry.get(model_dir, lambda: object()) is first
+    assert model_registry.get(model_dir + "/", lambda: object()) is first
+    assert (model_registry.hits, model_registry.misses) == (2, 1)
+    assert model_registry.size_bytes() == 20
+
+    # Variants of the same directory are cached separately
+    assert model_registry.get(model_dir, lambda: object(), variant=True) is not first
+
+
+def test_get_reloads_changed_model(tmp_path):
+    model_dir = make_model_dir(tmp_path / "model")
+    model_registry = ModelRegistry()
+
+    first = model_registry.get(model_dir, lambda: object())
+    make_model_dir(tmp_path / "model", size=11)
+    assert model_registry.get(model_dir, lambda: object()) is not first
+
+
+def test_lru_eviction(tmp_path):
+    model_dirs = [make_model_dir(tmp_path / str(i)) for i in range(3)]
+    model_registry = ModelRegistry(max_size_bytes=40)
+
+    models = [model_registry.get(model_dir, lambda: object()) for model_dir in model_dirs[:2]]
+    # Use the first model so that the second is the least recently used
+    model_registry.get(model_dirs[0], lambda: object())
+    model_registry.get(model_dirs[2], lambda: object())
+
+    assert model_registry.size_bytes() == 40
+    assert model_registry.get(model_dirs[0], lambda: object()) is models[0]
+    assert model_registry.get(model_dirs[1], lambda: object()) is not models[1]
+
+    # A model larger than the cap is still returned, but evicts every other model
+    model_registry.max_size_bytes = 0
+    model_registry.get(model_dirs[2], lambda: object())
+    assert model_registry.size_bytes() == 20
+
+
+def test_concurrent_get_loads_once(tmp_path):
+    model_dir = make_model_dir(tmp_path / "model")
+    model_registry = ModelRegistry()
+
+    def load():
+        time.sleep(0.1)
+        return object()
+
+    with ThreadPoolExecutor(4) as executor:
+        models = list(executor.map(lambda _: model_registry.get(model_dir, load), range(4)))
+
+    assert model_registry.misses == 1
+    assert all(model is models[0] for model in models)
+
+
+def test_missing_model_dir(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ModelRegistry().get(str(tmp_path / "missing"), lambda: object())
+
+
+def test_invalid_max_size_bytes():
+    with pytest.raises(ValueError):
+        ModelRegistry(max_size_bytes=-1)
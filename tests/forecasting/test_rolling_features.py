@@ -0,0 +1,123 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rlf.forecasting.base_dataset import BaseDataset
+from rlf.forecasting.rolling_features import rolling_feature_names, rolling_features, RollingFeatureState
+
+
+class FakeCatchmentData:
+    def __init__(self):
+        self.name = "test_name"
+
+
+def reference_add_engineered_features(df, sum_columns, mean_columns, window_sizes):
+    """One pandas rolling window per column and window size, as computed before the single pass kernel."""
+    df = df.copy()
+    df["day_of_year"] = df.index.day_of_year
+    for window_size in window_sizes:
+        for column in sum_columns:
+            df[f"{column}_sum_{window_size}"] = df[column].rolling(window=window_size).sum()
+        for column in mean_columns:
+            df[f"{column}_mean_{window_size}"] = df[column].rolling(window=window_size).mean()
+    return df.dropna()
+
+
+def synthetic_weather(num_rows, num_columns=3, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2000-01-01", periods=num_rows, freq="H")
+    values = rng.gamma(0.5, 2.0, (num_rows, num_columns)) * 10
+    return pd.DataFrame(values, index=index, columns=[f"c{i}" for i in range(num_columns)])
+
+
+def test_rolling_features_match_pandas():
+    df = synthetic_weather(500)
+    df.iloc[[3, 250, 251], 1] = np.nan
+
+    features = rolling_features(df, ["c0", "c1"], ["c1", "c2"], [1, 24, 100, 1000])
+
+    assert list(features.columns) == rolling_feature_names(["c0", "c1"], ["c1", "c2"], [1, 24, 100, 1000])
+    assert features.dtypes.eq(np.float32).all()
+    for window_size in [1, 24, 100, 1000]:
+        for column in ["c0", "c1"]:
+            expected = df[column].rolling(window_size).sum()
+            np.testing.assert_allclose(features[f"{column}_sum_{window_size}"], expected, rtol=1e-6)
+        for column in ["c1", "c2"]:
+            expected = df[column].rolling(window_size).mean()
+            np.testing.assert_allclose(features[f"{column}_mean_{window_size}"], expected, rtol=1e-6)
+
+
+def test_rolling_features_float32_accumulated_in_float64():
+    # long float32 record with large values, where float32 running totals would lose several digits
+    df = (synthetic_weather(20 * 365 * 24, num_columns=1) + 1000).astype(np.float32)
+
+    features = rolling_features(df, ["c0"], ["c0"], [30 * 24])
+
+    expected = df["c0"].astype(np.float64).rolling(30 * 24)
+    np.testing.assert_allclose(features["c0_sum_720"], expected.sum(), rtol=1e-6)
+    np.testing.assert_allclose(features["c0_mean_720"], expected.mean(), rtol=1e-6)
+
+
+def test_rolling_features_repeated_window_sizes():
+    df = synthetic_weather(50)
+    features = rolling_features(df, ["c0"], [], [10, 10])
+    assert list(features.columns) == ["c0_sum_10"]
+
+
+def test_rolling_features_invalid_window_size():
+    with pytest.raises(ValueError):
+        rolling_features(synthetic_weather(50), ["c0"], [], [0])
+
+
+def test_rolling_feature_state_update_matches_from_scratch():
+    df = synthetic_weather(400)
+    df.iloc[[10, 300], 0] = np.nan
+    revised = synthetic_weather(450, seed=1).iloc[350:]
+    state = RollingFeatureState(["c0"], ["c1"], [24, 100])
+
+    state.update(df.iloc[:300])
+    # rewind into the accumulated rows, and forget rows before a new first row
+    updated = state.update(pd.concat([df.iloc[250:350], revised]))
+    state.drop_before(df.index[50])
+    after_drop = state.update(revised.iloc[-10:])
+
+    expected = rolling_features(pd.concat([df.iloc[:350], revised]), ["c0"], ["c1"], [24, 100])
+    pd.testing.assert_frame_equal(updated, expected.iloc[250:], rtol=1e-6)
+    expected = rolling_features(pd.concat([df.iloc[50:350], revised]), ["c0"], ["c1"], [24, 100])
+    pd.testing.assert_frame_equal(after_drop, expected.iloc[-10:], rtol=1e-6)
+
+
+def test_add_engineered_features_matches_reference():
+    dataset = BaseDataset(FakeCatchmentData(), rolling_sum_columns=["c0", "c1"], rolling_mean_columns=["c2"], rolling_window_sizes=[24, 72])
+    df = synthetic_weather(1000)
+
+    engineered = dataset._add_engineered_features(df.copy())
+    expected = reference_add_engineered_features(df, ["c0", "c1"], ["c2"], [24, 72])
+
+    assert list(engineered.columns) == list(expected.columns)
+    assert engineered.index.equals(expected.index)
+    np.testing.assert_allclose(engineered.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-6)
+
+
+@pytest.mark.benchmark
+def test_add_engineered_features_benchmark():
+    # 30 years of hourly data for a handful of rolling columns, with 10 and 30 day windows
+    columns = [f"c{i}" for i in range(8)]
+    dataset = BaseDataset(FakeCatchmentData(), rolling_sum_columns=columns, rolling_mean_columns=columns, rolling_window_sizes=[10 * 24, 30 * 24])
+    df = synthetic_weather(30 * 365 * 24, num_columns=len(columns))
+
+    # best of a few runs, so that the comparison is not thrown off by other load on the machine
+    reference_duration = duration = float("inf")
+    for _ in range(3):
+        start = time.monotonic()
+        expected = reference_add_engineered_features(df, columns, columns, [10 * 24, 30 * 24])
+        reference_duration = min(reference_duration, time.monotonic() - start)
+
+        start = time.monotonic()
+        engineered = dataset._add_engineered_features(df.copy())
+        duration = min(duration, time.monotonic() - start)
+
+    np.testing.assert_allclose(engineered.to_numpy(dtype=np.float64), expected.to_numpy(dtype=np.float64), rtol=1e-5)
+    assert duration * 2 < reference_duration
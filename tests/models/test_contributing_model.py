@@ -1,7 +1,10 @@
 from typing import List
 
 from darts import TimeSeries
+from darts.models import LinearRegressionModel
 import numpy as np
+import pandas as pd
+import pytest
 
 from rlf.models.contributing_model import ContributingModel
 
@@ -63,3 +66,46 @@ def test_tributary_model_fit_do_not_separate_columns():
     covariates = TimeSeries.from_values(values, columns=all_columns)
 
     tm.fit(series=None, past_covariates=covariates, future_covariates=covariates)
+
+
+def generate_covariates(seed: int, length: int = 200):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2023-01-01", periods=length + 24, freq="H")
+    X = TimeSeries.from_times_and_values(index, rng.random((length + 24, 3)), columns=["1_a", "1_b", "2_a"])
+    y = TimeSeries.from_times_and_values(index[:length], X.values()[:length, :1] + 0.1 * rng.random((length, 1)))
+    return y, X
+
+
+@pytest.mark.parametrize("last_points_only", [True, False])
+def test_tributary_model_historical_forecasts_batched(monkeypatch, last_points_only):
+    y, X = generate_covariates(0)
+    base_model = LinearRegressionModel(lags=4, lags_future_covariates=[0])
+    tm = ContributingModel(base_model, "1_")
+    tm.fit(series=y, future_covariates=X)
+
+    predict_calls = []
+    base_predict = base_model.predict
+
+    def counting_predict(n, series, **kwargs):
+        predict_calls.append(len(series))
+        assert kwargs["future_covariates"][0].columns.tolist() == ["1_a", "1_b"]
+        return base_predict(n, series, **kwargs)
+
+    monkeypatch.setattr(base_model, "predict", counting_predict)
+    forecasts = tm.historical_forecasts(y, future_covariates=X, start=0.5, forecast_horizon=6, stride=3, retrain=False,
+                                        last_points_only=last_points_only, batch_size=10)
+    monkeypatch.setattr(base_model, "predict", base_predict)
+
+    # One prediction per stride point, 10 per call to the base model
+    assert sum(predict_calls) == 32
+    assert max(predict_calls) == 10
+
+    expected = [tm.predict(6, series=y.drop_after(pred_time), future_covariates=X) for pred_time in y.time_index[99:195:3]]
+    if last_points_only:
+        assert forecasts.time_index.equals(pd.DatetimeIndex([forecast.end_time() for forecast in expected], freq=3 * y.freq))
+        np.testing.assert_allclose(forecasts.values(), np.concatenate([forecast.values()[-1:] for forecast in expected]))
+    else:
+        assert len(forecasts) == len(expected)
+        for forecast, expected_forecast in zip(forecasts, expected):
+            assert forecast.time_index.equals(expected_forecast.time_index)
+            np.testing.assert_allclose(forecast.values(), expected_forecast.values())
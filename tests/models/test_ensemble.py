@@ -1,8 +1,14 @@
+from concurrent.futures import Executor, Future
 from datetime import datetime, timedelta
+import time
 
+from darts.models import LinearRegressionModel
 from darts.timeseries import TimeSeries
+import numpy as np
 import pandas as pd
+import pytest
 
+from rlf.models.contributing_model import ContributingModel
 from rlf.models.ensemble import Ensemble
 
 
@@ -108,3 +114,225 @@ def test_ensemble_fit_future_covariates():
     ensemble.fit(y, future_covariates=X, retrain_contributing_models=True)
 
     assert contributing_models[0].fit_calls == 2
+
+
+class CountingContributingModel(ContributingModel):
+    def __init__(self, base_model, column_prefix=None):
+        super().__init__(base_model, column_prefix)
+        self.predict_calls = 0
+
+    def predict(self, *args, **kwargs):
+        self.predict_calls += 1
+        return super().predict(*args, **kwargs)
+
+
+def generate_catchment(seed, length=200):
+    rng = np.random.default_rng(seed)
+    X_values = rng.random((length + 24, 4))
+    y_values = X_values[:length, :1] + 0.5 * X_values[:length, 2:3] + 0.1 * rng.random((length, 1))
+    X = generate_hourly_time_series(datetime(2023, 1, 1), X_values.tolist())
+    y = generate_hourly_time_series(datetime(2023, 1, 1), y_values.tolist())
+    X = X.with_columns_renamed(X.columns, ["a_0", "a_1", "b_0", "b_1"])
+    return y, X
+
+
+@pytest.fixture
+def fitted_ensemble():
+    y, X = generate_catchment(0)
+    contributing_models = [
+        CountingContributingModel(LinearRegressionModel(lags=4, lags_future_covariates=[0]), prefix)
+        for prefix in ("a_", "b_")
+    ]
+    for contributing_model in contributing_models:
+        contributing_model.fit(series=y, future_covariates=X)
+
+    predictions = [contributing_model.historical_forecasts(y, future_covariates=X, start=0.5, retrain=False) for contributing_model in contributing_models]
+    predictions = predictions[0].stack(predictions[1])
+    combiner = LinearRegressionModel(lags=None, lags_future_covariates=[0])
+    combiner.fit(series=y.slice_intersect(predictions), future_covariates=predictions)
+
+    ensemble = Ensemble(combiner, contributing_models, combiner_holdout_size=100)
+    # Contributing models and combiner are fit above, as Ensemble.fit requires torch models
+    ensemble._fit_called = True
+    return ensemble
+
+
+def test_ensemble_predict_sequence(fitted_ensemble):
+    catchments = [generate_catchment(seed) for seed in range(1, 4)]
+
+    expected = [fitted_ensemble.predict(12, series=y, future_covariates=X) for y, X in catchments]
+    for contributing_model in fitted_ensemble.contributing_models:
+        contributing_model.predict_calls = 0
+
+    predictions = fitted_ensemble.predict(12, series=[y for y, _ in catchments], future_covariates=[X for _, X in catchments])
+
+    assert len(predictions) == len(catchments)
+    for prediction, expected_prediction in zip(predictions, expected):
+        assert prediction.time_index.equals(expected_prediction.time_index)
+        np.testing.assert_allclose(prediction.values(), expected_prediction.values())
+
+    # Each contributing model is called once for the whole batch
+    assert [contributing_model.predict_calls for contributing_model in fitted_ensemble.contributing_models] == [1, 1]
+
+
+def test_ensemble_predict_mismatched_covariates(fitted_ensemble):
+    y, X = generate_catchment(1)
+    with pytest.raises(ValueError):
+        fitted_ensemble.predict(12, series=[y, y], future_covariates=[X])
+    with pytest.raises(ValueError):
+        fitted_ensemble.predict(12, series=[y], future_covariates=X)
+
+
+def reference_historical_forecasts(ensemble, series, future_covariates, forecast, forecast_horizon):
+    """Last points of one prediction per prediction time, as computed before batching."""
+    values = []
+    for end_time in forecast.time_index:
+        pred_time = end_time - (forecast_horizon - 1) * series.freq
+        prediction = ensemble.predict(forecast_horizon, series=series.drop_after(pred_time), future_covariates=future_covariates)
+        assert prediction.end_time() == end_time
+        values.append(prediction.all_values(copy=False)[-1])
+    return np.array(values)
+
+
+@pytest.mark.parametrize("stride", [2, 7])
+def test_ensemble_historical_forecasts_matches_reference(fitted_ensemble, stride):
+    y, X = generate_catchment(1)
+    for contributing_model in fitted_ensemble.contributing_models:
+        contributing_model.predict_calls = 0
+
+    forecast = fitted_ensemble.historical_forecasts(y, future_covariates=X, start=0.5, forecast_horizon=12, stride=stride, retrain=False, batch_size=32)
+
+    # Each contributing model is called once per batch of prediction times
+    assert forecast.freq == y.freq * stride
+    assert [contributing_model.predict_calls for contributing_model in fitted_ensemble.contributing_models] == [-(-len(forecast) // 32)] * 2
+
+    np.testing.assert_allclose(forecast.all_values(), reference_historical_forecasts(fitted_ensemble, y, X, forecast, 12))
+
+    unbatched = fitted_ensemble.historical_forecasts(y, future_covariates=X, start=0.5, forecast_horizon=12, stride=stride, retrain=False, batch_size=1)
+    assert unbatched.time_index.equals(forecast.time_index)
+    np.testing.assert_allclose(unbatched.all_values(), forecast.all_values())
+
+
+def test_ensemble_historical_forecasts_all_points(fitted_ensemble):
+    y, X = generate_catchment(1)
+    forecasts = fitted_ensemble.historical_forecasts(y, future_covariates=X, start=0.5, forecast_horizon=12, stride=10, retrain=False, last_points_only=False, batch_size=4)
+
+    assert len(forecasts) == 9
+    for forecast in forecasts:
+        expected = fitted_ensemble.predict(12, series=y.drop_after(forecast.start_time()), future_covariates=X)
+        assert forecast.time_index.equals(expected.time_index)
+        np.testing.assert_allclose(forecast.values(), expected.values())
+
+
+def test_ensemble_historical_forecasts_invalid_batch_size(fitted_ensemble):
+    y, X = generate_catchment(1)
+    with pytest.raises(ValueError):
+        fitted_ensemble.historical_forecasts(y, future_covariates=X, retrain=False, batch_size=0)
+
+
+def test_ensemble_combines_last_points(fitted_ensemble):
+    # Whether historical_forecasts may combine only the last points is decided from darts attributes of the combiner,
+    # this fails if a darts upgrade changes them rather than silently falling back to combining every point
+    y, X = generate_catchment(1)
+    assert fitted_ensemble._combines_time_steps_independently(y)
+
+    train_series = [y.drop_after(y.time_index[i]) for i in (100, 150)]
+    times, values = fitted_ensemble._predict_last_points(12, train_series, future_covariates=[X, X])
+    expected = fitted_ensemble.predict(12, series=train_series, future_covariates=[X, X])
+    assert times == [prediction.end_time() for prediction in expected]
+    np.testing.assert_allclose(values, np.stack([prediction.all_values()[-1] for prediction in expected]), rtol=1e-6)
+
+
+@pytest.mark.parametrize("combiner", [
+    LinearRegressionModel(lags=None, lags_future_covariates=[-1, 0]),
+    LinearRegressionModel(lags=1, lags_future_covariates=[0]),
+    LinearRegressionModel(lags=None, lags_future_covariates=[0], output_chunk_length=2),
+    LinearRegressionModel(lags=None, lags_future_covariates=[0], likelihood="quantile"),
+    LinearRegressionModel(lags=None, lags_future_covariates=[0], add_encoders={"cyclic": {"future": ["hour"]}}),
+])
+def test_ensemble_combines_all_points(fitted_ensemble, combiner):
+    y, _ = generate_catchment(1)
+    fitted_ensemble.combiner = combiner
+    assert not fitted_ensemble._combines_time_steps_independently(y)
+
+
+@pytest.mark.benchmark
+def test_ensemble_historical_forecasts_benchmark(fitted_ensemble):
+    y, X = generate_catchment(1, length=600)
+
+    start = time.monotonic()
+    forecast = fitted_ensemble.historical_forecasts(y, future_covariates=X, start=0.1, forecast_horizon=12, retrain=False)
+    duration = time.monotonic() - start
+
+    start = time.monotonic()
+    reference = reference_historical_forecasts(fitted_ensemble, y, X, forecast, 12)
+    reference_duration = time.monotonic() - start
+
+    np.testing.assert_allclose(forecast.all_values(), reference)
+
+    # ~500 prediction times take a call of every model each when predicted one by one, and a couple in batches
+    assert duration * 2 < reference_duration
+
+
+class LaggedContributingModel(ContributingModel):
+    """Contributing model around a regression model, which has lags rather than an input chunk length."""
+
+    @property
+    def input_chunk_length(self):
+        return 4
+
+
+def build_lagged_ensemble():
+    contributing_models = [
+        LaggedContributingModel(LinearRegressionModel(lags=4, lags_future_covariates=[0]), prefix)
+        for prefix in ("a_", "b_")
+    ]
+    combiner = LinearRegressionModel(lags=None, lags_future_covariates=[0])
+    return Ensemble(combiner, contributing_models, combiner_holdout_size=100, target_horizon=6, combiner_train_stride=2)
+
+
+@pytest.mark.slow
+def test_ensemble_fit_parallel_matches_sequential():
+    y, X = generate_catchment(0)
+    sequential = build_lagged_ensemble().fit(y, future_covariates=X, retrain_contributing_models=True)
+    parallel = build_lagged_ensemble().fit(y, future_covariates=X, retrain_contributing_models=True, max_workers=2, torch_threads_per_worker=1)
+
+    np.testing.assert_allclose(parallel.combiner.model.coef_, sequential.combiner.model.coef_)
+    y_test, X_test = generate_catchment(1)
+    np.testing.assert_allclose(parallel.predict(6, series=y_test, future_covariates=X_test).values(),
+                               sequential.predict(6, series=y_test, future_covariates=X_test).values())
+
+
+class RecordingExecutor(Executor):
+    """Executor running tasks in this process, which records the keyword arguments each task was submitted with."""
+
+    def __init__(self):
+        self.submitted_kwargs = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted_kwargs.append(kwargs)
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_ensemble_map_contributing_models_sends_own_columns():
+    y, X = generate_catchment(0)
+    ensemble = build_lagged_ensemble()
+    executor = RecordingExecutor()
+
+    columns = ensemble._map_contributing_models(executor, lambda contributing_model, **kwargs: list(kwargs["future_covariates"].columns),
+                                                series=y, past_covariates=None, future_covariates=X)
+
+    # Each task only carries the covariate columns of its contributing model, rather than the whole X
+    assert columns == [["a_0", "a_1"], ["b_0", "b_1"]]
+    assert [list(kwargs["future_covariates"].columns) for kwargs in executor.submitted_kwargs] == columns
+    assert all(kwargs["past_covariates"] is None and kwargs["series"] is y for kwargs in executor.submitted_kwargs)
+
+
+def test_ensemble_fit_invalid_workers():
+    y, X = generate_catchment(0)
+    with pytest.raises(ValueError):
+        build_lagged_ensemble().fit(y, future_covariates=X, max_workers=0)
+    with pytest.raises(ValueError):
+        build_lagged_ensemble().fit(y, future_covariates=X, max_workers=2, torch_threads_per_worker=0)
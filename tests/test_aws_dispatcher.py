@@ -0,0 +1,193 @@
+from datetime import datetime
+from typing import List
+
+import pandas as pd
+import pytest
+import pytz
+
+from rlf.aws_dispatcher import PARTITION_ROW_GROUP_SIZE
+from rlf.forecasting.data_fetching_utilities.coordinate import Coordinate
+from rlf.forecasting.data_fetching_utilities.weather_provider.weather_datum import WeatherDatum
+from rlf.local_file_cache import LocalFileCache
+
+
+@pytest.fixture
+def hourly_df() -> pd.DataFrame:
+    index = pd.date_range("2020-11-01", "2022-02-28 23:00", freq="H", tz="UTC", name="time")
+    return pd.DataFrame({"temperature_2m": range(len(index)), "rain": 0.5}, index=index, dtype=float)
+
+
+@pytest.fixture
+def datum(hourly_df) -> WeatherDatum:
+    return WeatherDatum(longitude=-120.0,
+                        latitude=44.0,
+                        api_response_longitude=-120.0,
+                        api_response_latitude=44.0,
+                        elevation=0.0,
+                        utc_offset_seconds=0.0,
+                        timezone="UTC",
+                        hourly_units={"temperature_2m": "C", "rain": "mm"},
+                        hourly_parameters=hourly_df)
+
+
+def test_upload_as_partitioned_parquet(memory_aws_dispatcher, hourly_df):
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+
+    paths = memory_aws_dispatcher._parquet_paths("folder", "data")
+    assert [memory_aws_dispatcher._partition_year(path) for path in paths] == [2020, 2021, 2022]
+    pd.testing.assert_frame_equal(memory_aws_dispatcher.download_df_from_parquet("folder", "data"), hourly_df.astype("float32"), check_freq=False)
+
+
+def test_upload_as_partitioned_parquet_replaces_data(memory_aws_dispatcher, hourly_df):
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df["2021-03-01":"2021-04-01"], "folder", "data")
+
+    assert len(memory_aws_dispatcher._parquet_paths("folder", "data")) == 1
+    df = memory_aws_dispatcher.download_df_from_parquet("folder", "data")
+    pd.testing.assert_frame_equal(df, hourly_df["2021-03-01":"2021-04-01"].astype("float32"), check_freq=False)
+
+
+def test_download_df_from_parquet_filters(memory_aws_dispatcher, hourly_df):
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+    start = datetime(2021, 12, 30, tzinfo=pytz.UTC)
+    end = datetime(2022, 1, 2, tzinfo=pytz.UTC)
+    columns = ["rain"]
+
+    df = memory_aws_dispatcher.download_df_from_parquet("folder", "data", columns=columns, start_datetime=start, end_datetime=end)
+
+    assert columns == ["rain"]
+    assert list(df.columns) == ["rain"]
+    pd.testing.assert_frame_equal(df, hourly_df.loc[start:end, ["rain"]].astype("float32"), check_freq=False)  # type: ignore[misc]
+
+
+def test_download_df_from_parquet_as_float64(memory_aws_dispatcher, hourly_df):
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+
+    df = memory_aws_dispatcher.download_df_from_parquet("folder", "data", as_float32=False)
+
+    pd.testing.assert_frame_equal(df, hourly_df, check_freq=False)
+
+
+def test_download_df_from_parquet_skips_partitions(memory_aws_dispatcher, hourly_df):
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+    paths = memory_aws_dispatcher._parquet_paths("folder", "data", start_year=2021, end_year=2021)
+    assert [memory_aws_dispatcher._partition_year(path) for path in paths] == [2021]
+
+
+def test_partitions_have_small_row_groups(memory_aws_dispatcher, hourly_df):
+    import pyarrow.parquet as pq
+
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df, "folder", "data")
+    path = memory_aws_dispatcher._parquet_paths("folder", "data", start_year=2021, end_year=2021)[0]
+    with memory_aws_dispatcher.s3.open(path, "rb") as f:
+        metadata = pq.ParquetFile(f).metadata
+    assert metadata.num_rows == 365 * 24
+    assert metadata.num_row_groups == -(-metadata.num_rows // PARTITION_ROW_GROUP_SIZE)
+
+
+def test_download_df_from_parquet_missing(memory_aws_dispatcher):
+    with pytest.raises(FileNotFoundError):
+        memory_aws_dispatcher.download_df_from_parquet("folder", "data")
+
+
+def test_get_last_timestamp(memory_aws_dispatcher, hourly_df):
+    assert memory_aws_dispatcher.get_last_timestamp("folder", "data") is None
+    memory_aws_dispatcher.upload_as_partitioned_parquet(hourly_df[:"2021-06-01"], "folder", "data")
+    memory_aws_dispatcher.append_as_parquet(hourly_df["2021-06-02":], "folder", "data")
+    assert memory_aws_dispatcher.get_last_timestamp("folder", "data") == hourly_df.index[-1]
+
+
+def test_migrate_datums_to_partitioned_parquet(memory_aws_dispatcher, datum):
+    # Store the datum with the legacy single file layout
+    folder_name = memory_aws_dispatcher.datum_folder_name(datum.longitude, datum.latitude, "historical")
+    memory_aws_dispatcher.upload_as_json(datum.meta_data, folder_name, "meta")
+    memory_aws_dispatcher.upload_as_json(datum.hourly_units, folder_name, "units")
+    memory_aws_dispatcher.upload_as_parquet(datum.hourly_parameters, folder_name, "data")
+    coordinate = Coordinate(lon=datum.longitude, lat=datum.latitude)
+    expected = memory_aws_dispatcher.download_datum(coordinate, dir_path="historical").hourly_parameters
+
+    assert memory_aws_dispatcher.migrate_datums_to_partitioned_parquet("historical") == 1
+    assert memory_aws_dispatcher.migrate_datums_to_partitioned_parquet("historical") == 0
+
+    paths = memory_aws_dispatcher._parquet_paths(folder_name, "data")
+    assert all(memory_aws_dispatcher._partition_year(path) is not None for path in paths)
+    actual = memory_aws_dispatcher.download_datum(coordinate, dir_path="historical").hourly_parameters
+    pd.testing.assert_frame_equal(actual, expected, check_freq=False)
+
+
+def test_download_datum_through_local_cache(memory_aws_dispatcher, datum, tmp_path):
+    memory_aws_dispatcher.upload_datum(datum, "historical")
+    coordinate = Coordinate(lon=datum.longitude, lat=datum.latitude)
+    expected = memory_aws_dispatcher.download_datum(coordinate, dir_path="historical")
+
+    memory_aws_dispatcher.local_cache = LocalFileCache(str(tmp_path))
+    for _ in range(2):
+        actual = memory_aws_dispatcher.download_datum(coordinate, dir_path="historical", start_datetime=datetime(2021, 1, 1, tzinfo=pytz.UTC))
+        assert actual.hourly_units == expected.hourly_units
+        pd.testing.assert_frame_equal(actual.hourly_parameters, expected.hourly_parameters["2021-01-01":], check_freq=False)
+    # meta, units and the 2021 and 2022 partitions
+    assert memory_aws_dispatcher.local_cache.misses == 4
+    assert memory_aws_dispatcher.local_cache.hits == 4
+
+    # Uploading new data is picked up on the next download
+    datum.hourly_parameters = datum.hourly_parameters * 2
+    memory_aws_dispatcher.upload_datum(datum, "historical")
+    actual = memory_aws_dispatcher.download_datum(coordinate, dir_path="historical")
+    pd.testing.assert_frame_equal(actual.hourly_parameters, expected.hourly_parameters * 2, check_freq=False)
+
+
+@pytest.fixture
+def catchment_datums(hourly_df) -> List[WeatherDatum]:
+    datums = []
+    for i in range(3):
+        datums.append(WeatherDatum(longitude=-120.0 - i,
+                                   latitude=44.0 + i,
+                                   api_response_longitude=-120.01 - i,
+                                   api_response_latitude=44.01 + i,
+                                   elevation=100.0 * i,
+                                   utc_offset_seconds=0.0,
+                                   timezone="UTC",
+                                   hourly_units={"temperature_2m": "C", "rain": "mm"},
+                                   hourly_parameters=hourly_df + i))
+    return datums
+
+
+def test_upload_download_catchment(memory_aws_dispatcher, catchment_datums):
+    memory_aws_dispatcher.upload_catchment(catchment_datums, "12345678", "historical")
+
+    coordinates = [Coordinate(lon=datum.longitude, lat=datum.latitude) for datum in reversed(catchment_datums)]
+    datums = memory_aws_dispatcher.download_catchment("12345678", coordinates=coordinates, dir_path="historical")
+
+    assert len(datums) == len(catchment_datums)
+    for datum, expected in zip(datums, reversed(catchment_datums)):
+        assert datum.meta_data == expected.meta_data
+        assert datum.hourly_units == expected.hourly_units
+        pd.testing.assert_frame_equal(datum.hourly_parameters, expected.hourly_parameters.astype("float32"), check_freq=False)
+
+
+def test_download_catchment_filters(memory_aws_dispatcher, catchment_datums):
+    memory_aws_dispatcher.upload_catchment(catchment_datums, "12345678", "historical")
+    start = datetime(2021, 12, 30, tzinfo=pytz.UTC)
+    end = datetime(2022, 1, 2, tzinfo=pytz.UTC)
+    coordinate = Coordinate(lon=catchment_datums[1].longitude, lat=catchment_datums[1].latitude)
+
+    datums = memory_aws_dispatcher.download_catchment("12345678", coordinates=[coordinate], columns=["rain"], dir_path="historical", start_datetime=start, end_datetime=end)
+
+    assert len(datums) == 1
+    assert datums[0].hourly_units == {"rain": "mm"}
+    expected = catchment_datums[1].hourly_parameters.loc[start:end, ["rain"]]  # type: ignore[misc]
+    pd.testing.assert_frame_equal(datums[0].hourly_parameters, expected.astype("float32"), check_freq=False)
+
+
+def test_download_catchment_missing(memory_aws_dispatcher, catchment_datums):
+    with pytest.raises(FileNotFoundError):
+        memory_aws_dispatcher.download_catchment("12345678", dir_path="historical")
+
+    memory_aws_dispatcher.upload_catchment(catchment_datums, "12345678", "historical")
+    with pytest.raises(FileNotFoundError):
+        memory_aws_dispatcher.download_catchment("12345678", coordinates=[Coordinate(lon=0.0, lat=0.0)], dir_path="historical")
+
+
+def test_upload_catchment_duplicate_prefix(memory_aws_dispatcher, catchment_datums):
+    with pytest.raises(ValueError):
+        memory_aws_dispatcher.upload_catchment([catchment_datums[0], catchment_datums[0]], "12345678", "historical")
@@ -0,0 +1,61 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+
+# Modules which are slow to import and must only be imported on first use
+HEAVY_MODULES = ["darts", "torch", "pytorch_lightning", "sklearn", "s3fs", "xarray"]
+
+# Cumulative import time allowed for each module, in microseconds. Most of it is spent importing pandas.
+IMPORT_TIME_BUDGET_US = 2_000_000
+
+
+def import_times(module: str, cwd: str) -> Dict[str, int]:
+    """Import a module in a fresh interpreter with -X importtime.
+
+    Args:
+        module (str): Module to import.
+        cwd (str): Working directory of the interpreter.
+
+    Returns:
+        dict[str, int]: Cumulative import time in microseconds of every imported module.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=cwd, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+IMPORTED_MODULES = [
+    "rlf.forecasting.inference_forecaster",
+    "rlf.aws_dispatcher",
+    "rlf.forecasting.data_fetching_utilities.weather_provider.api_weather_provider",
+    "rlf.forecasting.data_fetching_utilities.weather_provider.aws_weather_provider",
+    "rlf.forecasting.data_fetching_utilities.level_provider.multi_gauge_level_provider",
+]
+
+
+@pytest.mark.parametrize("module", IMPORTED_MODULES)
+def test_import_is_light(tmp_path, module):
+    times = import_times(module, str(tmp_path))
+
+    heavy_modules = [name for name in HEAVY_MODULES if name in times]
+    assert heavy_modules == [], f"{module} imports {heavy_modules} at import time"
+
+    # Importing must not have side effects such as creating directories
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("module", IMPORTED_MODULES)
+def test_import_time(tmp_path, module):
+    times = import_times(module, str(tmp_path))
+
+    assert times[module] < IMPORT_TIME_BUDGET_US, f"Importing {module} took {times[module] / 1e6:.2f}s"
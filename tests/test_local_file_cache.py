@@ -0,0 +1,145 @@
+import os
+import time
+
+from fsspec.implementations.memory import MemoryFileSystem
+import pytest
+
+from rlf.local_file_cache import LocalFileCache
+
+
+class CountingMemoryFileSystem(MemoryFileSystem):
+    """In-memory filesystem that counts downloads and metadata requests."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.num_downloads = 0
+        self.num_info = 0
+
+    def get_file(self, rpath, lpath, **kwargs):
+        self.num_downloads += 1
+        return super().get_file(rpath, lpath, **kwargs)
+
+    def info(self, path, **kwargs):
+        self.num_info += 1
+        return super().info(path, **kwargs)
+
+
+@pytest.fixture
+def fs():
+    fs = CountingMemoryFileSystem(skip_instance_cache=True)
+    yield fs
+    if fs.exists("memory://cache-bucket"):
+        fs.rm("memory://cache-bucket", recursive=True)
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_get_caches_file(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a.parquet", b"a" * 10)
+    cache = LocalFileCache(str(tmp_path))
+
+    assert read(cache.get(fs, "memory://cache-bucket/a.parquet")) == b"a" * 10
+    assert read(cache.get(fs, "/cache-bucket/a.parquet")) == b"a" * 10
+    assert fs.num_downloads == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_get_shared_between_instances(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a.parquet", b"a" * 10)
+    LocalFileCache(str(tmp_path)).get(fs, "memory://cache-bucket/a.parquet")
+    cache = LocalFileCache(str(tmp_path))
+    cache.get(fs, "memory://cache-bucket/a.parquet")
+    assert fs.num_downloads == 1
+    assert cache.hits == 1
+
+
+def test_get_revalidates_changed_file(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a.parquet", b"a" * 10)
+    cache = LocalFileCache(str(tmp_path))
+    cache.get(fs, "memory://cache-bucket/a.parquet")
+
+    fs.pipe_file("memory://cache-bucket/a.parquet", b"b" * 12)
+    assert read(cache.get(fs, "memory://cache-bucket/a.parquet")) == b"b" * 12
+    assert fs.num_downloads == 2
+
+
+def test_get_revalidate_after(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a.parquet", b"a" * 10)
+    cache = LocalFileCache(str(tmp_path), revalidate_after=3600)
+    cache.get(fs, "memory://cache-bucket/a.parquet")
+    num_info = fs.num_info
+
+    cache.get(fs, "memory://cache-bucket/a.parquet")
+    assert fs.num_info == num_info
+    assert fs.num_downloads == 1
+
+
+def test_get_missing_file(fs, tmp_path):
+    cache = LocalFileCache(str(tmp_path))
+    with pytest.raises(FileNotFoundError):
+        cache.get(fs, "memory://cache-bucket/missing.parquet")
+
+
+def test_evicts_least_recently_used(fs, tmp_path):
+    for name in ["a", "b", "c"]:
+        fs.pipe_file(f"memory://cache-bucket/{name}", name.encode() * 10)
+    cache = LocalFileCache(str(tmp_path), max_size_bytes=25)
+
+    path_a = cache.get(fs, "memory://cache-bucket/a")
+    path_b = cache.get(fs, "memory://cache-bucket/b")
+    # Make a more recently used than b
+    os.utime(path_b, (time.time() - 60, time.time() - 60))
+    cache.get(fs, "memory://cache-bucket/a")
+    path_c = cache.get(fs, "memory://cache-bucket/c")
+
+    assert os.path.exists(path_a)
+    assert not os.path.exists(path_b)
+    assert os.path.exists(path_c)
+    assert cache.size_bytes() == 20
+
+
+def test_keeps_recently_used_files(fs, tmp_path):
+    for name in ["a", "b", "c"]:
+        fs.pipe_file(f"memory://cache-bucket/{name}", name.encode() * 10)
+    cache = LocalFileCache(str(tmp_path), max_size_bytes=15)
+
+    # a may not have been read yet by whoever it was handed to, e.g. another thread, so it outlives the size cap
+    path_a = cache.get(fs, "memory://cache-bucket/a")
+    path_b = cache.get(fs, "memory://cache-bucket/b")
+    assert os.path.exists(path_a)
+    assert os.path.exists(path_b)
+
+    # Once the grace period passed, least recently used files are evicted again
+    os.utime(path_a, (time.time() - 60, time.time() - 60))
+    os.utime(path_b, (time.time() - 30, time.time() - 30))
+    path_c = cache.get(fs, "memory://cache-bucket/c")
+    assert not os.path.exists(path_a)
+    assert not os.path.exists(path_b)
+    assert os.path.exists(path_c)
+
+
+def test_keeps_file_larger_than_cap(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a", b"a" * 100)
+    cache = LocalFileCache(str(tmp_path), max_size_bytes=10)
+    assert read(cache.get(fs, "memory://cache-bucket/a")) == b"a" * 100
+
+
+def test_invalidate(fs, tmp_path):
+    fs.pipe_file("memory://cache-bucket/a", b"a" * 10)
+    cache = LocalFileCache(str(tmp_path), revalidate_after=3600)
+    cache.get(fs, "memory://cache-bucket/a")
+    cache.invalidate("memory://cache-bucket/a")
+    cache.get(fs, "memory://cache-bucket/a")
+    assert fs.num_downloads == 2
+
+
+def test_invalid_arguments(tmp_path):
+    with pytest.raises(ValueError):
+        LocalFileCache(str(tmp_path), max_size_bytes=-1)
+    with pytest.raises(ValueError):
+        LocalFileCache(str(tmp_path), revalidate_after=-1)
+    with pytest.raises(ValueError):
+        LocalFileCache(str(tmp_path), eviction_grace_period=-1)